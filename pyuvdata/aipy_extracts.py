@@ -472,6 +472,18 @@ class UV(_miriad.UV):
             n2 += 1
         self._select(name, float(n1), float(n2), int(include))
 
+    def select_channels(self, start, nchan):
+        """Only return nchan channels, starting at channel start (indexed from
+        0), from read(). The other channels are not decoded and their flags
+        are not read. Uses the MIRIAD 'channel' linetype.
+
+        """
+        if start < 0 or nchan < 1 or start + nchan > self.nchan:
+            raise ValueError('channels {0} to {1} are not in the file'.format(
+                start, start + nchan - 1))
+        self._set('data', 'channel', int(nchan), float(start + 1), 1., 1.)
+        self.nchan = nchan
+
     def read(self, raw=False):
         """Return the next data record. Calling this function causes vars to change to
         reflect the record which this function returns. 'raw' causes data and
@@ -22,6 +22,20 @@ import itertools
 
 from . import aipy_extracts
 
+_miriad_index_version = 1
+
+
+def _miriad_index_path(filepath):
+    """Path of the index file for a miriad file directory."""
+    return os.path.normpath(filepath) + '.index.npy'
+
+
+def _miriad_index_stamp(filepath):
+    """Index format version, size and mtime (in us) of the miriad visdata item."""
+    visdata = os.stat(os.path.join(filepath, 'visdata'))
+    return np.array([_miriad_index_version, visdata.st_size,
+                     int(round(visdata.st_mtime * 1e6))], dtype=np.int64)
+
 
 class Miriad(UVData):
     """
@@ -40,10 +54,113 @@ class Miriad(UVData):
                              "polarization_array".format(pol=pol))
         return pol_ind
 
+    def _read_miriad_records(self, uv, source, check_variables, read_data=True,
+                             freq_inds=None):
+        """
+        Read all the (selected) records from an open miriad file.
+
+        Uses the bulk reader in the _miriad extension if it is available,
+        otherwise iterates through the records in python.
+
+        Args:
+            uv: aipy_extracts.UV object to read from.
+            source: The source name of the first record. An error is raised
+                if any record has a different source.
+            check_variables: dict of extra miriad variables and their initial
+                values. Variables that change during the file are removed.
+            read_data: Read the visibilities, flags and nsamples. If False,
+                only the record preambles and variables are read, skipping the
+                decoding of the visibilities and the reading of the flags.
+                Default True.
+            freq_inds: Sorted indices of the frequency channels to keep, or None
+                to keep all of them. The channels spanned by the selection must
+                already be selected on uv (with select_channels).
+
+        Returns:
+            dict of per-record arrays with keys 'uvw' (in ns), 'time', 'ant_1',
+            'ant_2', 'data', 'flags' (True where flagged), 'cnt', 'ra', 'dec',
+            'inttime' and 'pol'. 'data', 'flags' and 'cnt' are None if
+            read_data is False.
+        """
+        record_vars = ['pol', 'ra', 'dec', 'inttime', 'source']
+        if 'cnt' in uv.vartable and read_data:
+            record_vars.append('cnt')
+        record_vars += [var for var in check_variables if var not in record_vars]
+
+        if hasattr(uv, 'read_records'):
+            (uvw, t, ant_i, ant_j, data, flags,
+             var_values) = uv.read_records(uv.nchan, [(var, uv.vartable[var])
+                                                      for var in record_vars],
+                                           -1, int(read_data))
+            # single valued variables are returned as scalars by uv[var]
+            for var in record_vars:
+                if not isinstance(var_values[var], list) and var_values[var].shape[1] == 1:
+                    var_values[var] = var_values[var][:, 0]
+        else:
+            uvw, t, ant_i, ant_j, data, flags = [], [], [], [], [], []
+            var_values = dict((var, []) for var in record_vars)
+            # Note that the (i, j) tuple is calculated from a baseline number in
+            # _miriad (see miriad_wrap.h). The i, j values are also adjusted by _miriad
+            # to start at 0 rather than 1.
+            for (rec_uvw, rec_t, (i, j)), d, f in uv.all(raw=True):
+                uvw.append(rec_uvw)
+                t.append(rec_t)
+                ant_i.append(i)
+                ant_j.append(j)
+                data.append(d)
+                flags.append(f)
+                for var in record_vars:
+                    var_values[var].append(uv[var])
+            nchan = len(data[0]) if len(data) > 0 else uv.nchan
+            uvw = np.array(uvw, dtype=np.float64).reshape(-1, 3)
+            data = np.array(data, dtype=np.complex64).reshape(-1, nchan)
+            flags = np.array(flags, dtype=np.bool).reshape(-1, nchan)
+
+        if any(rec_source != source for rec_source in set(var_values['source'])):
+            raise ValueError('This appears to be a multi source file, which is not supported.')
+
+        # check extra variables for changes compared with initial value
+        for extra_variable in list(check_variables.keys()):
+            values = var_values[extra_variable]
+            if len(values) == 0:
+                continue
+            if type(check_variables[extra_variable]) == str:
+                if any(value != check_variables[extra_variable] for value in set(values)):
+                    check_variables.pop(extra_variable)
+            else:
+                if not np.allclose(values, check_variables[extra_variable]):
+                    check_variables.pop(extra_variable)
+
+        if not read_data:
+            data, flags, cnt = None, None, None
+        else:
+            if freq_inds is not None and len(freq_inds) < data.shape[1]:
+                # the selected channels are not contiguous
+                chan_inds = freq_inds - freq_inds[0]
+                data = data[:, chan_inds]
+                flags = flags[:, chan_inds]
+            if 'cnt' in var_values:
+                # cnt always has all the channels in the file
+                cnt = np.asarray(var_values['cnt'], dtype=np.float64).reshape(len(t), -1)
+                if freq_inds is not None:
+                    cnt = cnt[:, freq_inds]
+            else:
+                cnt = np.ones(data.shape, dtype=np.float64)
+
+        return {'uvw': uvw, 'time': np.asarray(t, dtype=np.float64),
+                'ant_1': np.asarray(ant_i, dtype=np.int64),
+                'ant_2': np.asarray(ant_j, dtype=np.int64),
+                'data': data, 'flags': flags, 'cnt': cnt,
+                'ra': np.asarray(var_values['ra'], dtype=np.float64),
+                'dec': np.asarray(var_values['dec'], dtype=np.float64),
+                'inttime': np.asarray(var_values['inttime'], dtype=np.float64),
+                'pol': np.asarray(var_values['pol'], dtype=np.int64)}
+
     def read_miriad(self, filepath, antenna_nums=None, ant_str=None, bls=None,
                     polarizations=None, time_range=None, read_data=True,
                     phase_type=None, correct_lat_lon=True, run_check=True,
-                    check_extra=True, run_check_acceptability=True):
+                    check_extra=True, run_check_acceptability=True,
+                    frequencies=None, freq_chans=None, use_index=True):
         """
         Read in data from a miriad file.
 
@@ -64,7 +181,9 @@ class Miriad(UVData):
             time_range: len-2 list containing min and max range of times (Julian Date) to read-in.
                 Ex: [2458115.20, 2458115.40]
             read_data: Read in the visibility and flag data. If set to false,
-                only the metadata will be read in. Results in an incompletely
+                only the metadata (including times, baselines and uvws) will be
+                read in, from the record preambles without decoding the
+                visibilities or reading the flags. Results in an incompletely
                 defined object (check will not pass). Default True.
             phase_type: Either 'drift' meaning zenith drift, 'phased' meaning
                 the data are phased to a single RA/Dec or None and it will be
@@ -77,6 +196,14 @@ class Miriad(UVData):
                 ones. Default is True.
             run_check_acceptability: Option to check acceptable range of the values of
                 parameters after reading in the file. Default is True.
+            frequencies: The frequencies to read-in. Only the contiguous range of
+                channels spanning the selected frequencies is decoded.
+            freq_chans: The frequency channel numbers to read-in. Only the contiguous
+                range of channels spanning the selected channels is decoded.
+            use_index: Option to use the index file written by write_miriad_index
+                (if it exists and is up to date) to seek straight to the records
+                in time_range rather than scanning the whole file. Only used if
+                time_range is not None. Default is True.
         """
         if not os.path.exists(filepath):
             raise IOError(filepath + ' not found')
@@ -89,6 +216,15 @@ class Miriad(UVData):
         # read through the file and get the data
         _source = uv['source']  # check source of initial visibility
 
+        # Only single spw files are supported (the records are 1 dimensional)
+        self.Nspws = 1
+        self.spw_array = np.arange(self.Nspws)
+        self.freq_array = (np.arange(self.Nfreqs) * self.channel_width
+                           + uv['sfreq'] * 1e9)
+        # Tile freq_array to shape (Nspws, Nfreqs).
+        # Currently does not actually support Nspws>1!
+        self.freq_array = np.tile(self.freq_array, (self.Nspws, 1))
+
         history_update_string = '  Downselected to specific '
         n_selects = 0
 
@@ -161,6 +297,22 @@ class Miriad(UVData):
                 n_selects += 1
             aipy_extracts.uv_selector(uv, antpair_str)
 
+        # select on frequencies. The MIRIAD channel linetype is used to only
+        # decode the contiguous range of channels spanning the selection.
+        freq_inds = None
+        if frequencies is not None or freq_chans is not None:
+            _, freq_inds, _, _ = self._select_preprocess(None, None, None, None,
+                                                         frequencies, freq_chans,
+                                                         None, None, None)
+            uv.select_channels(freq_inds[0], freq_inds[-1] - freq_inds[0] + 1)
+            self.Nfreqs = len(freq_inds)
+            self.freq_array = self.freq_array[:, freq_inds]
+            if n_selects > 0:
+                history_update_string += ', frequencies'
+            else:
+                history_update_string += 'frequencies'
+            n_selects += 1
+
         # select on time range
         if time_range is not None:
             # type check
@@ -208,61 +360,52 @@ class Miriad(UVData):
         if n_selects > 0:
             self.history += history_update_string
 
-        data_accumulator = {}
-        pol_list = []
-        for (uvw, t, (i, j)), d, f in uv.all(raw=True):
-            # control for the case of only a single spw not showing up in
-            # the dimension
-            # Note that the (i, j) tuple is calculated from a baseline number in
-            # _miriad (see miriad_wrap.h). The i, j values are also adjusted by _miriad
-            # to start at 0 rather than 1.
-            if len(d.shape) == 1:
-                d.shape = (1,) + d.shape
-                self.Nspws = d.shape[0]
-                self.spw_array = np.arange(self.Nspws)
-            else:
-                raise ValueError("Sorry.  Files with more than one spectral "
-                                 "window (spw) are not yet supported. A great "
-                                 "project for the interested student!")
-            try:
-                cnt = uv['cnt']
-            except(KeyError):
-                cnt = np.ones(d.shape, dtype=np.float)
-            ra = uv['ra']
-            dec = uv['dec']
-            lst = uv['lst']
-            inttime = uv['inttime']
-            source = uv['source']
-            if source != _source:
-                raise ValueError('This appears to be a multi source file, which is not supported.')
-            else:
-                _source = source
+        if not read_data:
+            run_check = False
 
-            # check extra variables for changes compared with initial value
-            for extra_variable in check_variables.keys():
-                if type(check_variables[extra_variable]) == str:
-                    if uv[extra_variable] != check_variables[extra_variable]:
-                        check_variables.pop(extra_variable)
+        index = None
+        if time_range is not None and use_index:
+            index = self._read_miriad_index(uv, filepath)
+        if index is None:
+            records = self._read_miriad_records(uv, _source, check_variables,
+                                                read_data=read_data, freq_inds=freq_inds)
+        else:
+            # Seek straight to the runs of records with times in the range.
+            # The time select stays on, so the records read are the same as
+            # the ones a full scan would return.
+            tol = self._time_array.tols[1]
+            seg_inds = np.nonzero((index['time'] >= time_range_use[0] - tol)
+                                  & (index['time'] <= time_range_use[1] + tol))[0]
+            n_segs = len(index['time'])
+            run_list = np.split(seg_inds, np.nonzero(np.diff(seg_inds) > 1)[0] + 1)
+            run_records = []
+            for run in run_list:
+                if len(run) == 0:
+                    continue
+                if run[-1] + 1 < n_segs:
+                    end_offset = index['offsets'][run[-1] + 1]
                 else:
-                    if not np.allclose(uv[extra_variable],
-                                       check_variables[extra_variable]):
-                        check_variables.pop(extra_variable)
-
-            try:
-                data_accumulator[uv['pol']].append([uvw, t, i, j, d, f, cnt,
-                                                    ra, dec, inttime])
-            except(KeyError):
-                data_accumulator[uv['pol']] = [[uvw, t, i, j, d, f, cnt,
-                                                ra, dec, inttime]]
-                pol_list.append(uv['pol'])
-                # NB: flag types in miriad are usually ints
-
-        if len(list(data_accumulator.keys())) == 0:
+                    end_offset = -1
+                uv.seek(index['offsets'][run[0]], index['flag_offsets'][run[0]],
+                        index['var_offsets'][run[0]], end_offset)
+                run_records.append(self._read_miriad_records(
+                    uv, _source, check_variables, read_data=read_data,
+                    freq_inds=freq_inds))
+            if len(run_records) == 0:
+                raise ValueError('No data is present, probably as a result of '
+                                 'select on read that excludes all the data')
+            records = {}
+            for key, value in six.iteritems(run_records[0]):
+                if value is None:
+                    records[key] = None
+                else:
+                    records[key] = np.concatenate([rec[key] for rec in run_records])
+        if len(records['time']) == 0:
             raise ValueError('No data is present, probably as a result of '
                              'select on read that excludes all the data')
-
-        for pol, data in data_accumulator.items():
-            data_accumulator[pol] = np.array(data)
+        # polarizations in the order they first appear in the file
+        pol_list, pol_first_ind = np.unique(records['pol'], return_index=True)
+        pol_list = pol_list[np.argsort(pol_first_ind)].tolist()
 
         self.polarization_array = np.array(pol_list)
         if polarizations is None:
@@ -276,43 +419,24 @@ class Miriad(UVData):
         #   data values
         # any missing data will have zeros
 
-        # use set to get the unique list of all times ever listed in the file
-        # iterate over polarizations and all spectra (bls and times) in two
-        # nested loops, then flatten into a single vector, then set
-        # then list again.
-
-        times = list(set(
-            np.concatenate([[k[1] for k in d] for d in data_accumulator.values()])))
-        times = np.sort(times)
-
-        ant_i_unique = list(set(
-            np.concatenate([[k[2] for k in d] for d in data_accumulator.values()])))
-        ant_j_unique = list(set(
-            np.concatenate([[k[3] for k in d] for d in data_accumulator.values()])))
+        # get the unique list of all times and antennas in the file
+        times = np.unique(records['time'])
+        sorted_unique_ants = np.union1d(records['ant_1'], records['ant_2']).tolist()
 
-        sorted_unique_ants = sorted(list(set(ant_i_unique + ant_j_unique)))
-        ant_i_unique = np.array(ant_i_unique)
-        ant_j_unique = np.array(ant_j_unique)
-
-        # Determine maximum digits needed to distinguish different values
-        if sorted_unique_ants[-1] > 0:
-            ndig_ant = np.ceil(np.log10(sorted_unique_ants[-1])).astype(int) + 1
-        else:
-            ndig_ant = 1
-        # Be excessive in precision because we use the floating point values as dictionary keys later
+        # Grid the records along the blt axis numerically: each unique
+        # (time, ant_1, ant_2, inttime) row is a blt, sorted in that order.
+        # Times are rounded well below the tolerance so records of the same
+        # integration (e.g. different polarizations) land in the same blt.
         prec_t = - 2 * np.floor(np.log10(self._time_array.tols[-1])).astype(int)
-        ndig_t = (np.ceil(np.log10(times[-1])).astype(int) + prec_t + 2)
-        blts = []
-        for d in data_accumulator.values():
-            for k in d:
-                blt = ["{1:.{0}f}".format(prec_t, k[1]).zfill(ndig_t),
-                       str(k[2]).zfill(ndig_ant), str(k[3]).zfill(ndig_ant),
-                       str(k[9]).zfill(ndig_t)]
-                blt = "_".join(blt)
-                blts.append(blt)
-        unique_blts = np.unique(np.array(blts))
-
-        reverse_inds = dict(zip(unique_blts, range(len(unique_blts))))
+        blt_keys = np.empty(len(records['time']),
+                            dtype=[('time', np.float64), ('ant_1', np.int64),
+                                   ('ant_2', np.int64), ('inttime', np.float64)])
+        blt_keys['time'] = np.around(records['time'], prec_t)
+        blt_keys['ant_1'] = records['ant_1']
+        blt_keys['ant_2'] = records['ant_2']
+        blt_keys['inttime'] = records['inttime']
+        unique_blts, blt_inds = np.unique(blt_keys, return_inverse=True)
+
         self.Nants_data = len(sorted_unique_ants)
 
         # load antennas and antenna positions using sorted unique ants list
@@ -320,8 +444,10 @@ class Miriad(UVData):
 
         # form up a grid which indexes time and baselines along the 'long'
         # axis of the visdata array
-        tij_grid = np.array([list(map(float, x.split("_"))) for x in unique_blts])
-        t_grid, ant_i_grid, ant_j_grid, int_grid = tij_grid.T
+        t_grid = unique_blts['time']
+        ant_i_grid = unique_blts['ant_1']
+        ant_j_grid = unique_blts['ant_2']
+        int_grid = unique_blts['inttime']
         # set the data sizes
         if antenna_nums is None and bls is None and ant_str is None and time_range is None:
             try:
@@ -370,83 +496,67 @@ class Miriad(UVData):
             self.Nbls = len(np.unique(self.baseline_array))
 
         # slot the data into a grid
-        self.data_array = np.zeros((self.Nblts, self.Nspws, self.Nfreqs,
-                                    self.Npols), dtype=np.complex64)
-        self.flag_array = np.ones(self.data_array.shape, dtype=np.bool)
-        self.uvw_array = np.zeros((self.Nblts, 3))
+        if read_data:
+            self.data_array = np.zeros((self.Nblts, self.Nspws, self.Nfreqs,
+                                        self.Npols), dtype=np.complex64)
+            self.flag_array = np.ones(self.data_array.shape, dtype=np.bool)
+            self.nsample_array = np.ones(self.data_array.shape, dtype=np.float)
         # NOTE: Using our lst calculator, which uses astropy,
         # instead of _miriad values which come from pyephem.
         # The differences are of order 5 seconds.
         if self.telescope_location is not None:
             self.set_lsts_from_time_array()
-        self.nsample_array = np.ones(self.data_array.shape, dtype=np.float)
-        self.freq_array = (np.arange(self.Nfreqs) * self.channel_width
-                           + uv['sfreq'] * 1e9)
-        # Tile freq_array to shape (Nspws, Nfreqs).
-        # Currently does not actually support Nspws>1!
-        self.freq_array = np.tile(self.freq_array, (self.Nspws, 1))
 
         # Temporary arrays to hold polarization axis, which will be collapsed
         ra_pol_list = np.zeros((self.Nblts, self.Npols))
         dec_pol_list = np.zeros((self.Nblts, self.Npols))
         uvw_pol_list = np.zeros((self.Nblts, 3, self.Npols))
         c_ns = const.c.to('m/ns').value
-        for pol, data in data_accumulator.items():
-            pol_ind = self._pol_to_ind(pol)
-            for ind, d in enumerate(data):
-                blt = ["{1:.{0}f}".format(prec_t, d[1]).zfill(ndig_t),
-                       str(d[2]).zfill(ndig_ant), str(d[3]).zfill(ndig_ant),
-                       str(d[9]).zfill(ndig_t)]
-                blt = "_".join(blt)
-                blt_index = reverse_inds[blt]
-
-                self.data_array[blt_index, :, :, pol_ind] = d[4]
-                self.flag_array[blt_index, :, :, pol_ind] = d[5]
-                self.nsample_array[blt_index, :, :, pol_ind] = d[6]
-
-                # because there are uvws/ra/dec for each pol, and one pol may not
-                # have that visibility, we collapse along the polarization
-                # axis but avoid any missing visbilities
-                uvw = d[0] * c_ns
-                uvw.shape = (1, 3)
-                uvw_pol_list[blt_index, :, pol_ind] = uvw
-                ra_pol_list[blt_index, pol_ind] = d[7]
-                dec_pol_list[blt_index, pol_ind] = d[8]
-
-        # Collapse pol axis for ra_list, dec_list, and uvw_list
-        ra_list = np.zeros(self.Nblts)
-        dec_list = np.zeros(self.Nblts)
-        for blt_index in range(self.Nblts):
-            test = ~np.all(self.flag_array[blt_index, :, :, :], axis=(0, 1))
-            good_pol = np.where(test)[0]
-            if len(good_pol) == 1:
-                # Only one good pol, use it
-                self.uvw_array[blt_index, :] = uvw_pol_list[blt_index, :, good_pol]
-                ra_list[blt_index] = ra_pol_list[blt_index, good_pol]
-                dec_list[blt_index] = dec_pol_list[blt_index, good_pol]
-            elif len(good_pol) > 1:
-                # Multiple good pols, check for consistency. pyuvdata does not
-                # support pol-dependent uvw, ra, or dec.
-                if np.any(np.diff(uvw_pol_list[blt_index, :, good_pol], axis=0)):
-                    raise ValueError('uvw values are different by polarization.')
-                else:
-                    self.uvw_array[blt_index, :] = uvw_pol_list[blt_index, :, good_pol[0]]
-                if np.any(np.diff(ra_pol_list[blt_index, good_pol])):
-                    raise ValueError('ra values are different by polarization.')
-                else:
-                    ra_list[blt_index] = ra_pol_list[blt_index, good_pol[0]]
-                if np.any(np.diff(dec_pol_list[blt_index, good_pol])):
-                    raise ValueError('dec values are different by polarization.')
-                else:
-                    dec_list[blt_index] = dec_pol_list[blt_index, good_pol[0]]
-            else:
-                # No good pols for this blt. Fill with first one.
-                self.uvw_array[blt_index, :] = uvw_pol_list[blt_index, :, 0]
-                ra_list[blt_index] = ra_pol_list[blt_index, 0]
-                dec_list[blt_index] = dec_pol_list[blt_index, 0]
+        # each record has exactly one polarization
+        pol_inds = np.nonzero(records['pol'][:, np.newaxis]
+                              == self.polarization_array[np.newaxis, :])[1]
+        # one fancy-index scatter per polarization. Because there are
+        # uvws/ra/dec for each pol, and one pol may not have that visibility,
+        # they are gridded per pol too and collapsed below, avoiding any
+        # missing visibilities.
+        for pol_ind in range(self.Npols):
+            rec_inds = np.nonzero(pol_inds == pol_ind)[0]
+            pol_blt_inds = blt_inds[rec_inds]
+            if read_data:
+                self.data_array[pol_blt_inds, 0, :, pol_ind] = records['data'][rec_inds]
+                self.flag_array[pol_blt_inds, 0, :, pol_ind] = records['flags'][rec_inds]
+                self.nsample_array[pol_blt_inds, 0, :, pol_ind] = records['cnt'][rec_inds]
+            uvw_pol_list[pol_blt_inds, :, pol_ind] = records['uvw'][rec_inds] * c_ns
+            ra_pol_list[pol_blt_inds, pol_ind] = records['ra'][rec_inds]
+            dec_pol_list[pol_blt_inds, pol_ind] = records['dec'][rec_inds]
+
+        # Collapse pol axis for ra_list, dec_list, and uvw_list using the
+        # first good (not fully flagged) pol for each blt. Blts with no good
+        # pols use the first pol (argmax returns 0 for an all-False row).
+        # Without the flags, every pol that has a record is counted as good.
+        if read_data:
+            good_pols = ~np.all(self.flag_array, axis=(1, 2))
+        else:
+            good_pols = np.zeros((self.Nblts, self.Npols), dtype=np.bool)
+            good_pols[blt_inds, pol_inds] = True
+        first_good_pol = np.argmax(good_pols, axis=1)
+        blt_range = np.arange(self.Nblts)
+        self.uvw_array = uvw_pol_list[blt_range, :, first_good_pol]
+        ra_list = ra_pol_list[blt_range, first_good_pol]
+        dec_list = dec_pol_list[blt_range, first_good_pol]
+
+        # Check all good pols for consistency. pyuvdata does not
+        # support pol-dependent uvw, ra, or dec.
+        if np.any((uvw_pol_list != self.uvw_array[:, :, np.newaxis])
+                  & good_pols[:, np.newaxis, :]):
+            raise ValueError('uvw values are different by polarization.')
+        if np.any((ra_pol_list != ra_list[:, np.newaxis]) & good_pols):
+            raise ValueError('ra values are different by polarization.')
+        if np.any((dec_pol_list != dec_list[:, np.newaxis]) & good_pols):
+            raise ValueError('dec values are different by polarization.')
 
         # get unflagged blts
-        blt_good = np.where(~np.all(self.flag_array, axis=(1, 2, 3)))
+        blt_good = np.where(np.any(good_pols, axis=1))
         single_ra = np.isclose(np.mean(np.diff(ra_list[blt_good])), 0.)
         single_time = np.isclose(np.mean(np.diff(self.time_array[blt_good])), 0.)
 
@@ -520,7 +630,7 @@ class Miriad(UVData):
 
     def write_miriad(self, filepath, run_check=True, check_extra=True,
                      run_check_acceptability=True,
-                     clobber=False, no_antnums=False):
+                     clobber=False, no_antnums=False, write_index=False):
         """
         Write the data to a miriad file.
 
@@ -536,6 +646,9 @@ class Miriad(UVData):
                 Default is False.
             no_antnums: Option to not write the antnums variable to the file.
                 Should only be used for testing purposes.
+            write_index: Option to also write an index file to speed up reads of
+                time ranges, see write_miriad_index. When clobbering, any index
+                file of the overwritten file is removed regardless. Default is False.
         """
         # change time_array and lst_array to mark beginning of integration, per Miriad format
         miriad_time_array = self.time_array - self.integration_time / (24 * 3600.) / 2
@@ -557,6 +670,10 @@ class Miriad(UVData):
                 shutil.rmtree(filepath)
             else:
                 raise ValueError('File exists: skipping')
+        # an index file left from the file being overwritten is out of date,
+        # it is only rewritten if write_index is True
+        if clobber and os.path.exists(_miriad_index_path(filepath)):
+            os.remove(_miriad_index_path(filepath))
 
         if self.Nfreqs > 1:
             freq_spacing = self.freq_array[0, 1:] - self.freq_array[0, :-1]
@@ -764,39 +881,122 @@ class Miriad(UVData):
         uv.add_var('dec', 'd')
         uv.add_var('inttime', 'd')
 
-        # write data
+        # write data, one record per baseline-time and polarization
+        # NOTE only writing spw 0, not supporting multiple spws for write
+        # (use the array shapes, which may differ from e.g. Nblts if run_check is False)
+        nblts, _, nfreqs, _ = self.data_array.shape
+        npols = len(self.polarization_array)
+        if self.phase_type == 'phased':
+            ra = np.full(nblts, self.phase_center_ra, dtype=np.double)
+            dec = np.full(nblts, self.phase_center_dec, dtype=np.double)
+        elif self.phase_type == 'drift':
+            ra = miriad_lsts.astype(np.double)
+            dec = np.full(nblts, self.telescope_location_lat_lon_alt[0], dtype=np.double)
+        else:
+            raise ValueError('The phasing type of the data is unknown. '
+                             'Set the phase_type to "drift" or "phased" to '
+                             'reflect the phasing status of the data')
+
         c_ns = const.c.to('m/ns').value
-        for viscnt, blt in enumerate(self.data_array):
-            uvw = (self.uvw_array[viscnt] / c_ns).astype(np.double)
-            t = miriad_time_array[viscnt]
-            i = self.ant_1_array[viscnt]
-            j = self.ant_2_array[viscnt]
-
-            uv['lst'] = miriad_lsts[viscnt].astype(np.double)
-            uv['inttime'] = self.integration_time[viscnt].astype(np.double)
-            if self.phase_type == 'phased':
-                uv['ra'] = self.phase_center_ra
-                uv['dec'] = self.phase_center_dec
-            elif self.phase_type == 'drift':
-                uv['ra'] = miriad_lsts[viscnt].astype(np.double)
-                uv['dec'] = self.telescope_location_lat_lon_alt[0].astype(np.double)
-            else:
-                raise ValueError('The phasing type of the data is unknown. '
-                                 'Set the phase_type to "drift" or "phased" to '
-                                 'reflect the phasing status of the data')
+        uvw = np.repeat(self.uvw_array / c_ns, npols, axis=0).astype(np.double)
+        t = np.repeat(miriad_time_array, npols)
+        ant_1 = np.repeat(self.ant_1_array, npols)
+        ant_2 = np.repeat(self.ant_2_array, npols)
+        pol = np.tile(self.polarization_array, nblts)
+        lst = np.repeat(miriad_lsts, npols)
+        inttime = np.repeat(self.integration_time, npols)
+        ra = np.repeat(ra, npols)
+        dec = np.repeat(dec, npols)
+        # (Nblts, Nfreqs, Npols) -> (Nblts * Npols, Nfreqs)
+        cnt = np.swapaxes(self.nsample_array[:, 0, :, :], 1, 2).reshape(-1, nfreqs)
+        data = np.swapaxes(self.data_array[:, 0, :, :], 1, 2).reshape(-1, nfreqs)
+        flags = np.swapaxes(self.flag_array[:, 0, :, :], 1, 2).reshape(-1, nfreqs)
+
+        # miriad records have ant_1 <= ant_2, conjugate the data otherwise
+        conj = ant_1 > ant_2
+        if np.any(conj):
+            ant_1, ant_2 = np.where(conj, ant_2, ant_1), np.where(conj, ant_1, ant_2)
+            data = np.where(conj[:, np.newaxis], np.conjugate(data), data)
+
+        if hasattr(uv, 'write_records'):
+            uv.write_records(uvw, t, ant_1, ant_2, pol, lst, inttime, ra, dec,
+                             cnt, data.astype(np.complex64), flags)
+        else:
+            for rec in range(len(t)):
+                uv['lst'] = lst[rec].astype(np.double)
+                uv['inttime'] = inttime[rec].astype(np.double)
+                uv['ra'] = ra[rec]
+                uv['dec'] = dec[rec]
+                uv['pol'] = pol[rec].astype(np.int)
+                uv['cnt'] = cnt[rec].astype(np.double)
+                preamble = (uvw[rec], t[rec], (ant_1[rec], ant_2[rec]))
+                uv.write(preamble, data[rec], flags[rec])
+
+        if write_index:
+            # close the file before indexing it
+            del(uv)
+            self.write_miriad_index(filepath)
+
+    def write_miriad_index(self, filepath):
+        """
+        Write an index file for a miriad file, to speed up reads of time ranges.
 
-            # NOTE only writing spw 0, not supporting multiple spws for write
-            for polcnt, pol in enumerate(self.polarization_array):
-                uv['pol'] = pol.astype(np.int)
-                uv['cnt'] = self.nsample_array[viscnt, 0, :, polcnt].astype(np.double)
+        The index records the position in the file of the first record of each
+        time (and the state of the miriad variables there), so that
+        read_miriad can seek straight to the requested times. It is written
+        next to the miriad file directory, as <filepath>.index.npy, and is
+        ignored by read_miriad once the miriad file is modified.
 
-                data = self.data_array[viscnt, 0, :, polcnt]
-                flags = self.flag_array[viscnt, 0, :, polcnt]
-                if i > j:
-                    i, j, data = j, i, np.conjugate(data)
-                preamble = (uvw, t, (i, j))
+        Args:
+            filepath: The miriad file directory to index.
+        """
+        if not os.path.exists(filepath):
+            raise IOError(filepath + ' not found')
+        uv = aipy_extracts.UV(filepath)
+        if not hasattr(uv, 'build_index'):
+            raise NotImplementedError('Writing miriad index files requires the '
+                                      'build_index method of the _miriad extension.')
+        offsets, flag_offsets, time, checkpoints, var_offsets = uv.build_index()
+        del(uv)
+
+        # A single int64 array (so it loads quickly): the first row is the
+        # stamp, the others hold the stream and flag offsets, the time (as its
+        # bits) and the variable offsets of the first record of each time.
+        n_segs = len(checkpoints)
+        index = np.zeros((n_segs + 1, 4 + 2 * var_offsets.shape[1]), dtype=np.int64)
+        index[0, :3] = _miriad_index_stamp(filepath)
+        index[1:, 0] = offsets[checkpoints]
+        index[1:, 1:3] = flag_offsets[checkpoints]
+        index[1:, 3] = time[checkpoints].astype(np.float64).view(np.int64)
+        index[1:, 4:] = var_offsets.reshape(n_segs, -1)
+        np.save(_miriad_index_path(filepath), index)
+
+    def _read_miriad_index(self, uv, filepath):
+        """
+        Read the index file written by write_miriad_index for a miriad file.
 
-                uv.write(preamble, data, flags)
+        Args:
+            uv: aipy_extracts.UV object of the open miriad file.
+            filepath: The miriad file directory.
+
+        Returns:
+            dict with the positions ('offsets', 'flag_offsets' and
+            'var_offsets') and the 'time' of the first record of each time in
+            the file, or None if there is no usable index.
+        """
+        index_file = _miriad_index_path(filepath)
+        if not os.path.exists(index_file) or not hasattr(uv, 'seek'):
+            return None
+        index = np.load(index_file)
+        nvar = len(uv.vartable)
+        if (np.array_equal(index[0, :3], _miriad_index_stamp(filepath))
+                and index.shape[1] == 4 + 2 * nvar):
+            return {'offsets': index[1:, 0], 'flag_offsets': index[1:, 1:3],
+                    'time': index[1:, 3].view(np.float64),
+                    'var_offsets': index[1:, 4:].reshape(-1, nvar, 2)}
+        warnings.warn('The index file {f} is out of date, ignoring it. '
+                      'Rewrite it with write_miriad_index.'.format(f=index_file))
+        return None
 
     def read_miriad_metadata(self, filename, correct_lat_lon=True):
         """
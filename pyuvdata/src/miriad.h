@@ -225,6 +225,9 @@ void uvselect_c (int tno, Const char *object, double p1, double p2, int datasel)
 void uvset_c    (int tno, Const char *object, Const char *type, int n, double p1, double p2, double p3);
 void uvread_c   (int tno, double *preamble, float *data, int *flags, int n, int *nread);
 void uvwread_c  (int tno, float *data, int *flags, int n, int *nread);
+void uvreadpre_c(int tno, double *preamble, int *nread);
+void uvgetstate_c(int tno, off64_t *offset, off64_t *flag_offsets, int *nvar, off64_t *var_offsets);
+void uvsetstate_c(int tno, off64_t offset, Const off64_t *flag_offsets, int nvar, Const off64_t *var_offsets, off64_t max_offset);
 void uvflgwr_c  (int tno, Const int *flags);
 void uvwflgwr_c (int tno, Const int *flags);
 void uvinfo_c   (int tno, Const char *object, double *data);
@@ -1,6 +1,7 @@
 #include <Python.h>
 #include "numpy/arrayobject.h"
 #include <string>
+#include <vector>
 #include "aipy_compat.h"
 #include "miriad_wrap.h"
 
@@ -139,6 +140,377 @@ PyObject * UVObject_read(UVObject *self, PyObject *args) {
     return rv;
 }
 
+/* Read many records in one call, returning numpy arrays instead of one tuple
+ * per record.  Reads up to nrecords records (all remaining records if
+ * nrecords < 0), honoring the decimation set with _select.  The variables in
+ * vars (a sequence of (name, type) pairs) are read after every record and
+ * returned in a dict with one row per record; string ('a') variables are
+ * returned as lists (consecutive records share the same string object).
+ * If read_data is 0 only the preambles are read (with uvreadpre_c) and the
+ * data and flags are returned with no channels.
+ */
+#define READ_RECORDS_FAIL \
+    for (i=0; i < nvars; i++) Py_XDECREF(var_lists[i]); \
+    return NULL;
+
+PyObject * UVObject_read_records(UVObject *self, PyObject *args) {
+    PyObject *vars, *var_seq, *item, *rv, *var_dict, *val;
+    PyArrayObject *uvw, *t, *ant_i, *ant_j, *data, *flags, *arr;
+    int n2read, nrecords=-1, read_data=1, nread, nchan=-1, length, updated, i;
+    npy_intp nrec=0, n, k;
+    double preamble[PREAMBLE_SIZE];
+    char *name, *type, vtype, value[MAXVAR];
+    if (!PyArg_ParseTuple(args, "iO|ii", &n2read, &vars, &nrecords, &read_data)) return NULL;
+    if (n2read <= 0) {
+        PyErr_Format(PyExc_ValueError, "number of channels to read must be positive");
+        return NULL;
+    }
+    var_seq = PySequence_Fast(vars, "vars must be a sequence of (name, type) pairs");
+    if (var_seq == NULL) return NULL;
+    Py_ssize_t nvars = PySequence_Fast_GET_SIZE(var_seq);
+    std::vector<std::string> var_names(nvars);
+    std::vector<char> var_types(nvars);
+    std::vector<int> var_sizes(nvars), var_lengths(nvars, -1);
+    std::vector<std::vector<char> > var_bufs(nvars);
+    std::vector<PyObject *> var_lists(nvars, (PyObject *)NULL);
+    std::vector<PyObject *> var_last(nvars, (PyObject *)NULL);
+    for (i=0; i < nvars; i++) {
+        item = PySequence_Fast_GET_ITEM(var_seq, i);
+        if (!PyArg_ParseTuple(item, "ss", &name, &type)) {
+            Py_DECREF(var_seq);
+            return NULL;
+        }
+        var_names[i] = name;
+        var_types[i] = type[0];
+        switch (type[0]) {
+            case 'a': var_sizes[i] = 1; break;
+            case 'j': var_sizes[i] = sizeof(int); break;  // returned as int32
+            case 'i': var_sizes[i] = H_INT_SIZE; break;
+            case 'r': var_sizes[i] = H_REAL_SIZE; break;
+            case 'd': var_sizes[i] = H_DBLE_SIZE; break;
+            case 'c': var_sizes[i] = H_CMPLX_SIZE; break;
+            default:
+                PyErr_Format(PyExc_ValueError, "unknown type of UV variable \"%s\": %c", name, type[0]);
+                Py_DECREF(var_seq);
+                return NULL;
+        }
+    }
+    Py_DECREF(var_seq);
+
+    std::vector<double> pre_buf;
+    std::vector<float> data_buf;
+    std::vector<int> flag_buf;
+    std::vector<float> rec_data(2 * n2read);
+    std::vector<int> rec_flags(n2read);
+    if (nrecords > 0) {
+        pre_buf.reserve((size_t) nrecords * PREAMBLE_SIZE);
+    }
+    if (nrecords > 0 && read_data) {
+        data_buf.reserve((size_t) nrecords * 2 * n2read);
+        flag_buf.reserve((size_t) nrecords * n2read);
+    }
+    for (i=0; i < nvars; i++) {
+        if (var_types[i] == 'a') {
+            var_lists[i] = PyList_New(0);
+            if (var_lists[i] == NULL) {
+                READ_RECORDS_FAIL
+            }
+        }
+    }
+
+    try {
+        while (nrecords < 0 || nrec < nrecords) {
+            while (1) {
+                if (read_data) {
+                    uvread_c(self->tno, preamble, &rec_data[0], &rec_flags[0], n2read, &nread);
+                } else {
+                    uvreadpre_c(self->tno, preamble, &nread);
+                }
+                if (preamble[3] != self->curtime) {
+                    self->intcnt += 1;
+                    self->curtime = preamble[3];
+                }
+                if ((self->intcnt-self->decphase) % self->decimate == 0 || nread==0) {
+                    break;
+                }
+            }
+            if (nread == 0) break;
+            if (!read_data) {
+                nchan = 0;
+            } else if (nchan < 0) {
+                nchan = nread;
+            } else if (nread != nchan) {
+                PyErr_Format(PyExc_ValueError, "records have different numbers of channels");
+                READ_RECORDS_FAIL
+            }
+            pre_buf.insert(pre_buf.end(), preamble, preamble + PREAMBLE_SIZE);
+            if (read_data) {
+                data_buf.insert(data_buf.end(), rec_data.begin(), rec_data.begin() + 2 * nread);
+                flag_buf.insert(flag_buf.end(), rec_flags.begin(), rec_flags.begin() + nread);
+            }
+
+            for (i=0; i < nvars; i++) {
+                name = (char *) var_names[i].c_str();
+                uvprobvr_c(self->tno, name, &vtype, &length, &updated);
+                if (var_types[i] == 'a') {
+                    if (updated || var_last[i] == NULL) {
+                        if (length + 1 > MAXVAR) {
+                            PyErr_Format(PyExc_ValueError, "UV variable \"%s\" too big for pyuvdata's "
+                                         "internal buffers", name);
+                            READ_RECORDS_FAIL
+                        }
+                        uvgetvr_c(self->tno, H_BYTE, name, value, length + 1);
+                        val = PyString_FromStringAndSize(value, length);
+                        if (val == NULL) {
+                            READ_RECORDS_FAIL
+                        }
+                        // the list holds the reference
+                        if (PyList_Append(var_lists[i], val) < 0) {
+                            Py_DECREF(val);
+                            READ_RECORDS_FAIL
+                        }
+                        Py_DECREF(val);
+                        var_last[i] = val;
+                    } else if (PyList_Append(var_lists[i], var_last[i]) < 0) {
+                        READ_RECORDS_FAIL
+                    }
+                    continue;
+                }
+                if (var_lengths[i] < 0) {
+                    var_lengths[i] = length;
+                } else if (length != var_lengths[i]) {
+                    PyErr_Format(PyExc_ValueError, "UV variable \"%s\" changed length "
+                                 "between records", name);
+                    READ_RECORDS_FAIL
+                }
+                if (length * var_sizes[i] > MAXVAR) {
+                    PyErr_Format(PyExc_ValueError, "UV variable \"%s\" too big for pyuvdata's "
+                                 "internal buffers", name);
+                    READ_RECORDS_FAIL
+                }
+                switch (var_types[i]) {
+                    case 'j':
+                        uvgetvr_c(self->tno, H_INT2, name, value, length);
+                        for (k=length-1; k >= 0; k--)
+                            ((int *)value)[k] = ((short *)value)[k];
+                        break;
+                    case 'i': uvgetvr_c(self->tno, H_INT, name, value, length); break;
+                    case 'r': uvgetvr_c(self->tno, H_REAL, name, value, length); break;
+                    case 'd': uvgetvr_c(self->tno, H_DBLE, name, value, length); break;
+                    case 'c': uvgetvr_c(self->tno, H_CMPLX, name, value, length); break;
+                }
+                var_bufs[i].insert(var_bufs[i].end(), value, value + length * var_sizes[i]);
+            }
+            nrec++;
+        }
+    } catch (MiriadError &e) {
+        PyErr_Format(PyExc_RuntimeError, "%s", e.get_message());
+        READ_RECORDS_FAIL
+    }
+    if (nchan < 0) nchan = n2read;
+
+    // Copy the buffers into numpy arrays
+    npy_intp vec_dims[1] = {nrec};
+    npy_intp uvw_dims[2] = {nrec, 3};
+    npy_intp data_dims[2] = {nrec, nchan};
+    uvw = (PyArrayObject *) PyArray_SimpleNew(2, uvw_dims, NPY_DOUBLE);
+    t = (PyArrayObject *) PyArray_SimpleNew(1, vec_dims, NPY_DOUBLE);
+    ant_i = (PyArrayObject *) PyArray_SimpleNew(1, vec_dims, NPY_INT);
+    ant_j = (PyArrayObject *) PyArray_SimpleNew(1, vec_dims, NPY_INT);
+    data = (PyArrayObject *) PyArray_SimpleNew(2, data_dims, NPY_CFLOAT);
+    flags = (PyArrayObject *) PyArray_SimpleNew(2, data_dims, NPY_BOOL);
+    var_dict = PyDict_New();
+    if (uvw == NULL || t == NULL || ant_i == NULL || ant_j == NULL || data == NULL
+            || flags == NULL || var_dict == NULL) {
+        Py_XDECREF(uvw); Py_XDECREF(t); Py_XDECREF(ant_i); Py_XDECREF(ant_j);
+        Py_XDECREF(data); Py_XDECREF(flags); Py_XDECREF(var_dict);
+        PyErr_Format(PyExc_MemoryError, "Failed to allocate record arrays");
+        READ_RECORDS_FAIL
+    }
+    for (n=0; n < nrec; n++) {
+        const double *p = &pre_buf[n * PREAMBLE_SIZE];
+        IND2(uvw,n,0,double) = p[0];
+        IND2(uvw,n,1,double) = p[1];
+        IND2(uvw,n,2,double) = p[2];
+        IND1(t,n,double) = p[3];
+        IND1(ant_i,n,int) = GETI(p[4]);
+        IND1(ant_j,n,int) = GETJ(p[4]);
+    }
+    if (nrec > 0 && nchan > 0) {
+        memcpy(PyArray_DATA(data), &data_buf[0], sizeof(float) * 2 * nrec * nchan);
+        // MIRIAD flags are 1 where the data are good, invert to numpy's convention
+        npy_bool *fl = (npy_bool *) PyArray_DATA(flags);
+        for (n=0; n < nrec * nchan; n++) fl[n] = (flag_buf[n] == 0);
+    }
+
+    for (i=0; i < nvars; i++) {
+        if (var_types[i] == 'a') {
+            val = var_lists[i];
+            var_lists[i] = NULL;
+        } else {
+            npy_intp var_dims[2] = {nrec, var_lengths[i] < 0 ? 0 : var_lengths[i]};
+            int npy_type;
+            switch (var_types[i]) {
+                case 'j': case 'i': npy_type = NPY_INT; break;
+                case 'r': npy_type = NPY_FLOAT; break;
+                case 'd': npy_type = NPY_DOUBLE; break;
+                default: npy_type = NPY_CFLOAT; break;
+            }
+            arr = (PyArrayObject *) PyArray_SimpleNew(2, var_dims, npy_type);
+            if (arr != NULL && var_bufs[i].size() > 0)
+                memcpy(PyArray_DATA(arr), &var_bufs[i][0], var_bufs[i].size());
+            val = (PyObject *) arr;
+        }
+        if (val == NULL || PyDict_SetItemString(var_dict, var_names[i].c_str(), val) < 0) {
+            Py_XDECREF(val);
+            Py_DECREF(uvw); Py_DECREF(t); Py_DECREF(ant_i); Py_DECREF(ant_j);
+            Py_DECREF(data); Py_DECREF(flags); Py_DECREF(var_dict);
+            READ_RECORDS_FAIL
+        }
+        Py_DECREF(val);
+    }
+
+    rv = Py_BuildValue("(OOOOOOO)", (PyObject *)uvw, (PyObject *)t, (PyObject *)ant_i,
+                       (PyObject *)ant_j, (PyObject *)data, (PyObject *)flags, var_dict);
+    Py_DECREF(uvw); Py_DECREF(t); Py_DECREF(ant_i); Py_DECREF(ant_j);
+    Py_DECREF(data); Py_DECREF(flags); Py_DECREF(var_dict);
+    return rv;
+}
+
+#undef READ_RECORDS_FAIL
+
+/* Build an index of the records that can be used to seek to them.  Scans the
+ * preambles of all the records from the start of the file (the file should
+ * have no selections set) and rewinds it.  Returns (offsets, flag_offsets, t,
+ * checkpoints, var_offsets) where offsets (nrec,) and flag_offsets (nrec,2)
+ * give the position in the data stream of each record, t is the time of each
+ * record, checkpoints are the indices of the records where the time changes
+ * and var_offsets (ncheckpoints,nvar,2) give the state of the variables
+ * before each checkpoint record.  These can be passed to seek().
+ */
+PyObject * UVObject_build_index(UVObject *self) {
+    std::vector<npy_int64> offsets, flag_offsets, checkpoints, var_offsets;
+    std::vector<double> times;
+    std::vector<off64_t> state;
+    off64_t offset, flag_offset[2];
+    double preamble[PREAMBLE_SIZE];
+    int nread, nvar=0, state_nvar;
+    npy_intp nrec, ncheck, i;
+    PyArrayObject *arrs[5];
+    try {
+        uvrewind_c(self->tno);
+        uvgetstate_c(self->tno, &offset, flag_offset, &nvar, NULL);
+        state.resize(2 * nvar);
+        while (1) {
+            state_nvar = nvar;
+            uvgetstate_c(self->tno, &offset, flag_offset, &state_nvar, &state[0]);
+            if (state_nvar != nvar) {
+                PyErr_Format(PyExc_RuntimeError, "number of variables changed while indexing");
+                return NULL;
+            }
+            uvreadpre_c(self->tno, preamble, &nread);
+            if (nread == 0) break;
+            if (times.empty() || preamble[3] != times.back()) {
+                checkpoints.push_back(times.size());
+                var_offsets.insert(var_offsets.end(), state.begin(), state.end());
+            }
+            offsets.push_back(offset);
+            flag_offsets.push_back(flag_offset[0]);
+            flag_offsets.push_back(flag_offset[1]);
+            times.push_back(preamble[3]);
+        }
+        uvrewind_c(self->tno);
+    } catch (MiriadError &e) {
+        PyErr_Format(PyExc_RuntimeError, "%s", e.get_message());
+        return NULL;
+    }
+    self->intcnt = -1;
+    self->curtime = -1;
+
+    nrec = times.size();
+    ncheck = checkpoints.size();
+    npy_intp vec_dims[1] = {nrec};
+    npy_intp flag_dims[2] = {nrec, 2};
+    npy_intp check_dims[1] = {ncheck};
+    npy_intp var_dims[3] = {ncheck, nvar, 2};
+    arrs[0] = (PyArrayObject *) PyArray_SimpleNew(1, vec_dims, NPY_INT64);
+    arrs[1] = (PyArrayObject *) PyArray_SimpleNew(2, flag_dims, NPY_INT64);
+    arrs[2] = (PyArrayObject *) PyArray_SimpleNew(1, vec_dims, NPY_DOUBLE);
+    arrs[3] = (PyArrayObject *) PyArray_SimpleNew(1, check_dims, NPY_INT64);
+    arrs[4] = (PyArrayObject *) PyArray_SimpleNew(3, var_dims, NPY_INT64);
+    for (i=0; i < 5; i++) {
+        if (arrs[i] == NULL) {
+            for (i=0; i < 5; i++) Py_XDECREF(arrs[i]);
+            PyErr_Format(PyExc_MemoryError, "Failed to allocate index arrays");
+            return NULL;
+        }
+    }
+    if (nrec > 0) {
+        memcpy(PyArray_DATA(arrs[0]), &offsets[0], sizeof(npy_int64) * nrec);
+        memcpy(PyArray_DATA(arrs[1]), &flag_offsets[0], sizeof(npy_int64) * 2 * nrec);
+        memcpy(PyArray_DATA(arrs[2]), &times[0], sizeof(double) * nrec);
+        memcpy(PyArray_DATA(arrs[3]), &checkpoints[0], sizeof(npy_int64) * ncheck);
+        if (nvar > 0)
+            memcpy(PyArray_DATA(arrs[4]), &var_offsets[0], sizeof(npy_int64) * ncheck * nvar * 2);
+    }
+    PyObject *rv = Py_BuildValue("(OOOOO)", arrs[0], arrs[1], arrs[2], arrs[3], arrs[4]);
+    for (i=0; i < 5; i++) Py_DECREF(arrs[i]);
+    return rv;
+}
+
+/* Seek to a record using the state returned by build_index(), so that the
+ * next read returns that record.  The data stream is treated as ending at
+ * end_offset (the end of the file if negative); seek to a record with
+ * end_offset < 0 to undo this.
+ */
+PyObject * UVObject_seek(UVObject *self, PyObject *args) {
+    long long offset, end_offset=-1;
+    PyObject *flag_obj, *var_obj;
+    PyArrayObject *flag_arr, *var_arr;
+    if (!PyArg_ParseTuple(args, "LOO|L", &offset, &flag_obj, &var_obj, &end_offset)) return NULL;
+    flag_arr = (PyArrayObject *) PyArray_FROM_OTF(flag_obj, NPY_INT64,
+                                                  NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    if (flag_arr == NULL) return NULL;
+    var_arr = (PyArrayObject *) PyArray_FROM_OTF(var_obj, NPY_INT64,
+                                                 NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+    if (var_arr == NULL) {
+        Py_DECREF(flag_arr);
+        return NULL;
+    }
+    if (PyArray_SIZE(flag_arr) != 2 || PyArray_NDIM(var_arr) != 2 || PyArray_DIM(var_arr, 1) != 2) {
+        PyErr_Format(PyExc_ValueError, "flag_offsets must have 2 elements and var_offsets "
+                     "must have shape (nvar, 2)");
+        Py_DECREF(flag_arr); Py_DECREF(var_arr);
+        return NULL;
+    }
+    npy_intp nvar = PyArray_DIM(var_arr, 0);
+    const npy_int64 *flags_in = (const npy_int64 *) PyArray_DATA(flag_arr);
+    const npy_int64 *vars_in = (const npy_int64 *) PyArray_DATA(var_arr);
+    std::vector<off64_t> flag_offsets(flags_in, flags_in + 2);
+    std::vector<off64_t> var_offsets(vars_in, vars_in + 2 * nvar);
+    Py_DECREF(flag_arr);
+    Py_DECREF(var_arr);
+    int cur_nvar = 0;
+    off64_t cur_offset, cur_flag_offsets[2];
+    uvgetstate_c(self->tno, &cur_offset, cur_flag_offsets, &cur_nvar, NULL);
+    if (nvar != cur_nvar) {
+        PyErr_Format(PyExc_ValueError, "var_offsets has %d variables but the file has %d",
+                     (int) nvar, cur_nvar);
+        return NULL;
+    }
+    try {
+        uvsetstate_c(self->tno, (off64_t) offset, &flag_offsets[0], (int) nvar,
+                     nvar > 0 ? &var_offsets[0] : NULL, (off64_t) end_offset);
+    } catch (MiriadError &e) {
+        PyErr_Format(PyExc_RuntimeError, "%s", e.get_message());
+        return NULL;
+    }
+    self->intcnt = -1;
+    self->curtime = -1;
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
 /* Wrapper over uvwrite_c to deal with numpy arrays, conversion of baseline
  * codes, and accepts preamble as a tuple.
  */
@@ -184,6 +556,89 @@ PyObject * UVObject_write(UVObject *self, PyObject *args) {
     return Py_None;
 }
 
+/* Write many records in one call.  Takes arrays with one entry (or row) per
+ * record: uvw (nrec,3), t, ant_i, ant_j, pol, lst, inttime, ra, dec (nrec,),
+ * cnt, data and flags (nrec,nchan), where flags are True where the data are
+ * flagged (numpy's convention).  The per-record variables pol, lst, cnt, ra,
+ * dec and inttime must have been added to the vartable already.
+ */
+PyObject * UVObject_write_records(UVObject *self, PyObject *args) {
+    PyObject *in_objs[12];
+    PyArrayObject *arrs[12] = {NULL};
+    const int types[12] = {NPY_DOUBLE, NPY_DOUBLE, NPY_INT, NPY_INT, NPY_INT,
+                           NPY_DOUBLE, NPY_DOUBLE, NPY_DOUBLE, NPY_DOUBLE,
+                           NPY_DOUBLE, NPY_CFLOAT, NPY_BOOL};
+    const int ranks[12] = {2, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2};
+    double preamble[PREAMBLE_SIZE];
+    npy_intp nrec, nchan, n, k;
+    int a, ok = 1;
+    if (!PyArg_ParseTuple(args, "OOOOOOOOOOOO", &in_objs[0], &in_objs[1], &in_objs[2],
+                          &in_objs[3], &in_objs[4], &in_objs[5], &in_objs[6], &in_objs[7],
+                          &in_objs[8], &in_objs[9], &in_objs[10], &in_objs[11]))
+        return NULL;
+    for (a=0; a < 12; a++) {
+        arrs[a] = (PyArrayObject *) PyArray_FROM_OTF(in_objs[a], types[a],
+                                                    NPY_ARRAY_IN_ARRAY | NPY_ARRAY_FORCECAST);
+        if (arrs[a] == NULL || RANK(arrs[a]) != ranks[a]) {
+            ok = 0;
+            break;
+        }
+    }
+    if (ok) {
+        nrec = DIM(arrs[0], 0);
+        nchan = DIM(arrs[10], 1);
+        ok = (DIM(arrs[0], 1) == 3);
+        for (a=0; a < 12; a++) ok = ok && (DIM(arrs[a], 0) == nrec);
+        for (a=9; a < 12; a++) ok = ok && (DIM(arrs[a], 1) == nchan);
+    }
+    if (!ok) {
+        for (a=0; a < 12; a++) Py_XDECREF(arrs[a]);
+        if (!PyErr_Occurred())
+            PyErr_Format(PyExc_ValueError, "uvw must have shape (nrec,3), cnt, data and flags "
+                         "must have shape (nrec,nchan) and all other arrays shape (nrec,)");
+        return NULL;
+    }
+    double *uvw = (double *) PyArray_DATA(arrs[0]);
+    double *t = (double *) PyArray_DATA(arrs[1]);
+    int *ant_i = (int *) PyArray_DATA(arrs[2]);
+    int *ant_j = (int *) PyArray_DATA(arrs[3]);
+    int *pol = (int *) PyArray_DATA(arrs[4]);
+    double *lst = (double *) PyArray_DATA(arrs[5]);
+    double *inttime = (double *) PyArray_DATA(arrs[6]);
+    double *ra = (double *) PyArray_DATA(arrs[7]);
+    double *dec = (double *) PyArray_DATA(arrs[8]);
+    double *cnt = (double *) PyArray_DATA(arrs[9]);
+    float *data = (float *) PyArray_DATA(arrs[10]);
+    npy_bool *flags = (npy_bool *) PyArray_DATA(arrs[11]);
+    std::vector<int> rec_flags(nchan > 0 ? nchan : 1);
+    try {
+        for (n=0; n < nrec; n++) {
+            preamble[0] = uvw[3 * n];
+            preamble[1] = uvw[3 * n + 1];
+            preamble[2] = uvw[3 * n + 2];
+            preamble[3] = t[n];
+            preamble[4] = MKBL(ant_i[n], ant_j[n]);
+            // same order as setting the variables record by record in python
+            uvputvr_c(self->tno, H_DBLE, "lst", (char *) &lst[n], 1);
+            uvputvr_c(self->tno, H_DBLE, "inttime", (char *) &inttime[n], 1);
+            uvputvr_c(self->tno, H_DBLE, "ra", (char *) &ra[n], 1);
+            uvputvr_c(self->tno, H_DBLE, "dec", (char *) &dec[n], 1);
+            uvputvr_c(self->tno, H_INT, "pol", (char *) &pol[n], 1);
+            uvputvr_c(self->tno, H_DBLE, "cnt", (char *) &cnt[n * nchan], nchan);
+            // MIRIAD flags are 1 where the data are good
+            for (k=0; k < nchan; k++) rec_flags[k] = !flags[n * nchan + k];
+            uvwrite_c(self->tno, preamble, &data[2 * n * nchan], &rec_flags[0], nchan);
+        }
+    } catch (MiriadError &e) {
+        for (a=0; a < 12; a++) Py_DECREF(arrs[a]);
+        PyErr_Format(PyExc_RuntimeError, "%s", e.get_message());
+        return NULL;
+    }
+    for (a=0; a < 12; a++) Py_DECREF(arrs[a]);
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
 // A thin wrapper over uvcopyvr_c
 PyObject * UVObject_copyvr(UVObject *self, PyObject *args) {
     UVObject *uv;
@@ -392,6 +847,22 @@ PyObject * UVObject_select(UVObject *self, PyObject *args) {
     return Py_None;
 }
 
+// A thin wrapper over uvset_c
+PyObject * UVObject_set(UVObject *self, PyObject *args) {
+    char *object, *type;
+    int n;
+    double p1, p2, p3;
+    if (!PyArg_ParseTuple(args, "ssiddd", &object, &type, &n, &p1, &p2, &p3)) return NULL;
+    try {
+        uvset_c(self->tno, object, type, n, p1, p2, p3);
+    } catch (MiriadError &e) {
+        PyErr_Format(PyExc_RuntimeError, "%s", e.get_message());
+        return NULL;
+    }
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
 // A thin wrapper over haccess_c
 PyObject * UVObject_haccess(UVObject *self, PyObject *args) {
     char *name, *mode;
@@ -636,8 +1107,16 @@ static PyMethodDef UVObject_methods[] = {
         "rewind()\nSeek to the beginning of a UV file."},
     {"raw_read", (PyCFunction)UVObject_read, METH_VARARGS,
         "_read(num)\nRead up to the specified number of channels from a spectrum.  Returns (preamble, data, flags) where preamble = (uvw,time,(ant_i,ant_j)), data = complex64 numpy array of data, flags = integer32 array of data valid where == 1.  Note that this definition of flags is the inverse of numpy's definition."},
+    {"read_records", (PyCFunction)UVObject_read_records, METH_VARARGS,
+        "read_records(num,vars,nrecords=-1,read_data=1)\nRead up to nrecords records (all remaining records if nrecords < 0) of up to num channels in one call.  Returns (uvw,t,ant_i,ant_j,data,flags,vardict) where uvw has shape (nrec,3), t, ant_i and ant_j have shape (nrec,), data = complex64 array of shape (nrec,nchan), flags = boolean array of the same shape that is True where the data are flagged (numpy's convention) and vardict maps each (name,type) in vars to an array with one row per record (a list for string variables).  If read_data is 0, only the preambles and variables are read and data and flags have no channels."},
+    {"build_index", (PyCFunction)UVObject_build_index, METH_NOARGS,
+        "build_index()\nScan the preambles of all the records (the file should have no selections) and rewind.  Returns (offsets,flag_offsets,t,checkpoints,var_offsets) where offsets (nrec,) and flag_offsets (nrec,2) give the position of each record in the data stream, t is the time of each record, checkpoints are the indices of the records where the time changes and var_offsets (ncheckpoints,nvar,2) give the state of the variables before each checkpoint.  See seek()."},
+    {"seek", (PyCFunction)UVObject_seek, METH_VARARGS,
+        "seek(offset,flag_offsets,var_offsets,end_offset=-1)\nSeek to a checkpoint record returned by build_index(), restoring the variables from var_offsets (nvar,2), so that the next read returns that record.  The data stream is treated as ending at end_offset (the end of the file if negative)."},
     {"raw_write", (PyCFunction)UVObject_write, METH_VARARGS,
         "_write(preamble,data,flags)\nWrite the provided preamble, data, flags to file.  See _read() for definitions of preamble, data, flags."},
+    {"write_records", (PyCFunction)UVObject_write_records, METH_VARARGS,
+        "write_records(uvw,t,ant_i,ant_j,pol,lst,inttime,ra,dec,cnt,data,flags)\nWrite many records in one call.  uvw has shape (nrec,3), t, ant_i, ant_j, pol, lst, inttime, ra and dec have shape (nrec,) and cnt, data and flags have shape (nrec,nchan).  flags are True where the data are flagged (numpy's convention).  The variables pol, lst, cnt, ra, dec and inttime are set for each record."},
     {"copyvr", (PyCFunction)UVObject_copyvr, METH_VARARGS,
         "copyvr(uv)\nCopy any variables which changed during the last read into the provided uv interface."},
     {"trackvr", (PyCFunction)UVObject_trackvr, METH_VARARGS,
@@ -648,6 +1127,8 @@ static PyMethodDef UVObject_methods[] = {
         "_wrvr(name,type,val)\nWrite a value to a variable of the provided Miriad type (see _rdvr()).  If val is an array, multiple values will be written."},
     {"_select", (PyCFunction)UVObject_select, METH_VARARGS,
         "_select(name,n1,n2,include)\nSelect which data is returned by _read().  See select() for more information."},
+    {"_set", (PyCFunction)UVObject_set, METH_VARARGS,
+        "_set(object,type,n,p1,p2,p3)\nSet up how records are read (e.g. the data linetype).  See the MIRIAD uvset documentation."},
     {"haccess", (PyCFunction)UVObject_haccess, METH_VARARGS,
         "haccess(name,mode)\nOpen a header item in the given mode ('read','write').  Returns an integer handle."},
     {NULL}  /* Sentinel */
@@ -372,6 +372,7 @@ static char var_eor_hdr[UV_HDR_SIZE]={0,0,VAR_EOR,0};
 typedef struct variable{
 	char *buf,name[MAXNAM+1];
 	int length,flength,flags,type,index,callno;
+	off64_t size_offset,data_offset;
 	struct variable *fwd;
 } VARIABLE;
 
@@ -1106,6 +1107,7 @@ private UV *uv_getuv(int tno)
     v->fwd = NULL;
     v->index = i;
     v->callno = 0;
+    v->size_offset = v->data_offset = -1;
   }
   for(i=0; i < HASHSIZE; i++) uv->vhash[i] = NULL;
   uvs[tno] = uv;
@@ -1329,8 +1331,10 @@ void uvrewind_c(int tno)
   uv = uvs[tno];
 
   uv->callno = uv->mark = 0;
-  for(i=0, v = uv->variable; i < uv->nvar; i++, v++) 
+  for(i=0, v = uv->variable; i < uv->nvar; i++, v++){
     v->callno = ( (v->flags & UVF_OVERRIDE) ? 1 : 0);
+    v->size_offset = v->data_offset = -1;
+  }
   for(vh = uv->vhans; vh != NULL; vh = vh->fwd) vh->callno = 0;
   uv->offset = 0;
   uv->corr_flags.offset = 0;
@@ -1895,6 +1899,7 @@ private int uv_scan(UV *uv, VARIABLE *vt)
 
 /* Process a specification of a variables length. Allocate buffers if needed. */
      case VAR_SIZE:
+      v->size_offset = offset;
       hreadi_c(uv->item,&v->flength,offset+UV_HDR_SIZE,H_INT_SIZE,&iostat);
       CHECK(iostat,(message,"Error reading a variable-length for %s, while UV scanning",v->name));
       if(v->flength <= 0)
@@ -1917,6 +1922,7 @@ private int uv_scan(UV *uv, VARIABLE *vt)
 /* Process the data of a variable. If we want to keep track of the value
    of this variable, read it. */
      case VAR_DATA:
+      v->data_offset = offset;
       offset += mroundup(UV_HDR_SIZE,extsize);
       if(!(v->flags & UVF_OVERRIDE)){
 	hread_c(uv->item,v->type,v->buf,offset,v->flength,&iostat);
@@ -1949,6 +1955,146 @@ private int uv_scan(UV *uv, VARIABLE *vt)
   return 0;
 }
 /************************************************************************/
+void uvgetstate_c(int tno,off64_t *offset,off64_t *flag_offsets,
+		  int *nvar,off64_t *var_offsets)
+/**uvgetstate -- Get the position in the uv data stream.		*/
+/*:uv-i/o								*/
+/*+
+  Get the current position in the uv data stream, together with the
+  offsets of the last length and value records read for each variable.
+  Passing these to uvsetstate restores the current state of the
+  variables and the position in the stream, which allows seeking to a
+  record without scanning the records before it.
+
+  Input:
+    tno		Handle of the uv data set.
+    nvar	The number of variables var_offsets has room for.
+  Output:
+    offset	Offset of the next record in the uv data stream.
+    flag_offsets The offsets of the next flags for the correlation and
+		the wideband correlation data.
+    nvar	Number of variables. var_offsets is only filled in if
+		it has room for all of them.
+    var_offsets	Offsets of the last length and value records read for
+		each variable, -1 if there has not been one (2*nvar
+		elements).						*/
+/*--									*/
+/*----------------------------------------------------------------------*/
+{
+  UV *uv;
+  VARIABLE *v;
+  int i;
+
+  uv = uvs[tno];
+  *offset = uv->offset;
+  flag_offsets[0] = uv->corr_flags.offset;
+  flag_offsets[1] = uv->wcorr_flags.offset;
+  if(*nvar < uv->nvar){
+    *nvar = uv->nvar;
+    return;
+  }
+  *nvar = uv->nvar;
+  for(i=0, v = uv->variable; i < uv->nvar; i++, v++){
+    *var_offsets++ = v->size_offset;
+    *var_offsets++ = v->data_offset;
+  }
+}
+/************************************************************************/
+void uvsetstate_c(int tno,off64_t offset,Const off64_t *flag_offsets,
+		  int nvar,Const off64_t *var_offsets,off64_t max_offset)
+/**uvsetstate -- Seek to a position in the uv data stream.		*/
+/*:uv-i/o								*/
+/*+
+  Restore a position in the uv data stream returned by uvgetstate. The
+  variables are re-read from the records given in var_offsets, so that
+  the next uvread returns the record at offset, as if all the records
+  before it had been read. The selection state (e.g. for "visibility"
+  selections) is not restored.
+
+  Input:
+    tno		Handle of the uv data set.
+    offset	Offset of the next record in the uv data stream.
+    flag_offsets The offsets of the next flags for the correlation and
+		the wideband correlation data.
+    nvar	Number of variables, as returned by uvgetstate.
+    var_offsets	Offsets of the last length and value records read for
+		each variable, as returned by uvgetstate.
+    max_offset	Treat the uv data stream as ending at this offset. If
+		negative, the end of the data stream is used.		*/
+/*--									*/
+/*----------------------------------------------------------------------*/
+{
+  UV *uv;
+  VARIABLE *v;
+  int i,j,iostat,intsize,extsize;
+  off64_t item_offset;
+  char s[UV_HDR_SIZE];
+
+  uv = uvs[tno];
+  if(nvar != uv->nvar)
+    BUG('f',"Number of variables does not match, in UVSETSTATE");
+
+  for(i=0, v = uv->variable; i < uv->nvar; i++, v++){
+    intsize = internal_size[v->type];
+    extsize = external_size[v->type];
+
+/* Re-read the length of the variable. */
+
+    item_offset = var_offsets[2*i];
+    v->size_offset = item_offset;
+    if(item_offset >= 0){
+      hreadb_c(uv->item,s,item_offset,UV_HDR_SIZE,&iostat);
+      CHECK(iostat,(message,"Error reading a record header, in UVSETSTATE"));
+      if(*(s+2) != VAR_SIZE || (int) *s != i)
+	BUG('f',"Bad variable length record, in UVSETSTATE");
+      hreadi_c(uv->item,&v->flength,item_offset+UV_HDR_SIZE,H_INT_SIZE,&iostat);
+      CHECK(iostat,(message,"Error reading a variable-length for %s, in UVSETSTATE",v->name));
+      if(!(v->flags & UVF_OVERRIDE) || v->type != H_BYTE){
+        v->length = v->flength;
+        v->buf = Realloc( v->buf, (v->flength * intsize)/extsize );
+        if(v->flags & UVF_OVERRIDE && v->flength > extsize)
+          for(j=1; j < v->flength/extsize; j++)
+	    memcpy(v->buf + j*intsize,v->buf,intsize);
+      }
+    }
+
+/* Re-read the value of the variable. */
+
+    item_offset = var_offsets[2*i+1];
+    v->data_offset = item_offset;
+    if(item_offset >= 0 && !(v->flags & UVF_OVERRIDE)){
+      hreadb_c(uv->item,s,item_offset,UV_HDR_SIZE,&iostat);
+      CHECK(iostat,(message,"Error reading a record header, in UVSETSTATE"));
+      if(*(s+2) != VAR_DATA || (int) *s != i)
+	BUG('f',"Bad variable value record, in UVSETSTATE");
+      item_offset += mroundup(UV_HDR_SIZE,extsize);
+      hread_c(uv->item,v->type,v->buf,item_offset,v->flength,&iostat);
+      CHECK(iostat,(message,"Error reading a variable value for %s, in UVSETSTATE",v->name));
+    }
+    if(var_offsets[2*i] >= 0 || var_offsets[2*i+1] >= 0){
+      v->callno = uv->callno;
+      uv->flags |= v->flags & (UVF_UPDATED_PLANET | UVF_UPDATED_SKYFREQ | UVF_UPDATED_UVW);
+    }
+  }
+
+  uv->offset = offset;
+  uv->corr_flags.offset = flag_offsets[0];
+  uv->wcorr_flags.offset = flag_offsets[1];
+  if(max_offset >= 0){
+    uv->max_offset = max_offset;
+  } else {
+#ifdef MIR4
+    {
+      int8 vislen;
+      rdhdl_c(tno,"vislen",&vislen,hsize_c(uv->item));
+      uv->max_offset = (off64_t) vislen;
+    }
+#else
+    rdhdi_c(tno,"vislen",&(uv->max_offset),hsize_c(uv->item));
+#endif
+  }
+}
+/************************************************************************/
 void uvwrite_c(int tno,Const double *preamble,Const float *data,
 	       Const int *flags,int n)
 /**uvwrite -- Write correlation data to a uv file.			*/
@@ -2889,6 +3035,69 @@ void uvread_c(int tno,double *preamble,float *data,int *flags,int n,int *nread)
   if(uv->ref_line.linetype != LINE_NONE) uvread_reference(uv,data,flags,*nread);
 }
 /************************************************************************/
+void uvreadpre_c(int tno,double *preamble,int *nread)
+/**uvreadpre -- Read the preamble of a visibility, skipping the data.	*/
+/*:uv-i/o								*/
+/*+
+  This steps to the next visibility, exactly as uvread does (including
+  any selection), but only returns its preamble. The correlations are
+  not converted and the flags are not read, which makes this much
+  cheaper than uvread when only the metadata are wanted.
+
+  Input:
+    tno		Handle of the uv data set.
+  Output:
+    preamble	A double array of elements giving things such as
+		u,v, time and baseline number. Setable using uvset.
+    nread	Number of correlations in the record. On end-of-file,
+		zero is returned.					*/
+/*--									*/
+/*----------------------------------------------------------------------*/
+{
+  UV *uv;
+  int more,nchan;
+  VARIABLE *v;
+  uv = uvs[tno];
+
+  if(!(uv->flags & UVF_INIT)) uvread_defline(tno);
+  v = (uv->data_line.linetype == LINE_WIDE ? uv->wcorr : uv->corr);
+  uv->corr_flags.init = FALSE;
+  uv->wcorr_flags.init = FALSE;
+
+  *nread = 0;
+  more = TRUE;
+  uv->mark = uv->callno + 1;
+  uv->flags &= ~(UVF_UPDATED | UVF_COPY);
+
+  while(more){
+    if(uv->maxvis > 0 && uv->callno > uv->maxvis) return;
+    do {
+      if(uv_scan(uv,(VARIABLE *)NULL) != 0)return;
+      if(!(uv->flags & UVF_INIT)) uvread_init(tno);
+      if(uv->corr != NULL)if(uv->corr->callno == uv->callno){
+        nchan = NUMCHAN(uv->corr);
+        uv->corr_flags.offset += nchan;
+      }
+      if(uv->wcorr != NULL)if(uv->wcorr->callno == uv->callno){
+        nchan = NUMCHAN(uv->wcorr);
+        uv->wcorr_flags.offset += nchan;
+      }
+    } while(v->callno < uv->callno);
+
+    uv->amp = &noamp;
+    uv->win = &truewin;
+    if(uv->select != NULL) more = uvread_select(uv);
+    else		   more = FALSE;
+  }
+
+  if(uv->flags & UVF_UPDATED_PLANET) uvread_updated_planet(uv);
+  if(uv->flags & UVF_UPDATED_UVW)    uvread_updated_uvw(uv);
+
+  *nread = NUMCHAN(v);
+  if(*nread == 0)return;
+  uvread_preamble(uv,preamble);
+}
+/************************************************************************/
 private void uvread_preamble(UV *uv, double *preamble)
 /*
   Get the preamble associated with this record.
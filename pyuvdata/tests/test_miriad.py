@@ -411,6 +411,304 @@ def test_poltoind():
     nt.assert_raises(ValueError, miriad._pol_to_ind, pol_arr[0])
 
 
+def test_read_records():
+    """Test that the bulk record reader matches reading record by record."""
+    miriad_file = os.path.join(DATA_PATH, 'zen.2457698.40355.xx.HH.uvcA')
+    aipy_uv = aipy_extracts.UV(miriad_file)
+    variables = [(var, aipy_uv.vartable[var]) for var in ['pol', 'ra', 'inttime',
+                                                          'source', 'cnt']]
+    uvw, t, ant_i, ant_j, data, flags, var_values = aipy_uv.read_records(
+        aipy_uv.nchan, variables)
+
+    aipy_uv.rewind()
+    records = list(aipy_uv.all(raw=True))
+    nt.assert_equal(len(records), len(t))
+    nt.assert_true(np.array_equal(uvw, [rec[0][0] for rec in records]))
+    nt.assert_true(np.array_equal(t, [rec[0][1] for rec in records]))
+    nt.assert_true(np.array_equal(ant_i, [rec[0][2][0] for rec in records]))
+    nt.assert_true(np.array_equal(ant_j, [rec[0][2][1] for rec in records]))
+    nt.assert_true(np.array_equal(data, [rec[1] for rec in records]))
+    nt.assert_true(np.array_equal(flags, [rec[2] for rec in records]))
+    nt.assert_equal(var_values['source'], [aipy_uv['source']] * len(t))
+    nt.assert_equal(var_values['pol'].shape, (len(t), 1))
+    nt.assert_equal(var_values['cnt'].shape, data.shape)
+
+    # read in blocks
+    aipy_uv.rewind()
+    block1 = aipy_uv.read_records(aipy_uv.nchan, [], 100)
+    block2 = aipy_uv.read_records(aipy_uv.nchan, [], 100)
+    nt.assert_equal(len(block1[1]), 100)
+    nt.assert_true(np.array_equal(np.concatenate((block1[1], block2[1])), t))
+    nt.assert_equal(len(aipy_uv.read_records(aipy_uv.nchan, [])[1]), 0)
+
+    # preambles only
+    aipy_uv.rewind()
+    pre_records = aipy_uv.read_records(aipy_uv.nchan, [('pol', 'i')], -1, 0)
+    for arr, pre_arr in zip((uvw, t, ant_i, ant_j), pre_records[:4]):
+        nt.assert_true(np.array_equal(arr, pre_arr))
+    nt.assert_equal(pre_records[4].shape, (len(t), 0))
+    nt.assert_equal(pre_records[5].shape, (len(t), 0))
+    nt.assert_true(np.array_equal(pre_records[6]['pol'], var_values['pol']))
+
+    nt.assert_raises(ValueError, aipy_uv.read_records, aipy_uv.nchan, [('pol', 'x')])
+    nt.assert_raises(ValueError, aipy_uv.read_records, 0, [])
+    del(aipy_uv)
+
+    # the python fallback gives the same object
+    uv1 = UVData()
+    uv2 = UVData()
+    uv1.read(miriad_file)
+    # hide the extension method so that hasattr(uv, 'read_records') is False
+
+    def no_read_records(self):
+        raise AttributeError('read_records')
+    uv3 = UVData()
+    aipy_extracts.UV.read_records = property(no_read_records)
+    try:
+        uv2.read(miriad_file)
+        uv3.read_miriad(miriad_file, read_data=False, read_metadata=True)
+    finally:
+        del(aipy_extracts.UV.read_records)
+    nt.assert_equal(uv1, uv2)
+    nt.assert_equal(uv3.data_array, None)
+    nt.assert_true(np.array_equal(uv3.time_array, uv1.time_array))
+    nt.assert_true(np.array_equal(uv3.uvw_array, uv1.uvw_array))
+
+
+def test_blt_gridding():
+    """Test that records are gridded onto blts sorted by time then antennas."""
+    miriad_file = os.path.join(DATA_PATH, 'zen.2456865.60537.xy.uvcRREAA')
+    uv_in = UVData()
+    uvtest.checkWarnings(uv_in.read, [miriad_file], known_warning='miriad')
+    blt_order = np.lexsort((uv_in.ant_2_array, uv_in.ant_1_array,
+                            uv_in.time_array))
+    nt.assert_true(np.array_equal(blt_order, np.arange(uv_in.Nblts)))
+    nt.assert_equal(len(set(zip(uv_in.time_array, uv_in.ant_1_array,
+                                uv_in.ant_2_array))), uv_in.Nblts)
+
+    # every record should land in exactly one blt and polarization
+    aipy_uv = aipy_extracts.UV(miriad_file)
+    records = list(aipy_uv.all(raw=True))
+    nt.assert_equal(len(records), uv_in.Nblts * uv_in.Npols)
+    for (uvw, t, (i, j)), data, flags in records[:20]:
+        blt_ind = np.nonzero((uv_in.ant_1_array == i) & (uv_in.ant_2_array == j)
+                             & np.isclose(uv_in.time_array - uv_in.integration_time
+                                          / (2 * 24 * 3600.), t,
+                                          rtol=0, atol=1e-8))[0]
+        nt.assert_equal(len(blt_ind), 1)
+        nt.assert_true(np.array_equal(uv_in.data_array[blt_ind[0], 0, :, 0], data))
+
+
+def test_read_freq_select():
+    """Test frequency select on read, which only decodes the selected channels."""
+    uv_in = UVData()
+    uvfits_file = os.path.join(DATA_PATH, 'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    testfile = os.path.join(DATA_PATH, 'test/outtest_miriad.uv')
+    uv_in.read_uvfits(uvfits_file)
+    uv_in.nsample_array = np.arange(uv_in.nsample_array.size, dtype=np.float).reshape(
+        uv_in.nsample_array.shape) % 7
+    uv_in.flag_array[:, :, ::3, :] = True
+    uv_in.write_miriad(testfile, clobber=True)
+    full = UVData()
+    full.read(testfile)
+
+    # contiguous, non-contiguous and combined frequencies and channels
+    for select_kwargs, nwarnings in [({'freq_chans': np.arange(10, 20)}, 0),
+                                     ({'freq_chans': [95, 40, 41, 42]}, 1),
+                                     ({'frequencies': full.freq_array[0, [0, 50]],
+                                       'freq_chans': [101]}, 1)]:
+        uv_out = UVData()
+        uvtest.checkWarnings(uv_out.read, [testfile], select_kwargs, nwarnings=nwarnings,
+                             message='Selected frequencies are not evenly spaced')
+        exp_uv = uvtest.checkWarnings(full.select, [], dict(select_kwargs, inplace=False),
+                                      nwarnings=nwarnings,
+                                      message='Selected frequencies are not evenly spaced')
+        nt.assert_equal(uv_out, exp_uv)
+        nt.assert_true('Downselected to specific frequencies' in uv_out.history)
+
+    # combined with other selects and with a metadata only read
+    uv_out = UVData()
+    uv_out.read(testfile, freq_chans=np.arange(5), ant_str='cross')
+    nt.assert_equal(uv_out, full.select(freq_chans=np.arange(5), ant_str='cross', inplace=False))
+    uv_out = UVData()
+    uv_out.read_miriad(testfile, freq_chans=np.arange(5), read_data=False,
+                       read_metadata=True)
+    nt.assert_true(np.array_equal(uv_out.freq_array, full.freq_array[:, :5]))
+    nt.assert_equal(uv_out.Nfreqs, 5)
+
+    # errors
+    uv_out = UVData()
+    nt.assert_raises(ValueError, uv_out.read, testfile, frequencies=[1.])
+    aipy_uv = aipy_extracts.UV(testfile)
+    nt.assert_raises(ValueError, aipy_uv.select_channels, 100, 5)
+    nt.assert_raises(ValueError, aipy_uv.select_channels, -1, 5)
+    del(aipy_uv)
+    shutil.rmtree(testfile)
+
+
+def test_miriad_index():
+    """Test reading time ranges with and without an index file."""
+    uv_in = UVData()
+    miriad_file = os.path.join(DATA_PATH, 'zen.2456865.60537.xy.uvcRREAA')
+    testfile = os.path.join(DATA_PATH, 'test/outtest_miriad.uv')
+    index_file = testfile + '.index.npy'
+    uvtest.checkWarnings(uv_in.read, [miriad_file], known_warning='miriad')
+    if os.path.exists(index_file):
+        os.remove(index_file)
+    uv_in.write_miriad(testfile, clobber=True, write_index=True)
+    nt.assert_true(os.path.exists(index_file))
+
+    times = np.unique(uv_in.time_array)
+    for time_range in [[times[0] - 1e-5, times[0] + 1e-5],
+                       [times[5] - 1e-5, times[9] + 1e-5],
+                       [times[-1] - 1e-5, times[-1] + 1.],
+                       [times[0] - 1., times[-1] + 1.]]:
+        uv_index = UVData()
+        uv_index.read(testfile, time_range=time_range)
+        uv_scan = UVData()
+        uv_scan.read_miriad(testfile, time_range=time_range, use_index=False)
+        nt.assert_equal(uv_index, uv_scan)
+        nt.assert_equal(uv_index, uv_in.select(times=times[(times >= time_range[0])
+                                                           & (times <= time_range[1])],
+                                               inplace=False))
+    # reading after a time range with an index still reads the whole file
+    uv_out = UVData()
+    uv_out.read(testfile)
+    nt.assert_equal(uv_out, uv_in)
+    # select on other axes combined with the index
+    uv_out.read(testfile, time_range=[times[5] - 1e-5, times[9] + 1e-5],
+                polarizations=[uv_in.polarization_array[0]], freq_chans=np.arange(3))
+    exp_uv = uv_in.select(times=times[5:10], freq_chans=np.arange(3),
+                          polarizations=[uv_in.polarization_array[0]], inplace=False)
+    nt.assert_true('Downselected to specific frequencies, times, polarizations'
+                   in uv_out.history)
+    exp_uv.history = uv_out.history
+    nt.assert_equal(uv_out, exp_uv)
+    nt.assert_raises(ValueError, uv_out.read, testfile,
+                     time_range=[times[-1] + 1., times[-1] + 2.])
+
+    # overwriting the file removes the old index, it is only rewritten if asked
+    old_index = np.load(index_file)
+    uv_in.select(times=times[:10])
+    uv_in.write_miriad(testfile, clobber=True)
+    nt.assert_false(os.path.exists(index_file))
+    uvtest.checkWarnings(uv_out.read, [testfile], {'time_range': [times[0] - 1e-5,
+                                                                  times[5] + 1e-5]},
+                         nwarnings=0)
+    nt.assert_equal(uv_out, uv_in.select(times=times[:6], inplace=False))
+    uv_in.write_miriad(testfile, clobber=True, write_index=True)
+    nt.assert_true(os.path.exists(index_file))
+
+    # an index of another file (or of an older version of it) is ignored
+    np.save(index_file, old_index)
+    uvtest.checkWarnings(uv_out.read, [testfile], {'time_range': [times[0] - 1e-5,
+                                                                  times[5] + 1e-5]},
+                         message='The index file')
+    nt.assert_equal(uv_out, uv_in.select(times=times[:6], inplace=False))
+
+    # rewrite the index
+    uv_out.write_miriad_index(testfile)
+    uv_out.read(testfile, time_range=[times[0] - 1e-5, times[5] + 1e-5])
+    nt.assert_equal(uv_out, uv_in.select(times=times[:6], inplace=False))
+    nt.assert_raises(IOError, uv_out.write_miriad_index, testfile + 'foo')
+
+    os.remove(index_file)
+    shutil.rmtree(testfile)
+
+
+def test_write_records():
+    """Test the bulk record writer, including conjugation of all polarizations."""
+    uv_in = UVData()
+    uv_out = UVData()
+    uvfits_file = os.path.join(DATA_PATH, 'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    testfile = os.path.join(DATA_PATH, 'test/outtest_miriad.uv')
+    testfile2 = os.path.join(DATA_PATH, 'test/outtest_miriad2.uv')
+    uv_in.read_uvfits(uvfits_file)
+
+    # this file has ant_1 > ant_2 for most baselines, so most records get
+    # conjugated on write. Add imaginary parts so the conjugation matters.
+    nt.assert_true(np.any(uv_in.ant_1_array > uv_in.ant_2_array))
+    uv_in.data_array = uv_in.data_array + 1j * np.arange(uv_in.data_array.size).reshape(
+        uv_in.data_array.shape)
+    uv_in.write_miriad(testfile, clobber=True)
+    uv_out.read(testfile)
+    nt.assert_true(np.all(uv_out.ant_1_array <= uv_out.ant_2_array))
+    for antpair in uv_in.get_antpairs():
+        nt.assert_true(np.array_equal(uv_out.get_data(antpair), uv_in.get_data(antpair)))
+
+    # the python fallback writes the same file
+    def no_write_records(self):
+        raise AttributeError('write_records')
+    aipy_extracts.UV.write_records = property(no_write_records)
+    try:
+        uv_in.write_miriad(testfile2, clobber=True)
+    finally:
+        del(aipy_extracts.UV.write_records)
+    uv_out2 = UVData()
+    uv_out2.read(testfile2)
+    nt.assert_equal(uv_out, uv_out2)
+
+    # errors on badly shaped inputs
+    aipy_uv = aipy_extracts.UV(testfile2, status='append')
+    nt.assert_raises(ValueError, aipy_uv.write_records, np.zeros((2, 2)), *[np.zeros(2)] * 11)
+    nt.assert_raises(ValueError, aipy_uv.write_records, np.zeros((2, 3)),
+                     *([np.zeros(2)] * 8 + [np.zeros((2, 4)), np.zeros((2, 3)), np.zeros((2, 3))]))
+    del(aipy_uv)
+    shutil.rmtree(testfile2)
+
+
+def test_pol_collapse():
+    """Test collapsing the per-pol uvw, ra and dec values onto blts."""
+    uv_in = UVData()
+    uvfits_file = os.path.join(DATA_PATH, 'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    testfile = os.path.join(DATA_PATH, 'test/outtest_miriad.uv')
+    uv_in.read_uvfits(uvfits_file)
+    # fully flag the first pol on one blt and all pols on another
+    uv_in.flag_array[0, :, :, 0] = True
+    uv_in.flag_array[1] = True
+    uv_in.write_miriad(testfile, clobber=True)
+    uv_out = UVData()
+    uv_out.read(testfile)
+    good_pols = ~np.all(uv_out.flag_array, axis=(1, 2))
+    one_flagged = np.nonzero(~good_pols[:, 0] & good_pols[:, 1])[0]
+    all_flagged = np.nonzero(~np.any(good_pols, axis=1))[0]
+    nt.assert_equal(len(one_flagged), 1)
+    nt.assert_equal(len(all_flagged), 1)
+
+    read_records = Miriad._read_miriad_records
+
+    def read_offset_records(key, pol, flagged_only):
+        # offset the values of one pol, optionally only on flagged records
+        def _read_miriad_records(self, uv, source, check_variables, **kwargs):
+            records = read_records(self, uv, source, check_variables, **kwargs)
+            offset = records['pol'] == pol
+            if flagged_only:
+                offset &= np.all(records['flags'], axis=1)
+            records[key][offset] += 1.
+            return records
+        return _read_miriad_records
+
+    for key in ['uvw', 'ra', 'dec']:
+        Miriad._read_miriad_records = read_offset_records(key, uv_out.polarization_array[1], False)
+        try:
+            uv_err = UVData()
+            nt.assert_raises(ValueError, uv_err.read, testfile)
+        finally:
+            Miriad._read_miriad_records = read_records
+
+    # values on flagged pols are ignored unless all pols are flagged,
+    # then the first pol is used
+    Miriad._read_miriad_records = read_offset_records('uvw', uv_out.polarization_array[0], True)
+    try:
+        uv_offset = UVData()
+        uv_offset.read(testfile)
+    finally:
+        Miriad._read_miriad_records = read_records
+    changed = np.nonzero(np.any(uv_offset.uvw_array != uv_out.uvw_array, axis=1))[0]
+    nt.assert_true(np.array_equal(changed, all_flagged))
+    shutil.rmtree(testfile)
+
+
 def test_miriad_extra_keywords():
     uv_in = UVData()
     uv_out = UVData()
@@ -734,6 +1032,21 @@ def test_readWriteReadMiriad():
     for m in metadata:
         nt.assert_true(getattr(uv_in, m) is not None)
 
+    # try reading the metadata from the record preambles, with and without
+    # select on read
+    for select_kwargs in [{}, {'ant_str': 'cross', 'polarizations': ['xy']}]:
+        full = UVData()
+        uvtest.checkWarnings(full.read, [testfile], select_kwargs, known_warning='miriad')
+        uv_in = UVData()
+        kwargs = dict(select_kwargs, read_data=False, read_metadata=True)
+        uvtest.checkWarnings(uv_in.read_miriad, [testfile], kwargs, known_warning='miriad')
+        nt.assert_equal(uv_in.data_array, None)
+        nt.assert_equal(uv_in.flag_array, None)
+        nt.assert_equal(uv_in.nsample_array, None)
+        for p in full:
+            if p not in ['_data_array', '_flag_array', '_nsample_array']:
+                nt.assert_equal(getattr(uv_in, p), getattr(full, p))
+
     # test exceptions
     # multiple file read-in
     uv_in = UVData()
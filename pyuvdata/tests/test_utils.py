@@ -255,6 +255,74 @@ def test_phasing_funcs():
     nt.assert_true(np.allclose(gcrs_rel.value, temp2))
 
 
+def test_frame_transform_cache():
+    """Test the cache of telescope location frame transforms."""
+    array_center_xyz = np.array([-2559454.08, 5095372.14, -2849057.18])
+    jds = 2455780.6 + np.arange(5) / 86400.
+
+    uvutils.set_frame_transform_cache_size(0)
+    uvutils.clear_frame_transform_cache()
+    nocache_loc = uvutils._get_frame_telescope_location(array_center_xyz, jds, 'icrs')
+    nt.assert_equal(uvutils.get_frame_transform_cache_info(),
+                    {'hits': 0, 'misses': 0, 'maxsize': 0, 'currsize': 0})
+
+    uvutils.set_frame_transform_cache_size(4)
+    cache_loc = uvutils._get_frame_telescope_location(array_center_xyz, jds, 'icrs')
+    nt.assert_true(np.allclose(nocache_loc, cache_loc, rtol=0, atol=1e-6))
+    nt.assert_equal(uvutils.get_frame_transform_cache_info(),
+                    {'hits': 0, 'misses': 5, 'maxsize': 4, 'currsize': 4})
+
+    # the first time was evicted, the last four should be hits
+    cache_loc = uvutils._get_frame_telescope_location(array_center_xyz, jds, 'icrs')
+    nt.assert_true(np.allclose(nocache_loc, cache_loc, rtol=0, atol=1e-6))
+    info = uvutils.get_frame_transform_cache_info()
+    nt.assert_equal(info['hits'], 4)
+    nt.assert_equal(info['misses'], 6)
+
+    # different frames are cached separately
+    gcrs_loc = uvutils._get_frame_telescope_location(array_center_xyz, jds[:1], 'gcrs')
+    nt.assert_false(np.allclose(gcrs_loc, cache_loc[:1]))
+
+    # shrinking the cache evicts the least recently used entries
+    uvutils.set_frame_transform_cache_size(1)
+    nt.assert_equal(uvutils.get_frame_transform_cache_info()['currsize'], 1)
+    nt.assert_raises(ValueError, uvutils.set_frame_transform_cache_size, -1)
+
+    uvutils.clear_frame_transform_cache()
+    nt.assert_equal(uvutils.get_frame_transform_cache_info(),
+                    {'hits': 0, 'misses': 0, 'maxsize': 1, 'currsize': 0})
+    uvutils.set_frame_transform_cache_size(0)
+
+
+def test_lst_for_time():
+    """Test get_lst_for_time against per-time astropy calculations and the lst memo."""
+    lat, lon, alt = -30.72, 21.43, 1051.7
+    jds = np.repeat(2456865.6 + np.arange(4) * 10. / 86400., 3)
+
+    lsts = uvutils.get_lst_for_time(jds, lat, lon, alt)
+    nt.assert_equal(lsts.shape, jds.shape)
+    for jd, lst in zip(jds, lsts):
+        t = Time(jd, format='jd', location=(Angle(lon, unit='deg'), Angle(lat, unit='deg')))
+        nt.assert_true(np.isclose(t.sidereal_time('apparent').radian, lst))
+
+    uvutils.clear_lst_cache()
+    uvutils.set_lst_cache_size(10)
+    lsts_memo = uvutils.get_lst_for_time(jds, lat, lon, alt)
+    nt.assert_true(np.array_equal(lsts, lsts_memo))
+    nt.assert_equal(uvutils.get_lst_cache_info(),
+                    {'hits': 0, 'misses': 4, 'maxsize': 10, 'currsize': 4})
+    lsts_memo = uvutils.get_lst_for_time(jds, lat, lon, alt)
+    nt.assert_true(np.array_equal(lsts, lsts_memo))
+    nt.assert_equal(uvutils.get_lst_cache_info()['hits'], 4)
+
+    # a different location is not a hit
+    uvutils.get_lst_for_time(jds, lat + 1, lon, alt)
+    nt.assert_equal(uvutils.get_lst_cache_info()['misses'], 8)
+
+    uvutils.clear_lst_cache()
+    uvutils.set_lst_cache_size(0)
+
+
 def test_pol_funcs():
     """ Test utility functions to convert between polarization strings and numbers """
 
@@ -439,3 +507,49 @@ def test_redundancy_finder():
             if bl in conjugates:
                 bl_vec *= (-1)
             nt.assert_true(np.isclose(np.sqrt(np.dot(bl_vec, vec_bin_centers[gi])), lens[gi], atol=tol))
+
+
+def test_lazy_array():
+    """Test that _LazyArray indexing matches numpy and only reads hyperslabs."""
+    arr = np.arange(4 * 5 * 6).reshape(4, 5, 6) * (1 + 1j)
+    keys_read = []
+
+    def reader(key):
+        for k in key:
+            if isinstance(k, slice):
+                nt.assert_true(k.step is None or k.step > 0)
+            elif not isinstance(k, int):
+                nt.assert_true(np.all(np.diff(k) > 0))
+        keys_read.append(key)
+        return arr[key]
+
+    lazy = uvutils._LazyArray(arr.shape, arr.dtype, reader)
+    nt.assert_equal(lazy.shape, arr.shape)
+    nt.assert_equal(lazy.ndim, 3)
+    nt.assert_equal(lazy.size, arr.size)
+    nt.assert_equal(len(lazy), 4)
+    nt.assert_equal(len(keys_read), 0)
+
+    test_keys = [np.s_[1], np.s_[1:3], np.s_[..., 2], np.s_[::-1, :, 1:5:2],
+                 np.s_[[3, 0, 3], :, 1], np.s_[:, np.array([True, False, True, False, True])],
+                 np.s_[[0, 2], 1:4, [1, 5]], np.s_[-1, -2, -3], np.s_[:, []],
+                 np.s_[np.newaxis, 0]]
+    for key in test_keys:
+        nt.assert_true(np.array_equal(lazy[key], arr[key]))
+
+    nt.assert_raises(IndexError, lazy.__getitem__, np.s_[4])
+    nt.assert_raises(IndexError, lazy.__getitem__, np.s_[0, 0, 0, 0])
+
+    # whole-array conversion reads once and caches the result
+    nt.assert_true(np.array_equal(np.asarray(lazy), arr))
+    nreads = len(keys_read)
+    nt.assert_true(np.array_equal(np.asarray(lazy), arr))
+    nt.assert_equal(len(keys_read), nreads)
+
+    # item assignment and ndarray methods work on the loaded array
+    lazy = uvutils._LazyArray(arr.shape, arr.dtype, reader)
+    lazy[0] = 0
+    nt.assert_true(np.all(lazy[0] == 0))
+    nt.assert_true(np.array_equal(lazy.conj()[1:], arr[1:].conj()))
+    nt.assert_equal(lazy.astype(np.complex64).dtype, np.complex64)
+    nt.assert_raises(AttributeError, getattr, lazy, '_not_an_attribute')
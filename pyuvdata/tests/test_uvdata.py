@@ -73,6 +73,9 @@ class TestUVDataInit(object):
                                  'phase_center_ra_degrees', 'phase_center_dec_degrees',
                                  'pyuvdata_version_str']
 
+        # private caches that are not UVParameters
+        self.private_attributes = ['_blt_index']
+
         self.uv_object = UVData()
 
     def teardown(self):
@@ -133,7 +136,8 @@ class TestUVDataInit(object):
 
     def test_unexpected_parameters(self):
         "Test for extra parameters."
-        expected_parameters = self.required_parameters + self.extra_parameters
+        expected_parameters = (self.required_parameters + self.extra_parameters
+                               + self.private_attributes)
         attributes = [i for i in self.uv_object.__dict__.keys() if i[0] == '_']
         for a in attributes:
             nt.assert_true(a in expected_parameters,
@@ -510,6 +514,30 @@ def test_phasing():
     nt.assert_true(np.allclose(uvd2.uvw_array, uvd2_drift_antpos.uvw_array, atol=2e-2))
 
 
+def test_phase_antpos_antenna_order():
+    """Test that phasing with antenna positions does not depend on antenna ordering."""
+    testfile = os.path.join(DATA_PATH, 'hera_testfile')
+    uv_raw = UVData()
+    uvtest.checkWarnings(uv_raw.read_miriad, [testfile], {'correct_lat_lon': False},
+                         message='Altitude is not present in file and latitude and '
+                                 'longitude values do not match')
+    uv_phase = copy.deepcopy(uv_raw)
+    uv_phase.phase(Angle('5d').rad, Angle('30d').rad, use_ant_pos=True)
+
+    # reverse the order of the antenna arrays
+    uv_reorder = copy.deepcopy(uv_raw)
+    uv_reorder.antenna_numbers = uv_reorder.antenna_numbers[::-1]
+    uv_reorder.antenna_names = uv_reorder.antenna_names[::-1]
+    uv_reorder.antenna_positions = uv_reorder.antenna_positions[::-1, :]
+    uv_reorder.phase(Angle('5d').rad, Angle('30d').rad, use_ant_pos=True)
+    nt.assert_true(np.allclose(uv_phase.uvw_array, uv_reorder.uvw_array))
+
+    # check error if the data contain antennas not in antenna_numbers
+    uv_bad = copy.deepcopy(uv_raw)
+    uv_bad.ant_1_array[0] = np.max(uv_bad.antenna_numbers) + 1
+    nt.assert_raises(ValueError, uv_bad.phase, 0., 0., use_ant_pos=True)
+
+
 def test_set_phase_unknown():
     uv_object = UVData()
     testfile = os.path.join(
@@ -1096,6 +1124,41 @@ def test_select_not_inplace():
     nt.assert_equal(uv1, uv_object)
 
 
+def test_select_preprocess_inds():
+    # Test the index arrays built for select
+    uv_object = UVData()
+    testfile = os.path.join(
+        DATA_PATH, 'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    uv_object.read_uvfits(testfile)
+
+    ants_to_keep = [0, 3, 7]
+    bls_to_keep = [(11, 12), (18, 13)]
+    blt_inds, freq_inds, pol_inds, history_update_string = \
+        uv_object._select_preprocess(ants_to_keep, None, None, bls_to_keep,
+                                     None, [5, 1, 3], None, None, np.arange(150))
+    nt.assert_equal(blt_inds.dtype, np.int64)
+    nt.assert_equal(freq_inds.dtype, np.int64)
+    nt.assert_true(pol_inds is None)
+    nt.assert_equal(history_update_string, '  Downselected to specific baseline-times, '
+                    'antennas, baselines, frequencies using pyuvdata.')
+
+    # compare to a simple loop over the baseline-times
+    expected_blts = []
+    for ind, (ant1, ant2) in enumerate(zip(uv_object.ant_1_array, uv_object.ant_2_array)):
+        if ind >= 150:
+            continue
+        if ((ant1 in ants_to_keep and ant2 in ants_to_keep)
+                or (ant1, ant2) in bls_to_keep or (ant2, ant1) in bls_to_keep):
+            expected_blts.append(ind)
+    nt.assert_equal(blt_inds.tolist(), expected_blts)
+    nt.assert_equal(freq_inds.tolist(), [1, 3, 5])
+
+    nt.assert_raises(ValueError, uv_object._select_preprocess, None, None, None,
+                     [(0, 19)], None, None, None, None, None)
+    nt.assert_raises(ValueError, uv_object._select_preprocess, None, None, None,
+                     None, None, None, [uv_object.time_array[0] + 1], None, None)
+
+
 def test_reorder_pols():
     # Test function to fix polarization order
     uv1 = UVData()
@@ -1533,6 +1596,33 @@ def test_add_drift():
     nt.assert_equal(uv1, uv_full)
 
 
+def test_add_blt_order():
+    # Test that added baseline-times are sorted by time, then baseline
+    uv_full = UVData()
+    testfile = os.path.join(DATA_PATH, 'zen.2456865.60537.xy.uvcRREAA')
+    uvtest.checkWarnings(uv_full.read_miriad, [testfile], known_warning='miriad')
+    nt.assert_true(np.array_equal(np.lexsort((uv_full.baseline_array, uv_full.time_array)),
+                                  np.arange(uv_full.Nblts)))
+
+    # Interleaved blts, added out of order
+    uv1 = uv_full.select(blt_inds=np.arange(0, uv_full.Nblts, 2), inplace=False)
+    uv2 = uv_full.select(blt_inds=np.arange(1, uv_full.Nblts, 2), inplace=False)
+    uv3 = uvtest.checkWarnings(uv2.__add__, [uv1],
+                               message='Combined frequencies are not contiguous')
+    uv3.history = uv_full.history
+    nt.assert_equal(uv3, uv_full)
+
+    # Times that differ below the time tolerance are still distinct blts
+    uv1 = uv_full.select(blt_inds=[0], inplace=False)
+    uv2 = copy.deepcopy(uv1)
+    uv2.time_array = uv2.time_array + 1e-9
+    uv3 = uvtest.checkWarnings(uv1.__add__, [uv2],
+                               message='Combined frequencies are not contiguous')
+    nt.assert_equal(uv3.Nblts, 2)
+    nt.assert_true(np.array_equal(uv3.time_array, np.concatenate((uv1.time_array,
+                                                                  uv2.time_array))))
+
+
 def test_break_add():
     # Test failure modes of add function
     uv_full = UVData()
@@ -1570,6 +1660,82 @@ def test_break_add():
     nt.assert_raises(ValueError, uv1.__iadd__, uv2)
 
 
+def test_fast_concat():
+    uv_full = UVData()
+    testfile = os.path.join(
+        DATA_PATH, 'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    uv_full.read_uvfits(testfile)
+
+    # Concatenate frequencies
+    uv1 = uv_full.select(freq_chans=np.arange(0, 30), inplace=False)
+    uv2 = uv_full.select(freq_chans=np.arange(30, 60), inplace=False)
+    uv3 = uv_full.select(freq_chans=np.arange(60, uv_full.Nfreqs), inplace=False)
+    uv4 = uv1.fast_concat([uv2, uv3], 'freq')
+    nt.assert_true(uvutils._check_histories(uv_full.history + '  Downselected to '
+                                            'specific frequencies using pyuvdata. '
+                                            'Combined data along frequency axis '
+                                            'using pyuvdata.', uv4.history))
+    uv4.history = uv_full.history
+    nt.assert_equal(uv4, uv_full)
+    nt.assert_equal(uv1.Nfreqs, 30)
+    # the data arrays of the original object are kept and not shared
+    nt.assert_equal(uv1.data_array.shape[2], 30)
+    nt.assert_equal(uv1.flag_array.shape[2], 30)
+    nt.assert_equal(uv1.nsample_array.shape[2], 30)
+    nt.assert_false(np.may_share_memory(uv1.data_array, uv4.data_array))
+
+    # Concatenate polarizations, in place
+    uv1 = uv_full.select(polarizations=uv_full.polarization_array[0:2], inplace=False)
+    uv2 = uv_full.select(polarizations=uv_full.polarization_array[2:4], inplace=False)
+    uv1.fast_concat(uv2, 'polarization', inplace=True)
+    uv1.history = uv_full.history
+    nt.assert_equal(uv1, uv_full)
+
+    # Concatenate baseline-times
+    uv1 = uv_full.select(blt_inds=np.arange(0, 100), inplace=False)
+    uv2 = uv_full.select(blt_inds=np.arange(100, uv_full.Nblts), inplace=False)
+    uv1.fast_concat(uv2, 'blt', inplace=True)
+    nt.assert_true(uvutils._check_histories(uv_full.history + '  Downselected to '
+                                            'specific baseline-times using pyuvdata. '
+                                            'Combined data along baseline-time axis '
+                                            'using pyuvdata.', uv1.history))
+    uv1.history = uv_full.history
+    nt.assert_equal(uv1, uv_full)
+
+    # Concatenate frequencies - out of order, kept in the order given
+    uv1 = uv_full.select(freq_chans=np.arange(0, 50), inplace=False)
+    uv2 = uv_full.select(freq_chans=np.arange(50, uv_full.Nfreqs), inplace=False)
+    uv3 = uvtest.checkWarnings(uv2.fast_concat, [uv1, 'freq'],
+                               message='Combined frequencies are not evenly spaced')
+    nt.assert_true(np.array_equal(uv3.freq_array[0, -50:], uv_full.freq_array[0, :50]))
+    nt.assert_true(np.array_equal(uv3.data_array[:, :, -50:], uv_full.data_array[:, :, :50]))
+
+
+def test_break_fast_concat():
+    # Test failure modes of fast_concat
+    uv_full = UVData()
+    testfile = os.path.join(
+        DATA_PATH, 'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    uv_full.read_uvfits(testfile)
+    uv1 = uv_full.select(freq_chans=np.arange(0, 50), inplace=False)
+    uv2 = uv_full.select(freq_chans=np.arange(50, uv_full.Nfreqs), inplace=False)
+
+    # Bad axis
+    nt.assert_raises(ValueError, uv1.fast_concat, uv2, 'spw')
+
+    # Wrong class
+    nt.assert_raises(ValueError, uv1.fast_concat, np.zeros(5), 'freq')
+
+    # Different units
+    uv2.vis_units = 'UNCALIB'
+    nt.assert_raises(ValueError, uv1.fast_concat, uv2, 'freq')
+
+    # Other axes do not match
+    uv2.vis_units = uv1.vis_units
+    nt.assert_raises(ValueError, uv1.fast_concat, uv2, 'polarization')
+    nt.assert_raises(ValueError, uv1.fast_concat, uv2, 'blt')
+
+
 def test_key2inds():
     # Test function to interpret key as antpair, pol
     uv = UVData()
@@ -1661,6 +1827,7 @@ def test_key2inds():
 
     # Test autos are handled correctly
     uv.ant_2_array[0] = uv.ant_1_array[0]
+    uv._blt_index = None
     ind1, ind2, indp = uv._key2inds((ant1, ant1, pol))
     nt.assert_true(np.array_equal(ind1, [0]))
     nt.assert_true(np.array_equal(ind2, []))
@@ -1959,6 +2126,59 @@ def test_antpair2ind():
     nt.assert_raises(ValueError, uv.antpair2ind, 0, 1, 'foo')
 
 
+def test_blt_index():
+    # Test the baseline to blt index lookup table and its invalidation
+    uv = UVData()
+    testfile = os.path.join(
+        DATA_PATH, 'zen.2456865.60537.xy.uvcRREAA')
+    uvtest.checkWarnings(uv.read_miriad, [testfile],
+                         message='Altitude is not present in Miriad file')
+
+    for ant1, ant2 in uv.get_antpairs():
+        bltind = np.where((uv.ant_1_array == ant1) & (uv.ant_2_array == ant2))[0]
+        np.testing.assert_array_equal(uv.antpair2ind(ant1, ant2), bltind)
+    np.testing.assert_array_equal(uv.antpair2ind(100, 101), np.array([], dtype=np.int64))
+
+    # the index is rebuilt after a select
+    uv2 = uv.select(blt_inds=np.arange(uv.Nblts)[::-1], inplace=False)
+    uv2.antpair2ind(0, 1)
+    nt.assert_true(uv2._blt_index[0]() is uv2.ant_1_array)
+    bltind = np.where((uv2.ant_1_array == 0) & (uv2.ant_2_array == 1))[0]
+    np.testing.assert_array_equal(uv2.antpair2ind(0, 1), bltind)
+
+    # and after an add
+    uv1 = uv.select(times=np.unique(uv.time_array)[:5], inplace=False)
+    uv2 = uv.select(times=np.unique(uv.time_array)[5:], inplace=False)
+    uv1.antpair2ind(0, 1)
+    uvtest.checkWarnings(uv1.__iadd__, [uv2],
+                         message='Combined frequencies are not contiguous')
+    bltind = np.where((uv1.ant_1_array == 0) & (uv1.ant_2_array == 1))[0]
+    np.testing.assert_array_equal(uv1.antpair2ind(0, 1), bltind)
+
+    # and in a copy and after a fast_concat
+    uv3 = copy.deepcopy(uv1)
+    np.testing.assert_array_equal(uv3.antpair2ind(0, 1), bltind)
+    nt.assert_true(uv3._blt_index[0]() is uv3.ant_1_array)
+    uv1 = uv.select(times=np.unique(uv.time_array)[:5], inplace=False)
+    uv1.antpair2ind(0, 1)
+    uv1.fast_concat(uv2, 'blt', inplace=True)
+    np.testing.assert_array_equal(uv1.antpair2ind(0, 1), bltind)
+
+    # in-place edits of the antenna arrays need an explicit reset
+    ant1, ant2 = uv.get_antpairs()[0]
+    uv.ant_2_array[1] = ant1
+    uv.baseline_array[1] = uv.antnums_to_baseline(ant1, ant1)
+    uv._blt_index = None
+    bltind = np.where((uv.ant_1_array == ant1) & (uv.ant_2_array == ant1))[0]
+    np.testing.assert_array_equal(uv.antpair2ind(ant1, ant1), bltind)
+    nt.assert_true(1 in uv.antpair2ind(ant1, ant1))
+
+    # returned indices are copies, so modifying them doesn't corrupt the index
+    inds = uv.antpair2ind(0, 1)
+    inds[:] = 0
+    nt.assert_false(np.array_equal(uv.antpair2ind(0, 1), inds))
+
+
 def test_get_times():
     # Test function for easy access to times, to work in conjunction with get_data
     uv = UVData()
@@ -2013,6 +2233,41 @@ def test_antpairpol_iter():
     nt.assert_equal(len(pols), uv.Npols)
 
 
+def test_antpairpol_block_iter():
+    # Test batched generator against get_data
+    uv = UVData()
+    testfile = os.path.join(DATA_PATH, 'zen.2456865.60537.xy.uvcRREAA')
+    uvtest.checkWarnings(uv.read_miriad, [testfile], known_warning='miriad')
+
+    # also check a baseline-major copy, where blocks are contiguous slices
+    uv_bl_major = copy.deepcopy(uv)
+    order = np.lexsort((uv.time_array, uv.baseline_array))
+    for p in uv_bl_major:
+        param = getattr(uv_bl_major, p)
+        if isinstance(param.form, tuple) and param.form[:1] == ('Nblts',):
+            param.value = param.value[order]
+    nt.assert_true(uv_bl_major.check())
+
+    for uv in [uv, uv_bl_major]:
+        keys = []
+        block_iter = uv.antpairpol_block_iter(block_size=5, return_flags=True)
+        for block_keys, d, f in block_iter:
+            nt.assert_true(len(block_keys) <= 5)
+            nt.assert_equal(d.shape, (len(block_keys), uv.Ntimes, uv.Nfreqs))
+            for key, dbl, fbl in zip(block_keys, d, f):
+                inds = uv.antpair2ind(key[0], key[1])
+                inds = inds[np.argsort(uv.time_array[inds])]
+                pol_ind = uv.get_pols().index(key[2])
+                nt.assert_true(np.all(dbl == uv.data_array[inds, 0, :, pol_ind]))
+                nt.assert_true(np.all(fbl == uv.flag_array[inds, 0, :, pol_ind]))
+            keys += block_keys
+        nt.assert_equal(sorted(keys), sorted(uv.get_antpairpols()))
+
+    nt.assert_raises(ValueError, next, uv.antpairpol_block_iter(block_size=0))
+    uv.select(blt_inds=np.arange(uv.Nblts - 1))
+    nt.assert_raises(ValueError, next, uv.antpairpol_block_iter())
+
+
 def test_get_ants():
     # Test function to get unique antennas in data
     uv = UVData()
@@ -14,6 +14,7 @@ import nose.tools as nt
 import astropy
 from astropy.io import fits
 from pyuvdata import UVData
+from pyuvdata import uvfits
 import pyuvdata.utils as uvutils
 import pyuvdata.tests as uvtest
 from pyuvdata.data import DATA_PATH
@@ -200,6 +201,37 @@ def test_readwriteread():
     del(uv_out)
 
 
+def test_write_chunks():
+    """Test that writing the random groups in chunks does not change the file."""
+    uv_in = UVData()
+    uv_out = UVData()
+    testfile = os.path.join(DATA_PATH, 'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    write_file = os.path.join(DATA_PATH, 'test/outtest_uvfits.uvfits')
+    write_file2 = os.path.join(DATA_PATH, 'test/outtest_uvfits2.uvfits')
+    uv_in.read_uvfits(testfile)
+    uv_in.data_array += 1j * np.arange(uv_in.Nblts)[:, np.newaxis, np.newaxis, np.newaxis]
+    uv_in.flag_array[::3] = True
+    uv_in.nsample_array[::5] = 0
+    uv_in.flag_array[::5] = True
+    uv_in.write_uvfits(write_file)
+
+    # chunks of 3 blts, with a smaller last chunk
+    group_size = 4 * (9 + uv_in.Nspws * uv_in.Nfreqs * uv_in.Npols * 3)
+    nt.assert_true(uv_in.Nblts % 3 != 0)
+    write_chunk_size = uvfits._write_chunk_size
+    uvfits._write_chunk_size = 3 * group_size + 1
+    try:
+        uv_in.write_uvfits(write_file2)
+    finally:
+        uvfits._write_chunk_size = write_chunk_size
+    with open(write_file, 'rb') as f1, open(write_file2, 'rb') as f2:
+        nt.assert_equal(f1.read(), f2.read())
+    uv_out.read_uvfits(write_file2)
+    nt.assert_equal(uv_in, uv_out)
+    os.remove(write_file)
+    os.remove(write_file2)
+
+
 def test_extra_keywords():
     uv_in = UVData()
     uv_out = UVData()
@@ -331,9 +363,7 @@ def test_select_read():
     unique_times = np.unique(uvfits_uv.time_array)
     uvtest.checkWarnings(uvfits_uv.read, [uvfits_file],
                          {'time_range': [unique_times[0], unique_times[1]]},
-                         nwarnings=2,
-                         message=['Warning: "time_range" keyword is set',
-                                  'Telescope EVLA is not'])
+                         message='Telescope EVLA is not')
     uvtest.checkWarnings(uvfits_uv2.read, [uvfits_file],
                          message='Telescope EVLA is not')
     uvfits_uv2.select(times=unique_times[0:2])
@@ -463,6 +493,117 @@ def test_select_read():
     nt.assert_equal(uvfits_uv, uvfits_uv2)
 
 
+def test_time_range_read():
+    """Test select on read using time_range and contiguous blts."""
+    uv_in = UVData()
+    uv_out = UVData()
+    testfile = os.path.join(DATA_PATH, 'zen.2456865.60537.xy.uvcRREAAM.uvfits')
+    uvtest.checkWarnings(uv_in.read_uvfits, [testfile], known_warning='paper_uvfits')
+    unique_times = np.unique(uv_in.time_array)
+
+    for time_range in [[unique_times[0], unique_times[0]],
+                       [unique_times[3], unique_times[7]],
+                       [unique_times[-1] - 1e-9, unique_times[-1] + 1.]]:
+        uvtest.checkWarnings(uv_out.read, [testfile], {'time_range': time_range},
+                             known_warning='paper_uvfits')
+        exp_uv = uv_in.select(times=unique_times[(unique_times >= time_range[0])
+                                                 & (unique_times <= time_range[1])],
+                              inplace=False)
+        nt.assert_equal(uv_out, exp_uv)
+
+    # a contiguous run of blts is read as a view of the file
+    uvtest.checkWarnings(uv_out.read_uvfits, [testfile],
+                         {'time_range': [unique_times[3], unique_times[7]],
+                          'memmap_data': True},
+                         known_warning='paper_uvfits')
+    nt.assert_false(uv_out.data_array.flags.c_contiguous)
+    nt.assert_equal(uv_out, uv_in.select(times=unique_times[3:8], inplace=False))
+
+    # combined with other selects
+    uvtest.checkWarnings(uv_out.read, [testfile],
+                         {'time_range': [unique_times[3], unique_times[7]],
+                          'freq_chans': np.arange(4), 'polarizations': [-7]},
+                         known_warning='paper_uvfits')
+    exp_uv = uv_in.select(times=unique_times[3:8], freq_chans=np.arange(4),
+                          polarizations=[-7], inplace=False)
+    nt.assert_equal(uv_out, exp_uv)
+
+    nt.assert_raises(ValueError, uv_out.read_uvfits, testfile,
+                     times=unique_times[0:2], time_range=[unique_times[0], unique_times[1]])
+    nt.assert_raises(ValueError, uv_out.read_uvfits, testfile,
+                     time_range=[unique_times[-1] + 1., unique_times[-1] + 2.])
+
+
+def test_lazy_read():
+    """Test reading the data arrays lazily from uvfits files."""
+    uv_in = UVData()
+    uv_lazy = UVData()
+    for filename, kwargs in [('hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits',
+                              {'nwarnings': 0}),
+                             ('zen.2456865.60537.xy.uvcRREAAM.uvfits',
+                              {'known_warning': 'paper_uvfits'})]:
+        testfile = os.path.join(DATA_PATH, filename)
+        uvtest.checkWarnings(uv_in.read_uvfits, [testfile], **kwargs)
+        uvtest.checkWarnings(uv_lazy.read_uvfits, [testfile], {'lazy': True}, **kwargs)
+        nt.assert_true(isinstance(uv_lazy.data_array, uvutils._LazyArray))
+        nt.assert_true(isinstance(uv_lazy.flag_array, uvutils._LazyArray))
+        nt.assert_true(isinstance(uv_lazy.nsample_array, uvutils._LazyArray))
+
+        key = tuple(uv_in.get_antpairpols()[1])
+        nt.assert_true(np.array_equal(uv_in.get_data(key), uv_lazy.get_data(key)))
+        nt.assert_true(np.array_equal(uv_in.get_flags(key), uv_lazy.get_flags(key)))
+        nt.assert_true(np.array_equal(uv_in.get_nsamples(key), uv_lazy.get_nsamples(key)))
+
+        uv_sel = uv_in.select(times=np.unique(uv_in.time_array)[:1],
+                              freq_chans=np.arange(2, 8), inplace=False)
+        uv_lazy_sel = uv_lazy.select(times=np.unique(uv_in.time_array)[:1],
+                                     freq_chans=np.arange(2, 8), inplace=False)
+        nt.assert_equal(uv_sel, uv_lazy_sel)
+
+        # equality and check load the full arrays
+        nt.assert_equal(uv_in, uv_lazy)
+        nt.assert_true(isinstance(uv_lazy.data_array, np.ndarray))
+
+        # in-place flagging and ndarray methods load the arrays
+        uvtest.checkWarnings(uv_lazy.read_uvfits, [testfile], {'lazy': True}, **kwargs)
+        uv_lazy.flag_array[0] = True
+        nt.assert_true(isinstance(uv_lazy.flag_array, np.ndarray))
+        nt.assert_true(uv_lazy.flag_array.any())
+        nt.assert_true(np.array_equal(uv_lazy.data_array.conj(), uv_in.data_array.conj()))
+        nt.assert_true(isinstance(uv_lazy.data_array, np.ndarray))
+
+
+def test_memmap_data_read():
+    """Test reading the data arrays as views of the raw uvfits data."""
+    uv_in = UVData()
+    uv_view = UVData()
+    for filename, kwargs in [('hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits',
+                              {'nwarnings': 0}),
+                             ('zen.2456865.60537.xy.uvcRREAAM.uvfits',
+                              {'known_warning': 'paper_uvfits'})]:
+        testfile = os.path.join(DATA_PATH, filename)
+        uvtest.checkWarnings(uv_in.read_uvfits, [testfile], **kwargs)
+        uvtest.checkWarnings(uv_view.read, [testfile], {'memmap_data': True}, **kwargs)
+        nt.assert_equal(uv_view.data_array.dtype, np.complex64)
+        nt.assert_equal(uv_view.nsample_array.dtype, np.float32)
+        nt.assert_false(uv_view.data_array.flags.owndata)
+        nt.assert_false(uv_view.nsample_array.flags.owndata)
+        nt.assert_equal(uv_in, uv_view)
+
+        # the file is not changed
+        uv_view.data_array *= 2
+        uvtest.checkWarnings(uv_view.read, [testfile], {'memmap_data': True}, **kwargs)
+        nt.assert_equal(uv_in, uv_view)
+
+        # views of a select on read
+        select_kwargs = {'times': np.unique(uv_in.time_array)[:1],
+                         'freq_chans': np.arange(2, 8)}
+        uvtest.checkWarnings(uv_view.read, [testfile],
+                             dict(select_kwargs, memmap_data=True), **kwargs)
+        nt.assert_false(uv_view.data_array.flags.owndata)
+        nt.assert_equal(uv_in.select(inplace=False, **select_kwargs), uv_view)
+
+
 def test_ReadUVFitsWriteMiriad():
     """
     read uvfits, write miriad test.
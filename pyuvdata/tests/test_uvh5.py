@@ -13,6 +13,7 @@ import numpy as np
 import nose.tools as nt
 from astropy.time import Time
 from pyuvdata import UVData
+from pyuvdata import uvh5
 import pyuvdata.utils as uvutils
 from pyuvdata.data import DATA_PATH
 import pyuvdata.tests as uvtest
@@ -182,6 +183,35 @@ def test_UVH5ReadMultiple_files():
     return
 
 
+def test_UVH5ReadMultiple_files_axis():
+    """
+    Test reading multiple uvh5 files with fast concatenation along an axis
+    """
+    uv_full = UVData()
+    uvfits_file = os.path.join(DATA_PATH,
+                               'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    uv_full.read_uvfits(uvfits_file)
+    testfiles = [os.path.join(DATA_PATH, 'test', 'uv{}.uvh5'.format(i)) for i in range(3)]
+    for i, testfile in enumerate(testfiles):
+        uv = uv_full.select(polarizations=uv_full.polarization_array[i:i + 1], inplace=False)
+        uv.write_uvh5(testfile, clobber=True)
+    uv = uv_full.select(polarizations=uv_full.polarization_array[:3], inplace=False)
+    uv1 = UVData()
+    uv1.read(testfiles, axis='polarization')
+    nt.assert_true(uvutils._check_histories(uv_full.history + '  Downselected to '
+                                            'specific polarizations using pyuvdata. '
+                                            'Combined data along polarization axis using'
+                                            ' pyuvdata.', uv1.history))
+    uv1.history = uv.history
+    nt.assert_equal(uv1, uv)
+
+    # clean up
+    for testfile in testfiles:
+        os.remove(testfile)
+
+    return
+
+
 def test_UVH5PartialRead():
     """
     Test reading in only part of a dataset from disk
@@ -744,6 +774,167 @@ def test_UVH5PartialWriteIrregular():
     return
 
 
+def test_UVH5PartialWriteRuns():
+    """
+    Test writing irregular selections of a uvh5 file as hyperslabs
+    """
+    # regularly spaced indices are one strided hyperslab, others contiguous runs
+    runs = uvh5._write_runs(np.array([2, 5, 8, 11]), 12)
+    nt.assert_equal(runs, [(slice(2, 12, 3), slice(0, 4), None)])
+    runs = uvh5._write_runs(np.array([1, 2, 3, 5, 9, 10]), 12)
+    nt.assert_equal(runs, [(slice(1, 4), slice(0, 3), None), (slice(5, 6), slice(3, 4), None),
+                           (slice(9, 11), slice(4, 6), None)])
+    nt.assert_equal(uvh5._write_runs(None, 12), [(slice(0, 12), slice(0, 12), None)])
+
+    full_uvh5 = UVData()
+    uvfits_file = os.path.join(DATA_PATH,
+                               'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    full_uvh5.read_uvfits(uvfits_file)
+    partial_uvh5 = copy.deepcopy(full_uvh5)
+    partial_uvh5.data_array = None
+    partial_uvh5.flag_array = None
+    partial_uvh5.nsample_array = None
+    partial_testfile = os.path.join(DATA_PATH, 'test', 'outtest_partial.uvh5')
+    partial_uvh5.initialize_uvh5_file(partial_testfile, clobber=True)
+
+    # write the data in irregular pieces along all three axes
+    blt_parts = [np.arange(0, 7), np.arange(7, 190, 2), np.arange(8, 190, 2)]
+    freq_parts = [np.array([0, 1, 2, 5, 6, 9]),
+                  np.setdiff1d(np.arange(full_uvh5.Nfreqs), [0, 1, 2, 5, 6, 9])]
+    pol_parts = [np.array([0, 1, 3]), np.array([2])]
+    messages = ['Selected frequencies are not evenly spaced',
+                'Selected polarization values are not evenly spaced']
+    for blt_inds in blt_parts:
+        for freq_inds in freq_parts:
+            for pol_inds in pol_parts:
+                key = np.ix_(blt_inds, [0], freq_inds, pol_inds)
+                nwarnings = 2 if len(pol_inds) > 1 else 1
+                uvtest.checkWarnings(partial_uvh5.write_uvh5_part,
+                                     [partial_testfile, full_uvh5.data_array[key],
+                                      full_uvh5.flag_array[key], full_uvh5.nsample_array[key]],
+                                     {'check_header': False, 'blt_inds': blt_inds,
+                                      'freq_chans': freq_inds,
+                                      'polarizations': full_uvh5.polarization_array[pol_inds]},
+                                     nwarnings=nwarnings, message=messages[:nwarnings])
+    partial_uvh5.read(partial_testfile)
+    nt.assert_equal(full_uvh5, partial_uvh5)
+
+    # clean up
+    os.remove(partial_testfile)
+
+    return
+
+
+def test_UVH5Writer():
+    """
+    Test writing a uvh5 file in many parts with a writer
+    """
+    full_uvh5 = UVData()
+    uvfits_file = os.path.join(DATA_PATH,
+                               'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    full_uvh5.read_uvfits(uvfits_file)
+    partial_uvh5 = copy.deepcopy(full_uvh5)
+    partial_uvh5.data_array = None
+    partial_uvh5.flag_array = None
+    partial_uvh5.nsample_array = None
+    partial_testfile = os.path.join(DATA_PATH, 'test', 'outtest_partial.uvh5')
+    partial_uvh5.initialize_uvh5_file(partial_testfile, clobber=True)
+
+    # write each baseline in a separate part
+    with partial_uvh5.open_uvh5_writer(partial_testfile) as writer:
+        nt.assert_true(isinstance(writer, uvh5.UVH5Writer))
+        for key in full_uvh5.get_antpairs():
+            writer.write_part(full_uvh5.get_data(key, squeeze='none'),
+                              full_uvh5.get_flags(key, squeeze='none'),
+                              full_uvh5.get_nsamples(key, squeeze='none'), bls=key)
+    partial_uvh5.read(partial_testfile)
+    nt.assert_equal(full_uvh5, partial_uvh5)
+
+    # writing after closing the writer fails
+    key = full_uvh5.get_antpairs()[0]
+    data = full_uvh5.get_data(key, squeeze='none')
+    flags = full_uvh5.get_flags(key, squeeze='none')
+    nsamples = full_uvh5.get_nsamples(key, squeeze='none')
+    nt.assert_raises(ValueError, writer.write_part, data, flags, nsamples, bls=key)
+
+    # the file is closed if the header check fails
+    empty_uvd = UVData()
+    n_open = h5py.h5f.get_obj_count(types=h5py.h5f.OBJ_FILE)
+    nt.assert_raises(AssertionError, empty_uvd.open_uvh5_writer, partial_testfile)
+    nt.assert_equal(h5py.h5f.get_obj_count(types=h5py.h5f.OBJ_FILE), n_open)
+
+    # wrong shape
+    writer = partial_uvh5.open_uvh5_writer(partial_testfile, check_header=False)
+    nt.assert_raises(AssertionError, writer.write_part, data, flags[:, :, :, 0], nsamples,
+                     bls=key)
+    nt.assert_raises(AssertionError, writer.write_part, data[:, :, :, 0],
+                     flags[:, :, :, 0], nsamples[:, :, :, 0])
+    writer.close()
+
+    # clean up
+    os.remove(partial_testfile)
+
+    return
+
+
+def test_UVH5Append():
+    """
+    Test appending baseline-times to a resizable uvh5 file
+    """
+    uv1 = UVData()
+    uvfits_file = os.path.join(DATA_PATH,
+                               'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    uv1.read_uvfits(uvfits_file)
+    testfile = os.path.join(DATA_PATH, 'test', 'outtest.uvh5')
+
+    # make a second integration
+    uv2 = copy.deepcopy(uv1)
+    uv2.time_array = uv2.time_array + 10. / 86400
+    latitude, longitude, altitude = uv2.telescope_location_lat_lon_alt_degrees
+    uv2.lst_array = uvutils.get_lst_for_time(uv2.time_array, latitude, longitude, altitude)
+    uv2.data_array = 2 * uv2.data_array
+
+    # write the first integration and append the second one
+    uv1.initialize_uvh5_file(testfile, clobber=True, resizable=True)
+    with uv1.open_uvh5_writer(testfile) as writer:
+        writer.write_part(uv1.data_array, uv1.flag_array, uv1.nsample_array)
+        writer.append_blts(uv2.data_array, uv2.flag_array, uv2.nsample_array, uv2.time_array,
+                           uv2.ant_1_array, uv2.ant_2_array, uv2.uvw_array,
+                           uv2.integration_time)
+
+        # wrong shapes
+        nt.assert_raises(AssertionError, writer.append_blts, uv2.data_array,
+                         uv2.flag_array[:, :, :, 0], uv2.nsample_array, uv2.time_array,
+                         uv2.ant_1_array, uv2.ant_2_array, uv2.uvw_array, uv2.integration_time)
+        nt.assert_raises(AssertionError, writer.append_blts, uv2.data_array,
+                         uv2.flag_array, uv2.nsample_array, uv2.time_array,
+                         uv2.ant_1_array, uv2.ant_2_array, uv2.uvw_array[:, :2],
+                         uv2.integration_time)
+
+    uv_out = UVData()
+    uv_out.read(testfile)
+    nt.assert_equal(uv_out.Nblts, uv1.Nblts + uv2.Nblts)
+    nt.assert_equal(uv_out.Ntimes, 2)
+    nt.assert_equal(uv_out.Nbls, uv1.Nbls)
+    nt.assert_equal(uv_out.Nants_data, uv1.Nants_data)
+    for uv in [uv1, uv2]:
+        uv_time = uv_out.select(times=uv.time_array[:1], inplace=False)
+        uv.history = uv_time.history
+        nt.assert_equal(uv, uv_time)
+
+    # appending is only possible for resizable files
+    uv1.initialize_uvh5_file(testfile, clobber=True)
+    with uv1.open_uvh5_writer(testfile) as writer:
+        nt.assert_raises(ValueError, writer.append_blts, uv2.data_array, uv2.flag_array,
+                         uv2.nsample_array, uv2.time_array, uv2.ant_1_array,
+                         uv2.ant_2_array, uv2.uvw_array, uv2.integration_time)
+
+    # clean up
+    os.remove(testfile)
+
+    return
+
+
 def test_UVH5PartialWriteErrors():
     """
     Test errors in uvh5_write_part method
@@ -898,3 +1089,224 @@ def test_UVH5LstArray():
     os.remove(testfile)
 
     return
+
+
+def test_UVH5StreamSelect():
+    """
+    Test selecting from one uvh5 file into another in chunks
+    """
+    uv_in = UVData()
+    uv_out = UVData()
+    uv_stream = UVData()
+    uvfits_file = os.path.join(DATA_PATH,
+                               'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    uv_in.read_uvfits(uvfits_file)
+    testfile = os.path.join(DATA_PATH, 'test', 'outtest.uvh5')
+    outfile = os.path.join(DATA_PATH, 'test', 'outtest_select.uvh5')
+    uv_in.write_uvh5(testfile, clobber=True)
+
+    # no select, tiny memory budget so each blt is a separate chunk
+    uv_stream.stream_select_uvh5(testfile, outfile, max_memory=1, clobber=True)
+    uv_out.read(outfile)
+    nt.assert_equal(uv_in, uv_out)
+
+    # select on several axes, several blts per chunk
+    ants_to_keep = np.array([0, 1, 3, 7, 11, 12, 13, 18])
+    freqs_to_keep = np.arange(10, 60, 2)
+    uv_stream.stream_select_uvh5(testfile, outfile, antenna_nums=ants_to_keep,
+                                 freq_chans=freqs_to_keep,
+                                 polarizations=uv_in.polarization_array[1:3],
+                                 max_memory=5 * 2 * 13 * uv_in.Nfreqs * uv_in.Npols,
+                                 clobber=True)
+    uv_sel = uv_in.select(antenna_nums=ants_to_keep, freq_chans=freqs_to_keep,
+                          polarizations=uv_in.polarization_array[1:3], inplace=False)
+    uv_out.read(outfile)
+    nt.assert_equal(uv_sel, uv_out)
+
+    # object holds the output metadata only
+    nt.assert_true(uv_stream.data_array is None)
+    uv_sel.data_array = None
+    uv_sel.flag_array = None
+    uv_sel.nsample_array = None
+    nt.assert_equal(uv_sel, uv_stream)
+
+    # errors
+    nt.assert_raises(ValueError, uv_stream.stream_select_uvh5, testfile, outfile,
+                     max_memory=0, clobber=True)
+    nt.assert_raises(ValueError, uv_stream.stream_select_uvh5, testfile, outfile)
+
+    # clean up
+    os.remove(testfile)
+    os.remove(outfile)
+
+    return
+
+
+def test_UVH5HyperslabRead():
+    """
+    Test reading non-contiguous selections on several axes from a uvh5 file
+    """
+    uv_in = UVData()
+    uv_out = UVData()
+    uvfits_file = os.path.join(DATA_PATH,
+                               'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    uv_in.read_uvfits(uvfits_file)
+    testfile = os.path.join(DATA_PATH, 'test', 'outtest.uvh5')
+    uv_in.write_uvh5(testfile, clobber=True)
+
+    # runs are split at gaps and merged within blocks
+    runs = uvh5._index_runs(np.array([1, 2, 3, 5, 9, 10]), 12)
+    nt.assert_equal([(r[0], r[1]) for r in runs],
+                    [(slice(1, 4), slice(0, 3)), (slice(5, 6), slice(3, 4)),
+                     (slice(9, 11), slice(4, 6))])
+    nt.assert_true(all(r[2] is None for r in runs))
+    runs = uvh5._index_runs(np.array([1, 2, 3, 5, 9, 10]), 12, block=8)
+    nt.assert_equal([(r[0], r[1]) for r in runs],
+                    [(slice(1, 6), slice(0, 4)), (slice(9, 11), slice(4, 6))])
+    nt.assert_true(np.array_equal(runs[0][2], [0, 1, 2, 4]))
+    nt.assert_true(runs[1][2] is None)
+    runs = uvh5._index_runs(np.array([1, 2, 3, 5, 9, 10, 22]), 24, block=8,
+                            max_gap=4, max_span=12)
+    nt.assert_equal([(r[0], r[1]) for r in runs],
+                    [(slice(1, 11), slice(0, 6)), (slice(22, 23), slice(6, 7))])
+    nt.assert_true(np.array_equal(runs[0][2], [0, 1, 2, 4, 8, 9]))
+    runs = uvh5._index_runs(None, 12)
+    nt.assert_equal(runs, [(slice(0, 12), slice(0, 12), None)])
+
+    # sparse baselines with gappy frequencies and polarizations
+    bls_to_keep = [(0, 1), (3, 7), (11, 18), (12, 13)]
+    freqs_to_keep = np.arange(3, 60, 4)
+    pols_to_keep = uv_in.polarization_array[[1, 3]]
+    uv_out.read(testfile, bls=bls_to_keep, freq_chans=freqs_to_keep,
+                polarizations=pols_to_keep)
+    uv_sel = uv_in.select(bls=bls_to_keep, freq_chans=freqs_to_keep,
+                          polarizations=pols_to_keep, inplace=False)
+    nt.assert_equal(uv_sel, uv_out)
+
+    # a single axis selection
+    uv_out.read(testfile, freq_chans=freqs_to_keep)
+    uv_sel = uv_in.select(freq_chans=freqs_to_keep, inplace=False)
+    nt.assert_equal(uv_sel, uv_out)
+
+    # clean up
+    os.remove(testfile)
+
+    return
+
+
+def test_UVH5ChunkShapes():
+    """
+    Test writing uvh5 files with chunk shape presets and explicit chunk shapes
+    """
+    uv_in = UVData()
+    uv_out = UVData()
+    uvfits_file = os.path.join(DATA_PATH,
+                               'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    uv_in.read_uvfits(uvfits_file)
+    testfile = os.path.join(DATA_PATH, 'test', 'outtest.uvh5')
+    row_size = uv_in.Nspws * uv_in.Nfreqs * uv_in.Npols * 8
+
+    # each row is a different baseline, so baseline-major chunks are rows up to the
+    # minimum size and time-major chunks hold all the rows of the only time
+    nblts_min = int(np.ceil(uvh5._chunk_min_size / float(row_size)))
+    expected = {True: ('auto', None),
+                'baseline-major': ('baseline-major',
+                                   (nblts_min, uv_in.Nspws, uv_in.Nfreqs, uv_in.Npols)),
+                'time-major': ('time-major',
+                               (uv_in.Nblts, uv_in.Nspws, uv_in.Nfreqs, uv_in.Npols)),
+                (10, 1, 16, 1): ('custom', (10, 1, 16, 1)),
+                (1000, 1, 16, 1): ('custom', (uv_in.Nblts, 1, 16, 1))}
+    for chunks, (layout, chunk_shape) in expected.items():
+        uv_in.write_uvh5(testfile, clobber=True, chunks=chunks)
+        with h5py.File(testfile, 'r') as f:
+            nt.assert_equal(f['/Header/data_layout'][()], layout)
+            for dset in ['visdata', 'flags', 'nsamples']:
+                if chunk_shape is not None:
+                    nt.assert_equal(f['/Data'][dset].chunks, chunk_shape)
+        uv_out.read(testfile)
+        nt.assert_equal(uv_in, uv_out)
+
+        bls_to_keep = [(0, 1), (3, 7), (11, 18)]
+        uv_out.read(testfile, bls=bls_to_keep)
+        nt.assert_equal(uv_in.select(bls=bls_to_keep, inplace=False), uv_out)
+
+    # the size limit shrinks the frequency extent of the chunks
+    max_size = uvh5._chunk_max_size
+    uvh5._chunk_max_size = 2 * uv_in.Nblts * uv_in.Npols * 8
+    try:
+        uv_in.initialize_uvh5_file(testfile, clobber=True, chunks='time-major')
+    finally:
+        uvh5._chunk_max_size = max_size
+    with h5py.File(testfile, 'r') as f:
+        nt.assert_equal(f['/Data/visdata'].chunks,
+                        (uv_in.Nblts, uv_in.Nspws, 2, uv_in.Npols))
+
+    # errors
+    nt.assert_raises(ValueError, uv_in.write_uvh5, testfile, clobber=True, chunks='foo')
+    nt.assert_raises(ValueError, uv_in.write_uvh5, testfile, clobber=True, chunks=(1, 1, 1))
+    nt.assert_raises(ValueError, uv_in.initialize_uvh5_file, testfile, clobber=True,
+                     chunks=(0, 1, 1, 1))
+
+    # clean up
+    os.remove(testfile)
+
+    return
+
+
+def test_UVH5LazyRead():
+    """
+    Test reading the data arrays lazily from a uvh5 file
+    """
+    uv_in = UVData()
+    uv_lazy = UVData()
+    uvfits_file = os.path.join(DATA_PATH,
+                               'hera19_8hrs_uncomp_10MHz_000_05.003111-05.033750.uvfits')
+    uv_in.read_uvfits(uvfits_file)
+    testfile = os.path.join(DATA_PATH, 'test', 'outtest.uvh5')
+    uv_in.write_uvh5(testfile, clobber=True)
+
+    uv_lazy.read(testfile, lazy=True)
+    nt.assert_true(isinstance(uv_lazy.data_array, uvutils._LazyArray))
+    nt.assert_true(isinstance(uv_lazy.flag_array, uvutils._LazyArray))
+    nt.assert_true(isinstance(uv_lazy.nsample_array, uvutils._LazyArray))
+
+    # accessors only read the indexed parts
+    key = (1, 2, 'xx')
+    nt.assert_true(np.array_equal(uv_in.get_data(key), uv_lazy.get_data(key)))
+    nt.assert_true(np.array_equal(uv_in.get_flags(key), uv_lazy.get_flags(key)))
+    nt.assert_true(np.array_equal(uv_in.get_nsamples(key), uv_lazy.get_nsamples(key)))
+    nt.assert_true(isinstance(uv_lazy.data_array, uvutils._LazyArray))
+
+    # select from the proxies
+    ants_to_keep = np.array([0, 3, 7, 11, 18])
+    uv_sel = uv_in.select(antenna_nums=ants_to_keep, freq_chans=np.arange(5, 50),
+                          inplace=False)
+    uv_lazy_sel = uv_lazy.select(antenna_nums=ants_to_keep, freq_chans=np.arange(5, 50),
+                                 inplace=False)
+    nt.assert_equal(uv_sel, uv_lazy_sel)
+
+    # check loads the full arrays
+    uv_lazy.check()
+    nt.assert_true(isinstance(uv_lazy.data_array, np.ndarray))
+    nt.assert_equal(uv_in, uv_lazy)
+
+    # in-place flagging and ndarray methods load the arrays
+    uv_lazy.read(testfile, lazy=True)
+    uv_lazy.flag_array[0] = True
+    nt.assert_true(isinstance(uv_lazy.flag_array, np.ndarray))
+    nt.assert_true(np.all(uv_lazy.flag_array[0]))
+    nt.assert_true(uv_lazy.flag_array.any())
+    nt.assert_true(np.array_equal(uv_lazy.data_array.copy(), uv_in.data_array))
+    nt.assert_true(isinstance(uv_lazy.data_array, np.ndarray))
+    nt.assert_true(np.array_equal(uv_lazy.data_array.conj(), uv_in.data_array.conj()))
+    nt.assert_equal(uv_lazy.nsample_array.astype(np.float64).dtype, np.float64)
+    nt.assert_true(isinstance(uv_lazy.nsample_array, np.ndarray))
+
+    # lazy is ignored when selecting on read
+    uv_lazy.read(testfile, lazy=True, antenna_nums=ants_to_keep)
+    nt.assert_true(isinstance(uv_lazy.data_array, np.ndarray))
+
+    # clean up
+    os.remove(testfile)
+
+    return
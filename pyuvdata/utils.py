@@ -13,7 +13,8 @@ import six
 import warnings
 import copy
 from astropy.time import Time
-from astropy.coordinates import Angle
+from astropy.coordinates import Angle, SkyCoord, CartesianRepresentation
+import astropy.units as units
 
 # parameters for transforming between xyz & lat/lon/alt
 gps_b = 6356752.31424518
@@ -384,6 +385,281 @@ def unphase_uvw(ra, dec, uvw):
     return(xyz)
 
 
+class _LRUCache(object):
+    """
+    A bounded cache with least-recently-used eviction and hit/miss counters.
+
+    Used to memoize expensive astropy calculations across UVData objects.
+    A maxsize of 0 (the default) disables the cache.
+    """
+
+    def __init__(self, maxsize=0):
+        self._data = collections.OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def get(self, key):
+        """Return the cached value for key (or None if missing)."""
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        # re-insert to mark as most recently used
+        self._data[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Add a value to the cache, evicting the least recently used entries."""
+        if not self.enabled:
+            return
+        self._data.pop(key, None)
+        self._data[key] = value
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def resize(self, maxsize):
+        """Set the maximum number of entries, evicting entries if needed."""
+        if maxsize < 0:
+            raise ValueError('maxsize must be a non-negative integer.')
+        self.maxsize = int(maxsize)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset the hit/miss counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Return a dict with the hits, misses, maxsize and currsize."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'maxsize': self.maxsize, 'currsize': len(self._data)}
+
+
+_frame_transform_cache = _LRUCache()
+
+
+def set_frame_transform_cache_size(maxsize):
+    """
+    Set the size of the cache of telescope location frame transforms.
+
+    The cache is keyed on telescope location, JD and frame and is shared by all
+    UVData objects, so repeated phasing of data from the same observation
+    reuses the astropy frame transforms. It is disabled (size 0) by default.
+
+    Args:
+        maxsize: maximum number of (location, JD, frame) entries to cache.
+            Set to 0 to disable the cache.
+    """
+    _frame_transform_cache.resize(maxsize)
+
+
+def get_frame_transform_cache_info():
+    """
+    Get statistics for the cache of telescope location frame transforms.
+
+    Returns:
+        dict with the number of cache hits and misses, the maximum size
+        and the current number of entries.
+    """
+    return _frame_transform_cache.info()
+
+
+def clear_frame_transform_cache():
+    """Empty the cache of telescope location frame transforms and reset the counters."""
+    _frame_transform_cache.clear()
+
+
+def _get_frame_telescope_location(telescope_location, jd_array, frame):
+    """
+    Get the telescope location in an astropy frame for a set of times.
+
+    Uses (and fills) the frame transform cache if it is enabled
+    (see set_frame_transform_cache_size).
+
+    Args:
+        telescope_location: ECEF x,y,z of the telescope in meters, shape (3,)
+        jd_array: array of JD times
+        frame: the astropy frame to transform to. Either 'icrs' or 'gcrs'.
+
+    Returns:
+        numpy array of shape (Ntimes, 3) with the cartesian telescope
+        location in the frame in meters.
+    """
+    jd_array = np.asarray(jd_array, dtype=np.float64).reshape(-1)
+    frame_location = np.zeros((jd_array.size, 3), dtype=np.float64)
+
+    compute = np.ones(jd_array.size, dtype=bool)
+    if _frame_transform_cache.enabled:
+        location_key = tuple(float(x) for x in telescope_location)
+        for ind, jd in enumerate(jd_array):
+            cached = _frame_transform_cache.get((location_key, float(jd), frame))
+            if cached is not None:
+                frame_location[ind] = cached
+                compute[ind] = False
+
+    if np.any(compute):
+        obs_times = Time(jd_array[compute], format='jd')
+        telescope_xyz = np.tile(telescope_location, (obs_times.size, 1))
+        itrs_telescope_location = SkyCoord(CartesianRepresentation(telescope_xyz.T * units.m),
+                                           frame='itrs', obstime=obs_times)
+        frame_telescope_location = itrs_telescope_location.transform_to(frame)
+        frame_location[compute] = frame_telescope_location.cartesian.get_xyz().to('m').value.T
+
+        if _frame_transform_cache.enabled:
+            for jd, location in zip(jd_array[compute], frame_location[compute]):
+                _frame_transform_cache.put((location_key, float(jd), frame), location.copy())
+
+    return frame_location
+
+
+class _LazyArray(object):
+    """
+    Array-like proxy for data stored on disk.
+
+    Indexing reads only the requested part of the data through the reader
+    function. Converting to a numpy array (np.asarray) reads and keeps the
+    full array. Assigning to items or using any other ndarray attribute or
+    method also loads the full array.
+
+    Args:
+        shape: Shape of the full array.
+        dtype: numpy dtype of the array returned by the reader.
+        reader: Function taking a tuple with one index per axis and returning a
+            numpy array. Each index is an integer, a slice with a positive step
+            or (on at most one axis) a sorted array of unique integers.
+        param: Optional UVParameter holding this object as its value. Once the
+            full array is loaded it replaces this object as the parameter value.
+    """
+
+    def __init__(self, shape, dtype, reader, param=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._reader = reader
+        self._param = param
+        self._array = None
+
+    def _load(self):
+        """Read the full array and store it on the parameter holding this object."""
+        if self._array is None:
+            self._array = self._reader(tuple(slice(None) for _ in self.shape))
+        if self._param is not None and self._param.value is self:
+            self._param.value = self._array
+        return self._array
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None):
+        array = self._load()
+        if dtype is None:
+            return array
+        return array.astype(dtype, copy=False)
+
+    def __getattr__(self, name):
+        # only called for attributes not defined here, forward them to the
+        # loaded array. Private names are not forwarded so that copying and
+        # pickling do not trigger a read.
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+
+    def __getitem__(self, key):
+        if self._array is not None:
+            return self._array[key]
+
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is None for k in key):
+            # new axes are not supported by the readers
+            return np.asarray(self)[key]
+        n_ellipsis = sum(k is Ellipsis for k in key)
+        if n_ellipsis > 1:
+            raise IndexError('an index can only have a single ellipsis')
+        elif n_ellipsis == 1:
+            ind = [k is Ellipsis for k in key].index(True)
+            key = (key[:ind] + (slice(None),) * (self.ndim - len(key) + 1)
+                   + key[ind + 1:])
+        if len(key) > self.ndim:
+            raise IndexError('too many indices for array')
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        # normalize indices: positive integers, forward slices and integer arrays
+        norm_key = []
+        array_axes = []
+        int_axes = []
+        for axis, (k, size) in enumerate(zip(key, self.shape)):
+            if isinstance(k, slice):
+                start, stop, step = k.indices(size)
+                if step > 0:
+                    norm_key.append(slice(start, stop, step))
+                    continue
+                k = np.arange(start, stop, step)
+            if isinstance(k, (int, np.integer)):
+                if k < -size or k >= size:
+                    raise IndexError('index {k} is out of bounds for axis {axis} '
+                                     'with size {size}'.format(k=k, axis=axis, size=size))
+                norm_key.append(int(k) % size)
+                int_axes.append(axis)
+                continue
+            k = np.asarray(k)
+            if k.dtype == np.bool_:
+                k = np.nonzero(k)[0]
+            if np.any((k < -size) | (k >= size)):
+                raise IndexError('index out of bounds for axis {axis} with size '
+                                 '{size}'.format(axis=axis, size=size))
+            norm_key.append(k.astype(np.int64) % size)
+            array_axes.append(axis)
+
+        if len(array_axes) == 0:
+            return self._reader(tuple(norm_key))
+
+        if len(array_axes) == 1 and len(int_axes) == 0:
+            # read the sorted unique indices, then rearrange in memory
+            axis = array_axes[0]
+            inds = norm_key[axis]
+            if inds.size == 0:
+                norm_key[axis] = slice(0, 0)
+                return self._reader(tuple(norm_key))
+            unique_inds, inverse = np.unique(inds, return_inverse=True)
+            norm_key[axis] = unique_inds
+            out = self._reader(tuple(norm_key))
+            return np.take(out, inverse.reshape(inds.shape), axis=axis)
+
+        # general case: read the bounding hyperslab and index it in memory
+        read_key = []
+        mem_key = []
+        for k in norm_key:
+            if isinstance(k, slice):
+                read_key.append(k)
+                mem_key.append(slice(None))
+            else:
+                k_min = int(np.min(k)) if np.size(k) > 0 else 0
+                k_max = int(np.max(k)) if np.size(k) > 0 else 0
+                read_key.append(slice(k_min, k_max + 1))
+                mem_key.append(k - k_min)
+        return self._reader(tuple(read_key))[tuple(mem_key)]
+
+
 def get_iterable(x):
     warnings.warn('The get_iterable function is deprecated in favor of '
                   '_get_iterable because it is not API level code', DeprecationWarning)
@@ -437,10 +713,48 @@ def _fits_gethduaxis(HDU, axis, strict_fits=True):
     return dX * (np.arange(N) - Xi0) + X0
 
 
+_lst_cache = _LRUCache()
+
+
+def set_lst_cache_size(maxsize):
+    """
+    Set the size of the memo of LSTs calculated by get_lst_for_time.
+
+    The memo is keyed on telescope location and JD and is shared by all
+    objects in the process, so re-reading files from the same night skips the
+    astropy sidereal time calculation. It is disabled (size 0) by default.
+
+    Args:
+        maxsize: maximum number of (location, JD) entries to keep.
+            Set to 0 to disable the memo.
+    """
+    _lst_cache.resize(maxsize)
+
+
+def get_lst_cache_info():
+    """
+    Get statistics for the memo of LSTs calculated by get_lst_for_time.
+
+    Returns:
+        dict with the number of cache hits and misses, the maximum size
+        and the current number of entries.
+    """
+    return _lst_cache.info()
+
+
+def clear_lst_cache():
+    """Empty the memo of LSTs calculated by get_lst_for_time and reset the counters."""
+    _lst_cache.clear()
+
+
 def get_lst_for_time(jd_array, latitude, longitude, altitude):
     """
     Get the lsts for a set of jd times at an earth location.
 
+    The lsts are calculated for the unique times in a single call to astropy.
+    If the lst memo is enabled (see set_lst_cache_size), previously calculated
+    values are reused.
+
     Args:
         jd_array: an array of JD times to get lst for
         latitude: latitude of location to get lst for in degrees
@@ -450,13 +764,30 @@ def get_lst_for_time(jd_array, latitude, longitude, altitude):
     Returns:
         an array of lst times corresponding to the jd_array
     """
-    lsts = []
+    jd_array = np.asarray(jd_array)
+    unique_jds, unique_inverse = np.unique(jd_array, return_inverse=True)
+    unique_lsts = np.zeros(unique_jds.size, dtype=np.float64)
+
+    compute = np.ones(unique_jds.size, dtype=bool)
+    if _lst_cache.enabled:
+        location_key = (float(latitude), float(longitude), float(altitude))
+        for ind, jd in enumerate(unique_jds):
+            cached = _lst_cache.get((location_key, float(jd)))
+            if cached is not None:
+                unique_lsts[ind] = cached
+                compute[ind] = False
+
+    if np.any(compute):
+        t = Time(unique_jds[compute], format='jd',
+                 location=(Angle(longitude, unit='deg'), Angle(latitude, unit='deg')))
+        unique_lsts[compute] = t.sidereal_time('apparent').radian
+
+        if _lst_cache.enabled:
+            for jd, lst in zip(unique_jds[compute], unique_lsts[compute]):
+                _lst_cache.put((location_key, float(jd)), float(lst))
+
     lst_array = np.zeros_like(jd_array)
-    for ind, jd in enumerate(np.unique(jd_array)):
-        t = Time(jd, format='jd', location=(Angle(longitude, unit='deg'),
-                                            Angle(latitude, unit='deg')))
-        lst_array[np.where(np.isclose(
-            jd, jd_array, atol=1e-6, rtol=1e-12))] = t.sidereal_time('apparent').radian
+    lst_array[...] = unique_lsts[unique_inverse].reshape(jd_array.shape)
 
     return lst_array
 
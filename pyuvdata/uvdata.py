@@ -11,6 +11,7 @@ from astropy import constants as const
 import astropy.units as units
 from astropy.time import Time
 from astropy.coordinates import SkyCoord, EarthLocation, FK5, Angle
+from astropy.coordinates import CartesianRepresentation
 import os
 import numpy as np
 import six
@@ -21,6 +22,7 @@ from . import telescopes as uvtel
 from . import utils as uvutils
 import copy
 import collections
+import weakref
 import re
 
 
@@ -323,8 +325,32 @@ class UVData(UVBase):
                                                        description=desc,
                                                        spoof_val=0)
 
+        # lazily built lookup table from baseline number to blt indices,
+        # see _get_blt_index
+        self._blt_index = None
+
         super(UVData, self).__init__()
 
+    def _load_lazy_arrays(self):
+        """
+        Load any data, flag or nsample arrays that were left on disk by a lazy
+        read (see read_uvh5 and read_uvfits) into memory.
+        """
+        for p in ['_data_array', '_flag_array', '_nsample_array']:
+            param = getattr(self, p)
+            if isinstance(param.value, uvutils._LazyArray):
+                param.value = np.asarray(param.value)
+
+    def __eq__(self, other, check_extra=True):
+        """
+        Equal if classes match and parameters are equal. Loads any lazily
+        read data arrays on both objects first.
+        """
+        self._load_lazy_arrays()
+        if isinstance(other, UVData):
+            other._load_lazy_arrays()
+        return super(UVData, self).__eq__(other, check_extra=check_extra)
+
     def check(self, check_extra=True, run_check_acceptability=True):
         """
         Add some extra checks on top of checks on UVBase class.
@@ -338,6 +364,9 @@ class UVData(UVBase):
             run_check_acceptability: Option to check if values in parameters
                 are acceptable. Default is True.
         """
+        # the data arrays must be in memory to check them
+        self._load_lazy_arrays()
+
         # first run the basic check from UVBase
         # set the phase type based on object's value
         if self.phase_type == 'phased':
@@ -531,6 +560,28 @@ class UVData(UVBase):
         latitude, longitude, altitude = self.telescope_location_lat_lon_alt_degrees
         self.lst_array = uvutils.get_lst_for_time(self.time_array, latitude, longitude, altitude)
 
+    def _antnums_to_antenna_inds(self, ant_nums):
+        """
+        Get the indices into antenna_numbers (and antenna_positions) for an
+        array of antenna numbers.
+
+        Args:
+            ant_nums: array of antenna numbers (e.g. ant_1_array)
+
+        Returns:
+            integer numpy array of indices, same shape as ant_nums
+        """
+        ant_nums = np.asarray(ant_nums)
+        sort_inds = np.argsort(self.antenna_numbers)
+        sorted_nums = np.asarray(self.antenna_numbers)[sort_inds]
+        ant_inds = np.searchsorted(sorted_nums, ant_nums)
+        ant_inds = np.clip(ant_inds, 0, sorted_nums.size - 1)
+        missing = sorted_nums[ant_inds] != ant_nums
+        if np.any(missing):
+            raise ValueError('Antenna numbers {ants} are not present in the '
+                             'antenna_numbers array.'.format(ants=np.unique(ant_nums[missing])))
+        return sort_inds[ant_inds]
+
     def unphase_to_drift(self, phase_frame=None, use_ant_pos=False):
         """
         Convert from a phased dataset to a drift dataset.
@@ -581,50 +632,35 @@ class UVData(UVBase):
         phs = np.exp(-1j * 2 * np.pi * (-1) * w_lambda[:, None, :, None])
         self.data_array *= phs
 
-        unique_times, unique_inds = np.unique(self.time_array, return_index=True)
-        for ind, jd in enumerate(unique_times):
-            inds = np.where(self.time_array == jd)[0]
-
-            obs_time = Time(jd, format='jd')
-
-            itrs_telescope_location = SkyCoord(x=self.telescope_location[0] * units.m,
-                                               y=self.telescope_location[1] * units.m,
-                                               z=self.telescope_location[2] * units.m,
-                                               representation='cartesian',
-                                               frame='itrs', obstime=obs_time)
-            frame_telescope_location = itrs_telescope_location.transform_to(phase_frame)
-            itrs_lat_lon_alt = self.telescope_location_lat_lon_alt
-
-            if use_ant_pos:
-                ant_uvw = uvutils.phase_uvw(self.telescope_location_lat_lon_alt[1],
-                                            self.telescope_location_lat_lon_alt[0],
-                                            self.antenna_positions)
-
-                for bl_ind in inds:
-                    ant1_index = np.where(self.antenna_numbers == self.ant_1_array[bl_ind])[0][0]
-                    ant2_index = np.where(self.antenna_numbers == self.ant_2_array[bl_ind])[0][0]
-                    self.uvw_array[bl_ind, :] = ant_uvw[ant2_index, :] - ant_uvw[ant1_index, :]
+        itrs_lat_lon_alt = self.telescope_location_lat_lon_alt
 
-            else:
-                uvws_use = self.uvw_array[inds, :]
+        if use_ant_pos:
+            ant_uvw = uvutils.phase_uvw(self.telescope_location_lat_lon_alt[1],
+                                        self.telescope_location_lat_lon_alt[0],
+                                        self.antenna_positions)
 
-                uvw_rel_positions = uvutils.unphase_uvw(frame_phase_center.ra.rad,
-                                                        frame_phase_center.dec.rad,
-                                                        uvws_use)
+            ant1_index = self._antnums_to_antenna_inds(self.ant_1_array)
+            ant2_index = self._antnums_to_antenna_inds(self.ant_2_array)
+            self.uvw_array = ant_uvw[ant2_index, :] - ant_uvw[ant1_index, :]
+        else:
+            unique_times, unique_inverse = np.unique(self.time_array, return_inverse=True)
+            frame_telescope_location = uvutils._get_frame_telescope_location(
+                self.telescope_location, unique_times, phase_frame)
 
-                frame_telescope_location.representation = 'cartesian'
+            uvw_rel_positions = uvutils.unphase_uvw(frame_phase_center.ra.rad,
+                                                    frame_phase_center.dec.rad,
+                                                    self.uvw_array)
+            frame_uvw_positions = uvw_rel_positions + frame_telescope_location[unique_inverse]
 
-                frame_uvw_coord = SkyCoord(x=uvw_rel_positions[:, 0] * units.m + frame_telescope_location.x,
-                                           y=uvw_rel_positions[:, 1] * units.m + frame_telescope_location.y,
-                                           z=uvw_rel_positions[:, 2] * units.m + frame_telescope_location.z,
-                                           representation='cartesian',
-                                           frame=phase_frame, obstime=obs_time)
+            obs_times = Time(self.time_array, format='jd')
+            frame_uvw_coord = SkyCoord(CartesianRepresentation(frame_uvw_positions.T * units.m),
+                                       frame=phase_frame, obstime=obs_times)
 
-                itrs_uvw_coord = frame_uvw_coord.transform_to('itrs')
+            itrs_uvw_coord = frame_uvw_coord.transform_to('itrs')
 
-                # now convert them to ENU, which is the space uvws are in
-                self.uvw_array[inds, :] = uvutils.ENU_from_ECEF(itrs_uvw_coord.cartesian.get_xyz().value.T,
-                                                                *itrs_lat_lon_alt)
+            # now convert them to ENU, which is the space uvws are in
+            self.uvw_array = uvutils.ENU_from_ECEF(itrs_uvw_coord.cartesian.get_xyz().value.T,
+                                                   *itrs_lat_lon_alt)
 
         # remove phase center
         self.phase_center_frame = None
@@ -696,69 +732,59 @@ class UVData(UVBase):
         # add in the telescope location for ICRS
         self.uvw_array = np.float64(self.uvw_array)
 
-        unique_times, unique_inds = np.unique(self.time_array, return_index=True)
-        for ind, jd in enumerate(unique_times):
-            inds = np.where(self.time_array == jd)[0]
-
-            obs_time = Time(jd, format='jd')
+        itrs_lat_lon_alt = self.telescope_location_lat_lon_alt
 
-            itrs_telescope_location = SkyCoord(x=self.telescope_location[0] * units.m,
-                                               y=self.telescope_location[1] * units.m,
-                                               z=self.telescope_location[2] * units.m,
-                                               representation='cartesian',
-                                               frame='itrs', obstime=obs_time)
-            itrs_lat_lon_alt = self.telescope_location_lat_lon_alt
+        # do all the frame transforms in one (array-valued) call to astropy
+        unique_times, unique_inverse = np.unique(self.time_array, return_inverse=True)
+        frame_telescope_location = uvutils._get_frame_telescope_location(
+            self.telescope_location, unique_times, phase_frame)
 
-            frame_telescope_location = itrs_telescope_location.transform_to(phase_frame)
+        if use_ant_pos:
+            # This promotion is REQUIRED to get the right answer when we
+            # add in the telescope location for ICRS
+            ecef_ant_pos = np.float64(self.antenna_positions) + self.telescope_location
 
-            frame_telescope_location.representation = 'cartesian'
+            # get the antenna positions at every unique time as a single
+            # flattened array of shape (Ntimes * Nants_telescope, 3)
+            n_ants = ecef_ant_pos.shape[0]
+            ecef_ant_pos = np.tile(ecef_ant_pos, (unique_times.size, 1))
+            obs_times = Time(np.repeat(unique_times, n_ants), format='jd')
 
-            if use_ant_pos:
-                # This promotion is REQUIRED to get the right answer when we
-                # add in the telescope location for ICRS
-                ecef_ant_pos = np.float64(self.antenna_positions) + self.telescope_location
+            itrs_ant_coord = SkyCoord(CartesianRepresentation(ecef_ant_pos.T * units.m),
+                                      frame='itrs', obstime=obs_times)
 
-                itrs_ant_coord = SkyCoord(x=ecef_ant_pos[:, 0] * units.m,
-                                          y=ecef_ant_pos[:, 1] * units.m,
-                                          z=ecef_ant_pos[:, 2] * units.m,
-                                          representation='cartesian',
-                                          frame='itrs', obstime=obs_time)
+            frame_ant_coord = itrs_ant_coord.transform_to(phase_frame)
 
-                frame_ant_coord = itrs_ant_coord.transform_to(phase_frame)
+            frame_ant_rel = (frame_ant_coord.cartesian.get_xyz().value.T
+                             - np.repeat(frame_telescope_location, n_ants, axis=0))
 
-                frame_ant_rel = (frame_ant_coord.cartesian
-                                 - frame_telescope_location.cartesian).get_xyz().T.value
-
-                frame_ant_uvw = uvutils.phase_uvw(frame_phase_center.ra.rad,
-                                                  frame_phase_center.dec.rad,
-                                                  frame_ant_rel)
-
-                for bl_ind in inds:
-                    ant1_index = np.where(self.antenna_numbers == self.ant_1_array[bl_ind])[0][0]
-                    ant2_index = np.where(self.antenna_numbers == self.ant_2_array[bl_ind])[0][0]
-                    self.uvw_array[bl_ind, :] = frame_ant_uvw[ant2_index, :] - frame_ant_uvw[ant1_index, :]
-            else:
-                # Also, uvws should be thought of like ENU, not ECEF (or rotated ECEF)
-                # convert them to ECEF to transform between frames
-                uvws_use = self.uvw_array[inds, :]
+            frame_ant_uvw = uvutils.phase_uvw(frame_phase_center.ra.rad,
+                                              frame_phase_center.dec.rad,
+                                              frame_ant_rel)
+            frame_ant_uvw = frame_ant_uvw.reshape(unique_times.size, n_ants, 3)
 
-                uvw_ecef = uvutils.ECEF_from_ENU(uvws_use, *itrs_lat_lon_alt)
+            ant1_index = self._antnums_to_antenna_inds(self.ant_1_array)
+            ant2_index = self._antnums_to_antenna_inds(self.ant_2_array)
+            self.uvw_array = (frame_ant_uvw[unique_inverse, ant2_index, :]
+                              - frame_ant_uvw[unique_inverse, ant1_index, :])
+        else:
+            # Also, uvws should be thought of like ENU, not ECEF (or rotated ECEF)
+            # convert them to ECEF to transform between frames
+            uvw_ecef = uvutils.ECEF_from_ENU(self.uvw_array, *itrs_lat_lon_alt)
 
-                itrs_uvw_coord = SkyCoord(x=uvw_ecef[:, 0] * units.m,
-                                          y=uvw_ecef[:, 1] * units.m,
-                                          z=uvw_ecef[:, 2] * units.m,
-                                          representation='cartesian',
-                                          frame='itrs', obstime=obs_time)
-                frame_uvw_coord = itrs_uvw_coord.transform_to(phase_frame)
+            obs_times = Time(self.time_array, format='jd')
+            itrs_uvw_coord = SkyCoord(CartesianRepresentation(uvw_ecef.T * units.m),
+                                      frame='itrs', obstime=obs_times)
+            frame_uvw_coord = itrs_uvw_coord.transform_to(phase_frame)
 
-                # this takes out the telescope location in the new frame,
-                # so these are vectors again
-                frame_rel_uvw = (frame_uvw_coord.cartesian.get_xyz().value.T
-                                 - frame_telescope_location.cartesian.get_xyz().value)
+            # this takes out the telescope location in the new frame,
+            # so these are vectors again
+            frame_rel_uvw = (frame_uvw_coord.cartesian.get_xyz().value.T
+                             - frame_telescope_location[unique_inverse])
 
-                self.uvw_array[inds, :] = uvutils.phase_uvw(frame_phase_center.ra.rad,
-                                                            frame_phase_center.dec.rad,
-                                                            frame_rel_uvw)
+            self.uvw_array = uvutils.phase_uvw(frame_phase_center.ra.rad,
+                                               frame_phase_center.dec.rad,
+                                               frame_rel_uvw)
 
         # calculate data and apply phasor
         w_lambda = (self.uvw_array[:, 2].reshape(self.Nblts, 1)
@@ -856,16 +882,10 @@ class UVData(UVBase):
         antenna_locs_ENU = uvutils.ENU_from_ECEF(
             (self.antenna_positions + self.telescope_location),
             *self.telescope_location_lat_lon_alt)
-        uvw_array = np.zeros((self.baseline_array.size, 3))
-        for baseline in list(set(self.baseline_array)):
-            baseline_inds = np.where(self.baseline_array == baseline)[0]
-            ant1_index = np.where(self.antenna_numbers
-                                  == self.ant_1_array[baseline_inds[0]])[0][0]
-            ant2_index = np.where(self.antenna_numbers
-                                  == self.ant_2_array[baseline_inds[0]])[0][0]
-            uvw_array[baseline_inds, :] = (antenna_locs_ENU[ant2_index, :]
-                                           - antenna_locs_ENU[ant1_index, :])
-        self.uvw_array = uvw_array
+        ant1_index = self._antnums_to_antenna_inds(self.ant_1_array)
+        ant2_index = self._antnums_to_antenna_inds(self.ant_2_array)
+        self.uvw_array = (antenna_locs_ENU[ant2_index, :]
+                          - antenna_locs_ENU[ant1_index, :])
         if phase_type == 'phased':
             self.phase(phase_center_ra, phase_center_dec, phase_center_epoch,
                        phase_frame=output_phase_frame)
@@ -913,16 +933,24 @@ class UVData(UVBase):
         history_update_string = ' Combined data along '
         n_axes = 0
 
-        # Create blt arrays for convenience
+        # Create integer blt keys for convenience. Times are quantized to
+        # prec_t decimal places as an (integer day, fractional part) pair so
+        # they fit in int64, then the unique quantized times are ranked so
+        # that the keys sort by time and then baseline.
         prec_t = - 2 * \
             np.floor(np.log10(this._time_array.tols[-1])).astype(int)
-        prec_b = 8
-        this_blts = np.array(["_".join(["{1:.{0}f}".format(prec_t, blt[0]),
-                                        str(blt[1]).zfill(prec_b)]) for blt in
-                              zip(this.time_array, this.baseline_array)])
-        other_blts = np.array(["_".join(["{1:.{0}f}".format(prec_t, blt[0]),
-                                         str(blt[1]).zfill(prec_b)]) for blt in
-                               zip(other.time_array, other.baseline_array)])
+        times = np.concatenate((this.time_array, other.time_array))
+        days = np.floor(times)
+        time_q = np.zeros(times.size, dtype=[('day', np.int64), ('frac', np.int64)])
+        time_q['frac'] = np.round((times - days) * 10 ** prec_t)
+        time_q['day'] = days + time_q['frac'] // 10 ** prec_t
+        time_q['frac'] %= 10 ** prec_t
+        _, time_rank = np.unique(time_q, return_inverse=True)
+        baselines = np.concatenate((this.baseline_array,
+                                    other.baseline_array)).astype(np.int64)
+        blt_keys = time_rank.astype(np.int64) * (np.max(baselines) + 1) + baselines
+        this_blts = blt_keys[:this.Nblts]
+        other_blts = blt_keys[this.Nblts:]
         # Check we don't have overlapping data
         both_pol = np.intersect1d(
             this.polarization_array, other.polarization_array)
@@ -1103,11 +1131,150 @@ class UVData(UVBase):
         self.__add__(other, inplace=True)
         return self
 
+    def fast_concat(self, other, axis, run_check=True, check_extra=True,
+                    run_check_acceptability=True, inplace=False):
+        """
+        Concatenate one or more UVData objects onto this one along a single
+        axis. Unlike __add__, the output arrays are allocated once and each
+        input is copied exactly once. The data are not checked for overlaps
+        and are not sorted along the concatenation axis (they are kept in the
+        order given), so it is up to the caller to ensure the objects are
+        disjoint along that axis. All other axes must match.
+
+        Args:
+            other: Another UVData object or a list of UVData objects to
+                concatenate onto self.
+            axis: Axis to concatenate along, one of 'blt', 'freq' or
+                'polarization'.
+            run_check: Option to check for the existence and proper shapes of
+                parameters after combining objects. Default is True.
+            check_extra: Option to check optional parameters as well as
+                required ones. Default is True.
+            run_check_acceptability: Option to check acceptable range of the values of
+                parameters after combining objects. Default is True.
+            inplace: Overwrite self, otherwise create a new object (default).
+        """
+        if not isinstance(other, (list, tuple)):
+            other = [other]
+        allowed_axes = ['blt', 'freq', 'polarization']
+        if axis not in allowed_axes:
+            raise ValueError('axis must be one of: '
+                             + ', '.join(allowed_axes))
+
+        # Check that all objects are UVData and valid
+        self.check(check_extra=check_extra, run_check_acceptability=run_check_acceptability)
+        data_params = ['_data_array', '_flag_array', '_nsample_array']
+        if inplace:
+            this = self
+        else:
+            # only copy the metadata, the data arrays are replaced below
+            data_values = [getattr(self, p).value for p in data_params]
+            try:
+                for p in data_params:
+                    getattr(self, p).value = None
+                this = copy.deepcopy(self)
+            finally:
+                for p, value in zip(data_params, data_values):
+                    getattr(self, p).value = value
+        for obj in other:
+            if not issubclass(obj.__class__, this.__class__):
+                if not issubclass(this.__class__, obj.__class__):
+                    raise ValueError('Only UVData (or subclass) objects can be '
+                                     'added to a UVData (or subclass) object')
+            obj.check(check_extra=check_extra, run_check_acceptability=run_check_acceptability)
+
+        # Define parameters that must be the same to concatenate objects
+        compatibility_params = ['_vis_units', '_channel_width', '_object_name',
+                                '_telescope_name', '_instrument',
+                                '_telescope_location', '_phase_type',
+                                '_Nants_telescope', '_antenna_names',
+                                '_antenna_numbers', '_antenna_positions',
+                                '_phase_center_ra', '_phase_center_dec',
+                                '_phase_center_epoch']
+        blt_params = ['_uvw_array', '_time_array', '_integration_time',
+                      '_lst_array', '_ant_1_array', '_ant_2_array',
+                      '_baseline_array']
+        if axis != 'blt':
+            compatibility_params.extend(blt_params)
+        if axis != 'freq':
+            compatibility_params.append('_freq_array')
+        if axis != 'polarization':
+            compatibility_params.append('_polarization_array')
+
+        for obj in other:
+            for a in compatibility_params:
+                if getattr(this, a) != getattr(obj, a):
+                    msg = 'UVParameter ' + \
+                        a[1:] + ' does not match. Cannot combine objects.'
+                    raise ValueError(msg)
+
+        all_objs = [this] + list(other)
+        if axis == 'blt':
+            for a in blt_params:
+                setattr(this, a[1:], np.concatenate([getattr(obj, a[1:])
+                                                     for obj in all_objs], axis=0))
+            this.Nblts = this.uvw_array.shape[0]
+            this.Ntimes = len(np.unique(this.time_array))
+            this.Nbls = len(np.unique(this.baseline_array))
+            this.Nants_data = len(np.unique(np.concatenate((this.ant_1_array,
+                                                            this.ant_2_array))))
+            data_axis = 0
+            history_update_string = ' Combined data along baseline-time axis'
+        elif axis == 'freq':
+            this.freq_array = np.concatenate([obj.freq_array for obj in all_objs], axis=1)
+            this.Nfreqs = this.freq_array.shape[1]
+            data_axis = 2
+            history_update_string = ' Combined data along frequency axis'
+
+            if this.Nfreqs > 1:
+                freq_separation = np.diff(this.freq_array[0, :])
+                if not np.isclose(np.min(freq_separation), np.max(freq_separation),
+                                  rtol=this._freq_array.tols[0], atol=this._freq_array.tols[1]):
+                    warnings.warn('Combined frequencies are not evenly spaced. This will '
+                                  'make it impossible to write this data out to some file types.')
+                elif np.max(freq_separation) > this.channel_width:
+                    warnings.warn('Combined frequencies are not contiguous. This will make '
+                                  'it impossible to write this data out to some file types.')
+        else:
+            this.polarization_array = np.concatenate([obj.polarization_array
+                                                      for obj in all_objs])
+            this.Npols = this.polarization_array.shape[0]
+            data_axis = 3
+            history_update_string = ' Combined data along polarization axis'
+
+            if this.Npols > 2:
+                pol_separation = np.diff(this.polarization_array)
+                if np.min(pol_separation) < np.max(pol_separation):
+                    warnings.warn('Combined polarizations are not evenly spaced. This will '
+                                  'make it impossible to write this data out to some file types.')
+
+        # the data arrays are taken from self, this does not have them if it is a copy
+        data_objs = [self] + list(other)
+        for p in data_params:
+            setattr(this, p[1:], np.concatenate([getattr(obj, p[1:]) for obj in data_objs],
+                                                axis=data_axis))
+
+        this.history += history_update_string + ' using pyuvdata.'
+        for obj in other:
+            this.history = uvutils._combine_histories(this.history, obj.history)
+
+        # Check final object is self-consistent
+        if run_check:
+            this.check(check_extra=check_extra,
+                       run_check_acceptability=run_check_acceptability)
+
+        if not inplace:
+            return this
+
     def _select_preprocess(self, antenna_nums, antenna_names, ant_str, bls,
                            frequencies, freq_chans, times, polarizations, blt_inds):
         """
         Internal function to build up blt_inds, freq_inds, pol_inds
         and history_update_string for select.
+
+        The index arrays are built with vectorized membership tests (np.isin)
+        and boolean masks along the baseline-time axis, and are returned as
+        sorted int64 arrays (or None if there is no selection on that axis).
         """
         # build up history string as we go
         history_update_string = '  Downselected to specific '
@@ -1123,13 +1290,13 @@ class UVData(UVBase):
                 bls, polarizations = self.parse_ants(ant_str)
 
         # Antennas, times and blt_inds all need to be combined into a set of
-        # blts indices to keep.
+        # blts indices to keep. Antennas, baselines and times are combined as
+        # a boolean mask along the baseline-time axis.
+        blt_mask = None
 
         # test for blt_inds presence before adding inds from antennas & times
         if blt_inds is not None:
-            blt_inds = uvutils._get_iterable(blt_inds)
-            if np.array(blt_inds).ndim > 1:
-                blt_inds = np.array(blt_inds).flatten()
+            blt_inds = np.asarray(uvutils._get_iterable(blt_inds)).flatten()
             history_update_string += 'baseline-times'
             n_selects += 1
 
@@ -1140,43 +1307,32 @@ class UVData(UVBase):
 
             if not isinstance(antenna_names, (list, tuple, np.ndarray)):
                 antenna_names = (antenna_names,)
-            if np.array(antenna_names).ndim > 1:
-                antenna_names = np.array(antenna_names).flatten()
-            antenna_nums = []
-            for s in antenna_names:
-                if s not in self.antenna_names:
-                    raise ValueError(
-                        'Antenna name {a} is not present in the antenna_names array'.format(a=s))
-                antenna_nums.append(self.antenna_numbers[np.where(
-                    np.array(self.antenna_names) == s)][0])
+            antenna_names = np.asarray(antenna_names).flatten()
+            name_present = np.isin(antenna_names, self.antenna_names)
+            if not np.all(name_present):
+                raise ValueError(
+                    'Antenna name {a} is not present in the antenna_names '
+                    'array'.format(a=antenna_names[~name_present][0]))
+            name_to_num = {}
+            for name, num in zip(self.antenna_names, self.antenna_numbers):
+                name_to_num.setdefault(name, num)
+            antenna_nums = [name_to_num[s] for s in antenna_names]
 
         if antenna_nums is not None:
-            antenna_nums = uvutils._get_iterable(antenna_nums)
-            if np.array(antenna_nums).ndim > 1:
-                antenna_nums = np.array(antenna_nums).flatten()
+            antenna_nums = np.asarray(uvutils._get_iterable(antenna_nums)).flatten()
             if n_selects > 0:
                 history_update_string += ', antennas'
             else:
                 history_update_string += 'antennas'
             n_selects += 1
-            inds1 = np.zeros(0, dtype=np.int)
-            inds2 = np.zeros(0, dtype=np.int)
-            for ant in antenna_nums:
-                if ant in self.ant_1_array or ant in self.ant_2_array:
-                    wh1 = np.where(self.ant_1_array == ant)[0]
-                    wh2 = np.where(self.ant_2_array == ant)[0]
-                    if len(wh1) > 0:
-                        inds1 = np.append(inds1, list(wh1))
-                    if len(wh2) > 0:
-                        inds2 = np.append(inds2, list(wh2))
-                else:
-                    raise ValueError('Antenna number {a} is not present in the '
-                                     'ant_1_array or ant_2_array'.format(a=ant))
+            ant_present = np.isin(antenna_nums, np.union1d(self.ant_1_array,
+                                                           self.ant_2_array))
+            if not np.all(ant_present):
+                raise ValueError('Antenna number {a} is not present in the '
+                                 'ant_1_array or ant_2_array'.format(a=antenna_nums[~ant_present][0]))
 
-            ant_blt_inds = np.array(
-                list(set(inds1).intersection(inds2)), dtype=np.int)
-        else:
-            ant_blt_inds = None
+            blt_mask = (np.isin(self.ant_1_array, antenna_nums)
+                        & np.isin(self.ant_2_array, antenna_nums))
 
         if bls is not None:
             if isinstance(bls, tuple) and (len(bls) == 2 or len(bls) == 3):
@@ -1202,87 +1358,86 @@ class UVData(UVBase):
             else:
                 history_update_string += 'antenna pairs'
             n_selects += 1
-            bls_blt_inds = np.zeros(0, dtype=np.int)
+
+            # integer keys for the (ordered) antenna pairs of the bls and the data
+            bl_ants = np.array([item[:2] for item in bls], dtype=np.int64).reshape(-1, 2)
+            data_ants = self.get_ants()
+            bl_ants_present = np.isin(bl_ants, data_ants)
+            ant_mult = np.int64(np.max(np.append(data_ants, bl_ants)) + 1)
+            data_keys = self.ant_1_array.astype(np.int64) * ant_mult + self.ant_2_array
+            unique_data_keys = np.unique(data_keys)
+            fwd_found = np.isin(bl_ants[:, 0] * ant_mult + bl_ants[:, 1], unique_data_keys)
+            rev_found = np.isin(bl_ants[:, 1] * ant_mult + bl_ants[:, 0], unique_data_keys)
+            bl_ok = np.all(bl_ants_present, axis=1) & (fwd_found | rev_found)
+            if not np.all(bl_ok):
+                bl = bls[np.nonzero(~bl_ok)[0][0]]
+                for ant in bl[:2]:
+                    if ant not in data_ants:
+                        raise ValueError('Antenna number {a} is not present in the '
+                                         'ant_1_array or ant_2_array'.format(a=ant))
+                raise ValueError('Antenna pair {p} does not have any data '
+                                 'associated with it.'.format(p=bl))
+
+            # use the pair as given if present, otherwise its conjugate
+            sel_keys = np.where(fwd_found, bl_ants[:, 0] * ant_mult + bl_ants[:, 1],
+                                bl_ants[:, 1] * ant_mult + bl_ants[:, 0])
             bl_pols = set()
-            for bl in bls:
-                if not (bl[0] in self.ant_1_array or bl[0] in self.ant_2_array):
-                    raise ValueError('Antenna number {a} is not present in the '
-                                     'ant_1_array or ant_2_array'.format(a=bl[0]))
-                if not (bl[1] in self.ant_1_array or bl[1] in self.ant_2_array):
-                    raise ValueError('Antenna number {a} is not present in the '
-                                     'ant_1_array or ant_2_array'.format(a=bl[1]))
-                wh1 = np.where(np.logical_and(
-                    self.ant_1_array == bl[0], self.ant_2_array == bl[1]))[0]
-                wh2 = np.where(np.logical_and(
-                    self.ant_1_array == bl[1], self.ant_2_array == bl[0]))[0]
-                if len(wh1) > 0:
-                    bls_blt_inds = np.append(bls_blt_inds, list(wh1))
-                    if len(bl) == 3:
+            for bl, fwd in zip(bls, fwd_found):
+                if len(bl) == 3:
+                    if fwd:
                         bl_pols.add(bl[2])
-                elif len(wh2) > 0:
-                    bls_blt_inds = np.append(bls_blt_inds, list(wh2))
-                    if len(bl) == 3:
+                    else:
                         bl_pols.add(bl[2][::-1])  # reverse polarization string
-                else:
-                    raise ValueError('Antenna pair {p} does not have any data '
-                                     'associated with it.'.format(p=bl))
             if len(bl_pols) > 0:
                 polarizations = list(bl_pols)
 
-            if ant_blt_inds is not None:
+            bls_mask = np.isin(data_keys, sel_keys)
+            if blt_mask is not None:
                 # Use union (or) to join antenna_names/nums & ant_pairs_nums
-                ant_blt_inds = np.array(list(set(ant_blt_inds).union(bls_blt_inds)))
-            else:
-                ant_blt_inds = bls_blt_inds
-
-        if ant_blt_inds is not None:
-            if blt_inds is not None:
-                # Use intesection (and) to join antenna_names/nums/ant_pairs_nums with blt_inds
-                # handled differently because of the time aspect (which is anded with antennas below)
-                blt_inds = np.array(
-                    list(set(blt_inds).intersection(ant_blt_inds)), dtype=np.int)
+                blt_mask |= bls_mask
             else:
-                blt_inds = ant_blt_inds
+                blt_mask = bls_mask
 
         if times is not None:
-            times = uvutils._get_iterable(times)
-            if np.array(times).ndim > 1:
-                times = np.array(times).flatten()
+            times = np.asarray(uvutils._get_iterable(times)).flatten()
             if n_selects > 0:
                 history_update_string += ', times'
             else:
                 history_update_string += 'times'
             n_selects += 1
 
-            time_blt_inds = np.zeros(0, dtype=np.int)
-            for jd in times:
-                if jd in self.time_array:
-                    time_blt_inds = np.append(
-                        time_blt_inds, np.where(self.time_array == jd)[0])
-                else:
-                    raise ValueError(
-                        'Time {t} is not present in the time_array'.format(t=jd))
+            time_present = np.isin(times, self.time_array)
+            if not np.all(time_present):
+                raise ValueError(
+                    'Time {t} is not present in the time_array'.format(t=times[~time_present][0]))
+
+            time_mask = np.isin(self.time_array, times)
+            if blt_mask is not None:
+                # Use intersection (and) to join antenna_names/nums/ant_pairs_nums with times
+                blt_mask &= time_mask
+            else:
+                blt_mask = time_mask
 
+        if blt_mask is not None:
             if blt_inds is not None:
-                # Use intesection (and) to join antenna_names/nums/ant_pairs_nums/blt_inds with times
-                blt_inds = np.array(
-                    list(set(blt_inds).intersection(time_blt_inds)), dtype=np.int)
+                # Use intersection (and) to join antenna_names/nums/ant_pairs_nums/times
+                # with blt_inds
+                blt_inds = np.intersect1d(blt_inds, np.nonzero(blt_mask)[0])
             else:
-                blt_inds = time_blt_inds
+                blt_inds = np.nonzero(blt_mask)[0]
 
         if blt_inds is not None:
 
             if len(blt_inds) == 0:
                 raise ValueError(
                     'No baseline-times were found that match criteria')
-            if max(blt_inds) >= self.Nblts:
+            if np.max(blt_inds) >= self.Nblts:
                 raise ValueError(
                     'blt_inds contains indices that are too large')
-            if min(blt_inds) < 0:
-                print(blt_inds)
+            if np.min(blt_inds) < 0:
                 raise ValueError('blt_inds contains indices that are negative')
 
-            blt_inds = list(sorted(set(list(blt_inds))))
+            blt_inds = np.unique(blt_inds).astype(np.int64)
 
         if freq_chans is not None:
             freq_chans = uvutils._get_iterable(freq_chans)
@@ -1296,25 +1451,21 @@ class UVData(UVBase):
                                            | set(self.freq_array[0, freq_chans])))
 
         if frequencies is not None:
-            frequencies = uvutils._get_iterable(frequencies)
-            if np.array(frequencies).ndim > 1:
-                frequencies = np.array(frequencies).flatten()
+            frequencies = np.asarray(uvutils._get_iterable(frequencies)).flatten()
             if n_selects > 0:
                 history_update_string += ', frequencies'
             else:
                 history_update_string += 'frequencies'
             n_selects += 1
 
-            freq_inds = np.zeros(0, dtype=np.int)
             # this works because we only allow one SPW. This will have to be reworked when we support more.
             freq_arr_use = self.freq_array[0, :]
-            for f in frequencies:
-                if f in freq_arr_use:
-                    freq_inds = np.append(
-                        freq_inds, np.where(freq_arr_use == f)[0])
-                else:
-                    raise ValueError(
-                        'Frequency {f} is not present in the freq_array'.format(f=f))
+            freq_present = np.isin(frequencies, freq_arr_use)
+            if not np.all(freq_present):
+                raise ValueError(
+                    'Frequency {f} is not present in the freq_array'.format(f=frequencies[~freq_present][0]))
+            # indices in the order the frequencies were given
+            freq_inds = np.nonzero(frequencies[:, np.newaxis] == freq_arr_use[np.newaxis, :])[1]
 
             if len(frequencies) > 1:
                 freq_ind_separation = freq_inds[1:] - freq_inds[:-1]
@@ -1327,7 +1478,7 @@ class UVData(UVBase):
                                   'will make it impossible to write this data out to '
                                   'some file types.')
 
-            freq_inds = list(sorted(set(list(freq_inds))))
+            freq_inds = np.unique(freq_inds).astype(np.int64)
         else:
             freq_inds = None
 
@@ -1361,7 +1512,7 @@ class UVData(UVBase):
                                   'will make it impossible to write this data out to '
                                   'some file types')
 
-            pol_inds = list(sorted(set(list(pol_inds))))
+            pol_inds = np.unique(pol_inds).astype(np.int64)
         else:
             pol_inds = None
 
@@ -1385,8 +1536,7 @@ class UVData(UVBase):
 
             self.ant_1_array = self.ant_1_array[blt_inds]
             self.ant_2_array = self.ant_2_array[blt_inds]
-            self.Nants_data = int(
-                len(set(self.ant_1_array.tolist() + self.ant_2_array.tolist())))
+            self.Nants_data = len(np.union1d(self.ant_1_array, self.ant_2_array))
 
             self.Ntimes = len(np.unique(self.time_array))
 
@@ -1489,6 +1639,7 @@ class UVData(UVBase):
         for p in other:
             param = getattr(other, p)
             setattr(self, p, param)
+        self._blt_index = None
 
     def _convert_to_filetype(self, filetype):
         if filetype is 'uvfits':
@@ -1505,6 +1656,7 @@ class UVData(UVBase):
             other_obj = uvh5.UVH5()
         else:
             raise ValueError('filetype must be uvfits, miriad, fhd, or uvh5')
+        self._load_lazy_arrays()
         for p in self:
             param = getattr(self, p)
             setattr(other_obj, p, param)
@@ -1514,7 +1666,8 @@ class UVData(UVBase):
                     ant_str=None, bls=None, frequencies=None,
                     freq_chans=None, times=None, polarizations=None, blt_inds=None,
                     read_data=True, read_metadata=True, run_check=True,
-                    check_extra=True, run_check_acceptability=True):
+                    check_extra=True, run_check_acceptability=True, axis=None,
+                    lazy=False, memmap_data=False, time_range=None):
         """
         Read in header, metadata and data from uvfits file(s).
 
@@ -1572,6 +1725,24 @@ class UVData(UVBase):
             run_check_acceptability: Option to check acceptable range of the values of
                 parameters after reading in the file. Default is True.
                 Ignored if read_data is False.
+            axis: Axis to concatenate files along, one of 'blt', 'freq' or
+                'polarization'. This enables fast concatenation with
+                fast_concat, which skips the overlap checks done when adding
+                objects, so the files must be disjoint along that axis and
+                match along the others. Only used if a list of files is
+                passed. Default None (files are combined with __add__).
+            lazy: Option to leave the data_array, flag_array and nsample_array on
+                disk as array-like proxies that only read the parts that are indexed
+                (e.g. by get_data). The full arrays are loaded by whole-array
+                operations, check and writing. Only used if a single file is read
+                with no select keywords, in which case run_check is ignored.
+                Default is False.
+            memmap_data: Option to read the data_array and nsample_array as
+                views of the memory map of the file to reduce the peak memory of
+                the read, see UVFITS.read_uvfits. Default is False.
+            time_range: len-2 list containing min and max range of times (Julian Date)
+                to include when reading data into the object. Cannot be set with
+                times. Ignored if read_data is False.
         """
         from . import uvfits
         # work out what function should be called depending on what's
@@ -1620,8 +1791,11 @@ class UVData(UVBase):
                              freq_chans=freq_chans, times=times,
                              polarizations=polarizations, blt_inds=blt_inds,
                              run_check=run_check, check_extra=check_extra,
-                             run_check_acceptability=run_check_acceptability)
+                             run_check_acceptability=run_check_acceptability,
+                             memmap_data=memmap_data,
+                             time_range=time_range)
             if len(filename) > 1:
+                uv_list = []
                 for f in filename[1:]:
                     uv2 = UVData()
                     uv2.read_uvfits(f, antenna_nums=antenna_nums,
@@ -1630,9 +1804,19 @@ class UVData(UVBase):
                                     freq_chans=freq_chans, times=times,
                                     polarizations=polarizations, blt_inds=blt_inds,
                                     run_check=run_check, check_extra=check_extra,
-                                    run_check_acceptability=run_check_acceptability)
-                    self += uv2
-                del(uv2)
+                                    run_check_acceptability=run_check_acceptability,
+                                    memmap_data=memmap_data,
+                                    time_range=time_range)
+                    if axis is not None:
+                        uv_list.append(uv2)
+                    else:
+                        self += uv2
+                if axis is not None:
+                    self.fast_concat(uv_list, axis, run_check=run_check,
+                                     check_extra=check_extra,
+                                     run_check_acceptability=run_check_acceptability,
+                                     inplace=True)
+                del(uv2, uv_list)
         else:
             if func == 'read_uvfits':
                 uvfits_obj = uvfits.UVFITS()
@@ -1643,7 +1827,9 @@ class UVData(UVBase):
                                        polarizations=polarizations, blt_inds=blt_inds,
                                        read_data=read_data, read_metadata=read_metadata,
                                        run_check=run_check, check_extra=check_extra,
-                                       run_check_acceptability=run_check_acceptability)
+                                       run_check_acceptability=run_check_acceptability,
+                                       lazy=lazy, memmap_data=memmap_data,
+                                       time_range=time_range)
                 self._convert_from_filetype(uvfits_obj)
                 del(uvfits_obj)
             elif func == 'read_uvfits_metadata':
@@ -1660,7 +1846,9 @@ class UVData(UVBase):
                                             freq_chans=freq_chans, times=times,
                                             polarizations=polarizations, blt_inds=blt_inds,
                                             run_check=run_check, check_extra=check_extra,
-                                            run_check_acceptability=run_check_acceptability)
+                                            run_check_acceptability=run_check_acceptability,
+                                            memmap_data=memmap_data,
+                                            time_range=time_range)
                 self._convert_from_filetype(uvfits_obj)
                 del(uvfits_obj)
 
@@ -1692,7 +1880,8 @@ class UVData(UVBase):
         del(uvfits_obj)
 
     def read_ms(self, filepath, run_check=True, check_extra=True,
-                run_check_acceptability=True, data_column='DATA', pol_order='AIPS'):
+                run_check_acceptability=True, data_column='DATA', pol_order='AIPS',
+                axis=None):
         """
         Read in data from a measurement set
 
@@ -1708,6 +1897,12 @@ class UVData(UVBase):
                 'DATA', 'MODEL', or 'CORRECTED_DATA'
             pol_order: specify whether you want polarizations ordered by
                 'CASA' or 'AIPS' conventions.
+            axis: Axis to concatenate files along, one of 'blt', 'freq' or
+                'polarization'. This enables fast concatenation with
+                fast_concat, which skips the overlap checks done when adding
+                objects, so the files must be disjoint along that axis and
+                match along the others. Only used if a list of files is
+                passed. Default None (files are combined with __add__).
         """
 
         # check if casacore is installed
@@ -1727,13 +1922,22 @@ class UVData(UVBase):
                          run_check_acceptability=run_check_acceptability,
                          data_column=data_column, pol_order=pol_order)
             if len(filepath) > 1:
+                uv_list = []
                 for f in filepath[1:]:
                     uv2 = UVData()
                     uv2.read_ms(f, run_check=run_check, check_extra=check_extra,
                                 run_check_acceptability=run_check_acceptability,
                                 data_column=data_column, pol_order=pol_order)
-                    self += uv2
-                del(uv2)
+                    if axis is not None:
+                        uv_list.append(uv2)
+                    else:
+                        self += uv2
+                if axis is not None:
+                    self.fast_concat(uv_list, axis, run_check=run_check,
+                                     check_extra=check_extra,
+                                     run_check_acceptability=run_check_acceptability,
+                                     inplace=True)
+                del(uv2, uv_list)
         else:
             ms_obj = ms.MS()
             ms_obj.read_ms(filepath, run_check=run_check, check_extra=check_extra,
@@ -1743,7 +1947,7 @@ class UVData(UVBase):
             del(ms_obj)
 
     def read_fhd(self, filelist, use_model=False, run_check=True, check_extra=True,
-                 run_check_acceptability=True):
+                 run_check_acceptability=True, axis=None):
         """
         Read in data from a list of FHD files.
 
@@ -1759,6 +1963,12 @@ class UVData(UVBase):
                 ones. Default is True.
             run_check_acceptability: Option to check acceptable range of the values of
                 parameters after reading in the file. Default is True.
+            axis: Axis to concatenate files along, one of 'blt', 'freq' or
+                'polarization'. This enables fast concatenation with
+                fast_concat, which skips the overlap checks done when adding
+                objects, so the files must be disjoint along that axis and
+                match along the others. Only used if a list of files is
+                passed. Default None (files are combined with __add__).
         """
         from . import fhd
         if isinstance(filelist[0], (list, tuple)):
@@ -1766,13 +1976,22 @@ class UVData(UVBase):
                           check_extra=check_extra,
                           run_check_acceptability=run_check_acceptability)
             if len(filelist) > 1:
+                uv_list = []
                 for f in filelist[1:]:
                     uv2 = UVData()
                     uv2.read_fhd(f, use_model=use_model, run_check=run_check,
                                  check_extra=check_extra,
                                  run_check_acceptability=run_check_acceptability)
-                    self += uv2
-                del(uv2)
+                    if axis is not None:
+                        uv_list.append(uv2)
+                    else:
+                        self += uv2
+                if axis is not None:
+                    self.fast_concat(uv_list, axis, run_check=run_check,
+                                     check_extra=check_extra,
+                                     run_check_acceptability=run_check_acceptability,
+                                     inplace=True)
+                del(uv2, uv_list)
         else:
             fhd_obj = fhd.FHD()
             fhd_obj.read_fhd(filelist, use_model=use_model, run_check=run_check,
@@ -1784,7 +2003,9 @@ class UVData(UVBase):
     def read_miriad(self, filepath, antenna_nums=None, ant_str=None, bls=None,
                     polarizations=None, time_range=None, read_data=True,
                     phase_type=None, correct_lat_lon=True, run_check=True,
-                    check_extra=True, run_check_acceptability=True):
+                    check_extra=True, run_check_acceptability=True, axis=None,
+                    read_metadata=False, frequencies=None, freq_chans=None,
+                    use_index=True):
         """
         Read in data from a miriad file.
 
@@ -1805,9 +2026,9 @@ class UVData(UVBase):
             time_range: len-2 list containing min and max range of times (Julian Date) to read-in.
                 Ex: [2458115.20, 2458115.40]
             read_data: Read in the visibility and flag data. If set to false,
-                only the metadata will be read in. Setting read_data to False
-                results in an incompletely defined object (check will not pass).
-                Default True.
+                only the basic header info (and the metadata if read_metadata
+                is True) will be read in. Setting read_data to False results in
+                an incompletely defined object (check will not pass). Default True.
             phase_type: Either 'drift' meaning zenith drift, 'phased' meaning
                 the data are phased to a single RA/Dec or None and it will be
                 guessed at based on the file. Default None.
@@ -1820,6 +2041,26 @@ class UVData(UVBase):
                 ones. Default is True.
             run_check_acceptability: Option to check acceptable range of the values of
                 parameters after reading in the file. Default is True.
+            axis: Axis to concatenate files along, one of 'blt', 'freq' or
+                'polarization'. This enables fast concatenation with
+                fast_concat, which skips the overlap checks done when adding
+                objects, so the files must be disjoint along that axis and
+                match along the others. Only used if a list of files is
+                passed. Default None (files are combined with __add__).
+            read_metadata: Read in metadata (times, baselines, uvws) as well as
+                basic header info. Only used if read_data is False (metadata
+                will be read if data is read). The metadata are read from the
+                record preambles without decoding the visibilities or reading
+                the flags, but this still requires a pass over all the records
+                so only the header info is read by default. Default False.
+            frequencies: The frequencies to read-in. Only the contiguous range of
+                channels spanning the selected frequencies is decoded.
+            freq_chans: The frequency channel numbers to read-in. Only the contiguous
+                range of channels spanning the selected channels is decoded.
+            use_index: Option to use the index file written by write_miriad_index
+                (if it exists and is up to date) to seek straight to the records
+                in time_range rather than scanning the whole file. Only used if
+                time_range is not None. Default is True.
         """
         from . import miriad
         if isinstance(filepath, (list, tuple)):
@@ -1830,19 +2071,30 @@ class UVData(UVBase):
                              run_check=run_check, check_extra=check_extra,
                              run_check_acceptability=run_check_acceptability,
                              phase_type=phase_type, antenna_nums=antenna_nums,
-                             ant_str=ant_str, bls=bls,
-                             polarizations=polarizations, time_range=time_range)
+                             ant_str=ant_str, bls=bls, frequencies=frequencies,
+                             freq_chans=freq_chans, polarizations=polarizations,
+                             time_range=time_range, use_index=use_index)
             if len(filepath) > 1:
+                uv_list = []
                 for f in filepath[1:]:
                     uv2 = UVData()
                     uv2.read_miriad(f, correct_lat_lon=correct_lat_lon,
                                     run_check=run_check, check_extra=check_extra,
                                     run_check_acceptability=run_check_acceptability,
                                     phase_type=phase_type, antenna_nums=antenna_nums,
-                                    ant_str=ant_str, bls=bls,
-                                    polarizations=polarizations, time_range=time_range)
-                    self += uv2
-                del(uv2)
+                                    ant_str=ant_str, bls=bls, frequencies=frequencies,
+                                    freq_chans=freq_chans, polarizations=polarizations,
+                                    time_range=time_range, use_index=use_index)
+                    if axis is not None:
+                        uv_list.append(uv2)
+                    else:
+                        self += uv2
+                if axis is not None:
+                    self.fast_concat(uv_list, axis, run_check=run_check,
+                                     check_extra=check_extra,
+                                     run_check_acceptability=run_check_acceptability,
+                                     inplace=True)
+                del(uv2, uv_list)
         else:
             # work out what function should be called
             if read_data:
@@ -1852,19 +2104,32 @@ class UVData(UVBase):
                                        run_check=run_check, check_extra=check_extra,
                                        run_check_acceptability=run_check_acceptability,
                                        phase_type=phase_type, antenna_nums=antenna_nums,
-                                       ant_str=ant_str, bls=bls,
-                                       polarizations=polarizations, time_range=time_range)
+                                       ant_str=ant_str, bls=bls, frequencies=frequencies,
+                                       freq_chans=freq_chans, polarizations=polarizations,
+                                       time_range=time_range, use_index=use_index)
+                self._convert_from_filetype(miriad_obj)
+                del(miriad_obj)
+            elif read_metadata:
+                # reading metadata but not data. Will error if data_array is already defined.
+                miriad_obj = self._convert_to_filetype('miriad')
+                miriad_obj.read_miriad(filepath, correct_lat_lon=correct_lat_lon,
+                                       read_data=False, phase_type=phase_type,
+                                       antenna_nums=antenna_nums, ant_str=ant_str,
+                                       bls=bls, frequencies=frequencies,
+                                       freq_chans=freq_chans, polarizations=polarizations,
+                                       time_range=time_range, use_index=use_index)
                 self._convert_from_filetype(miriad_obj)
                 del(miriad_obj)
             else:
-                # not reading data. Will error if data_array is already defined.
+                # not reading data or metadata. Will error if data_array is already defined.
                 miriad_obj = self._convert_to_filetype('miriad')
                 miriad_obj.read_miriad_metadata(filepath, correct_lat_lon=correct_lat_lon)
                 self._convert_from_filetype(miriad_obj)
                 del(miriad_obj)
 
     def write_miriad(self, filepath, run_check=True, check_extra=True,
-                     run_check_acceptability=True, clobber=False, no_antnums=False):
+                     run_check_acceptability=True, clobber=False, no_antnums=False,
+                     write_index=False):
         """
         Write the data to a miriad file.
 
@@ -1880,17 +2145,36 @@ class UVData(UVBase):
                 Default is False.
             no_antnums: Option to not write the antnums variable to the file.
                 Should only be used for testing purposes.
+            write_index: Option to also write an index file to speed up reads of
+                time ranges, see write_miriad_index. When clobbering, any index
+                file of the overwritten file is removed regardless. Default is False.
         """
         miriad_obj = self._convert_to_filetype('miriad')
         miriad_obj.write_miriad(filepath, run_check=run_check, check_extra=check_extra,
                                 run_check_acceptability=run_check_acceptability,
-                                clobber=clobber, no_antnums=no_antnums)
+                                clobber=clobber, no_antnums=no_antnums,
+                                write_index=write_index)
         del(miriad_obj)
 
+    def write_miriad_index(self, filepath):
+        """
+        Write an index file for a miriad file, to speed up reads of time ranges.
+
+        The index is written next to the miriad file directory, as
+        <filepath>.index.npy, and is used by read_miriad (with a time_range)
+        until the miriad file is modified.
+
+        Args:
+            filepath: The miriad file directory to index.
+        """
+        from . import miriad
+        miriad.Miriad().write_miriad_index(filepath)
+
     def read_uvh5(self, filename, antenna_nums=None, antenna_names=None,
                   ant_str=None, bls=None, frequencies=None, freq_chans=None,
                   times=None, polarizations=None, blt_inds=None, read_data=True,
-                  run_check=True, check_extra=True, run_check_acceptability=True):
+                  run_check=True, check_extra=True, run_check_acceptability=True,
+                  axis=None, lazy=False):
         """
         Read a UVH5 file.
 
@@ -1942,6 +2226,18 @@ class UVData(UVBase):
                 ones. Default is True.
             run_check_acceptability: Option to check acceptable range of the values of
                 parameters after reading in the file. Default is True.
+            axis: Axis to concatenate files along, one of 'blt', 'freq' or
+                'polarization'. This enables fast concatenation with
+                fast_concat, which skips the overlap checks done when adding
+                objects, so the files must be disjoint along that axis and
+                match along the others. Only used if a list of files is
+                passed. Default None (files are combined with __add__).
+            lazy: Option to leave the data_array, flag_array and nsample_array on
+                disk as array-like proxies that only read the parts that are indexed
+                (e.g. by get_data). The full arrays are loaded by whole-array
+                operations, check and writing. Only used if a single file is read
+                with no select keywords, in which case run_check is ignored.
+                Default is False.
 
         Returns:
             None
@@ -1959,6 +2255,7 @@ class UVData(UVBase):
                            check_extra=check_extra,
                            run_check_acceptability=run_check_acceptability)
             if len(filename) > 1:
+                uv_list = []
                 for f in filename[1:]:
                     uv2 = UVData()
                     uv2.read_uvh5(f, antenna_nums=antenna_nums,
@@ -1968,8 +2265,16 @@ class UVData(UVBase):
                                   blt_inds=blt_inds, read_data=read_data,
                                   run_check=run_check, check_extra=check_extra,
                                   run_check_acceptability=run_check_acceptability)
-                    self += uv2
-                del(uv2)
+                    if axis is not None:
+                        uv_list.append(uv2)
+                    else:
+                        self += uv2
+                if axis is not None:
+                    self.fast_concat(uv_list, axis, run_check=run_check,
+                                     check_extra=check_extra,
+                                     run_check_acceptability=run_check_acceptability,
+                                     inplace=True)
+                del(uv2, uv_list)
         else:
             uvh5_obj = uvh5.UVH5()
             uvh5_obj.read_uvh5(filename, antenna_nums=antenna_nums,
@@ -1977,14 +2282,15 @@ class UVData(UVBase):
                                frequencies=frequencies, freq_chans=freq_chans, times=times,
                                polarizations=polarizations, blt_inds=blt_inds,
                                read_data=read_data, run_check=run_check, check_extra=check_extra,
-                               run_check_acceptability=run_check_acceptability)
+                               run_check_acceptability=run_check_acceptability,
+                               lazy=lazy)
             self._convert_from_filetype(uvh5_obj)
             del(uvh5_obj)
 
     def write_uvh5(self, filename, run_check=True, check_extra=True,
                    run_check_acceptability=True, clobber=False,
                    data_compression=None, flags_compression="lzf",
-                   nsample_compression="lzf"):
+                   nsample_compression="lzf", chunks=True):
         """
         Write a completely in-memory UVData object to a UVH5 file.
 
@@ -2003,6 +2309,11 @@ class UVData(UVBase):
                 the LZF filter.
             nsample_compression: HDF5 filter to apply when writing the nsample_array. Deafult is
                 the LZF filter.
+            chunks: Chunk shape of the data, flags and nsamples datasets. Either True
+                to let h5py guess a chunk shape, a tuple of 4 ints or the name of a preset
+                for an access pattern: 'baseline-major' to make reading the waterfall of
+                a baseline fast or 'time-major' to make reading all baselines at a time
+                fast. Default is True.
 
         Returns:
             None
@@ -2013,11 +2324,13 @@ class UVData(UVBase):
                             run_check_acceptability=run_check_acceptability,
                             clobber=clobber, data_compression=data_compression,
                             flags_compression=flags_compression,
-                            nsample_compression=nsample_compression)
+                            nsample_compression=nsample_compression,
+                            chunks=chunks)
         del(uvh5_obj)
 
     def initialize_uvh5_file(self, filename, clobber=False, data_compression=None,
-                             flags_compression="lzf", nsample_compression="lzf"):
+                             flags_compression="lzf", nsample_compression="lzf",
+                             chunks=True, resizable=False):
         """
         Initialize a UVH5 file on disk with the header metadata and empty data arrays.
 
@@ -2030,6 +2343,14 @@ class UVData(UVBase):
                 the LZF filter.
             nsample_compression: HDF5 filter to apply when writing the nsample_array. Default is
                 the LZF filter.
+            chunks: Chunk shape of the data, flags and nsamples datasets. Either True
+                to let h5py guess a chunk shape, a tuple of 4 ints or the name of a preset
+                for an access pattern: 'baseline-major' to make reading the waterfall of
+                a baseline fast or 'time-major' to make reading all baselines at a time
+                fast. Default is True.
+            resizable: Option to make the data arrays and the header arrays along the
+                baseline-time axis resizable along that axis, so more baseline-times can
+                be appended to the file (see open_uvh5_writer). Default is False.
 
         Returns:
             None
@@ -2044,7 +2365,8 @@ class UVData(UVBase):
         uvh5_obj.initialize_uvh5_file(filename, clobber=clobber,
                                       data_compression=data_compression,
                                       flags_compression=flags_compression,
-                                      nsample_compression=nsample_compression)
+                                      nsample_compression=nsample_compression,
+                                      chunks=chunks, resizable=resizable)
         del(uvh5_obj)
 
     def write_uvh5_part(self, filename, data_array, flags_array, nsample_array, check_header=True,
@@ -2112,13 +2434,116 @@ class UVData(UVBase):
                                  blt_inds=blt_inds)
         del(uvh5_obj)
 
+    def open_uvh5_writer(self, filename, check_header=True, cache_size=2 ** 27):
+        """
+        Open a UVH5 file that has already been initialized for writing many parts of data.
+
+        The file is opened and its header checked once, instead of on every call to
+        write_uvh5_part. The writer uses the object's metadata at the time it is opened.
+
+        Args:
+            filename: the file on disk to write data to. It must already exist,
+                and is assumed to have been initialized with initialize_uvh5_file.
+            check_header: option to check that the metadata present in the header
+                on disk matches that in the object. Default is True.
+            cache_size: size in bytes of the chunk cache of each dataset, which holds
+                chunks that are written in several parts. Default is 128 MiB.
+
+        Returns:
+            A UVH5Writer. Write data with its write_part method, which takes the same
+            arguments as write_uvh5_part (except filename and check_header), and close
+            it when done. It can be used as a context manager, e.g.:
+
+                with uv.open_uvh5_writer(filename) as writer:
+                    writer.write_part(data, flags, nsamples, bls=key)
+        """
+        from . import uvh5
+        uvh5_obj = self._convert_to_filetype('uvh5')
+        return uvh5.UVH5Writer(uvh5_obj, filename, check_header=check_header,
+                               cache_size=cache_size)
+
+    def stream_select_uvh5(self, infile, outfile, antenna_nums=None, antenna_names=None,
+                           ant_str=None, bls=None, frequencies=None, freq_chans=None,
+                           times=None, polarizations=None, blt_inds=None,
+                           max_memory=2**30, clobber=False, data_compression=None,
+                           flags_compression="lzf", nsample_compression="lzf",
+                           chunks=True):
+        """
+        Select data from a UVH5 file and write it to a new UVH5 file without
+        reading all of the data into memory. Only the metadata of the input file
+        are read; the data are copied in chunks of baseline-times using
+        initialize_uvh5_file and write_uvh5_part. On return the object holds
+        the metadata (but not the data) of the output file.
+
+        Args:
+            infile: The UVH5 file to read from.
+            outfile: The UVH5 file to write to.
+            antenna_nums: The antennas numbers to keep in the output file
+                (antenna positions and names for the excluded antennas
+                will be retained). This cannot be provided if antenna_names is
+                also provided.
+            antenna_names: The antennas names to keep in the output file
+                (antenna positions and names for the excluded antennas
+                will be retained). This cannot be provided if antenna_nums is
+                also provided.
+            bls: A list of antenna number tuples (e.g. [(0,1), (3,2)]) or a list of
+                baseline 3-tuples (e.g. [(0,1,'xx'), (2,3,'yy')]) specifying baselines
+                to keep in the output file. For length-2 tuples, the ordering of the numbers
+                within the tuple does not matter. For length-3 tuples, the polarization
+                string is in the order of the two antennas. If length-3 tuples are provided,
+                the polarizations argument below must be None.
+            ant_str: A string containing information about what antenna numbers
+                and polarizations to keep in the output file.
+                Can be 'auto', 'cross', 'all', or combinations of antenna numbers
+                and polarizations (e.g. '1', '1_2', '1x_2y').
+                See tutorial for more examples of valid strings and
+                the behavior of different forms for ant_str.
+                An ant_str cannot be passed in addition to any of the above antenna
+                args or the polarizations arg.
+            frequencies: The frequencies to keep in the output file.
+            freq_chans: The frequency channel numbers to keep in the output file.
+            times: The times to keep in the output file.
+            polarizations: The polarizations to keep in the output file.
+            blt_inds: The baseline-time indices to keep in the output file.
+                This is not commonly used.
+            max_memory: Approximate upper limit in bytes on the memory used to
+                hold data while copying. Default is 1 GiB.
+            clobber: Option to overwrite the output file if it already exists.
+                Default is False.
+            data_compression: HDF5 filter to apply when writing the data_array. Default is
+                None (no filter/compression).
+            flags_compression: HDF5 filter to apply when writing the flags_array. Default is
+                the LZF filter.
+            nsample_compression: HDF5 filter to apply when writing the nsample_array. Default is
+                the LZF filter.
+            chunks: Chunk shape of the data, flags and nsamples datasets in the output
+                file, see initialize_uvh5_file. Default is True.
+
+        Returns:
+            None
+        """
+        from . import uvh5
+        uvh5_obj = uvh5.UVH5()
+        uvh5_obj.stream_select_uvh5(infile, outfile, antenna_nums=antenna_nums,
+                                    antenna_names=antenna_names, ant_str=ant_str, bls=bls,
+                                    frequencies=frequencies, freq_chans=freq_chans,
+                                    times=times, polarizations=polarizations,
+                                    blt_inds=blt_inds, max_memory=max_memory,
+                                    clobber=clobber, data_compression=data_compression,
+                                    flags_compression=flags_compression,
+                                    nsample_compression=nsample_compression,
+                                    chunks=chunks)
+        self._convert_from_filetype(uvh5_obj)
+        del(uvh5_obj)
+
     def read(self, filename, file_type=None, antenna_nums=None, antenna_names=None,
              ant_str=None, bls=None, frequencies=None, freq_chans=None,
              times=None, polarizations=None, blt_inds=None, time_range=None,
              read_metadata=True, read_data=True, phase_type=None,
              correct_lat_lon=True, use_model=False, data_column='DATA',
              pol_order='AIPS', run_check=True, check_extra=True,
-             run_check_acceptability=True):
+             run_check_acceptability=True, axis=None, lazy=False,
+             memmap_data=False):
         """
         Read a generic file into a UVData object.
 
@@ -2198,6 +2623,22 @@ class UVData(UVBase):
                 ones. Default is True.
             run_check_acceptability: Option to check acceptable range of the values of
                 parameters after reading in the file. Default is True.
+            axis: Axis to concatenate files along, one of 'blt', 'freq' or
+                'polarization'. This enables fast concatenation with
+                fast_concat, which skips the overlap checks done when adding
+                objects, so the files must be disjoint along that axis and
+                match along the others. Only used if a list of files is
+                passed. Default None (files are combined with __add__).
+            lazy: Option to leave the data_array, flag_array and nsample_array on
+                disk as array-like proxies that only read the parts that are indexed
+                (e.g. by get_data). The full arrays are loaded by whole-array
+                operations, check and writing. Only used if a single uvfits or uvh5
+                file is read with no select keywords, in which case run_check is
+                ignored. Default is False.
+            memmap_data: Option to read the data_array and nsample_array as
+                views of the memory map of the file to reduce the peak memory of
+                the read, see UVFITS.read_uvfits. Only used for uvfits files.
+                Default is False.
 
         Returns:
             None
@@ -2251,14 +2692,6 @@ class UVData(UVBase):
             raise ValueError('Only one of antenna_nums and antenna_names can be provided.')
 
         if file_type == 'uvfits':
-            if (time_range is not None):
-                select = True
-                warnings.warn('Warning: "time_range" keyword is set which is not '
-                              'supported by read_uvfits. This select will be '
-                              'done after reading the file.')
-            else:
-                select = False
-
             self.read_uvfits(filename, antenna_nums=antenna_nums,
                              antenna_names=antenna_names, ant_str=ant_str,
                              bls=bls, frequencies=frequencies,
@@ -2266,18 +2699,12 @@ class UVData(UVBase):
                              polarizations=polarizations, blt_inds=blt_inds,
                              read_data=read_data, read_metadata=read_metadata,
                              run_check=run_check, check_extra=check_extra,
-                             run_check_acceptability=run_check_acceptability)
-
-            if select:
-                unique_times = np.unique(self.time_array)
-                times_to_keep = unique_times[np.where((unique_times >= np.min(time_range))
-                                                      & (unique_times <= np.max(time_range)))]
-                self.select(times=times_to_keep, run_check=run_check, check_extra=check_extra,
-                            run_check_acceptability=run_check_acceptability)
+                             run_check_acceptability=run_check_acceptability,
+                             axis=axis, lazy=lazy, memmap_data=memmap_data,
+                             time_range=time_range)
 
         elif file_type == 'miriad':
-            if (antenna_names is not None or frequencies is not None or freq_chans is not None
-                    or times is not None or blt_inds is not None):
+            if antenna_names is not None or times is not None or blt_inds is not None:
 
                 if blt_inds is not None:
                     if (antenna_nums is not None or ant_str is not None
@@ -2298,15 +2725,16 @@ class UVData(UVBase):
                 select = False
 
             self.read_miriad(filename, antenna_nums=antenna_nums, ant_str=ant_str,
-                             bls=bls, polarizations=polarizations,
+                             bls=bls, frequencies=frequencies, freq_chans=freq_chans,
+                             polarizations=polarizations,
                              time_range=time_range, read_data=read_data,
                              phase_type=phase_type, correct_lat_lon=correct_lat_lon,
                              run_check=run_check, check_extra=check_extra,
-                             run_check_acceptability=run_check_acceptability)
+                             run_check_acceptability=run_check_acceptability,
+                             axis=axis)
 
             if select:
-                self.select(antenna_names=antenna_names, frequencies=frequencies,
-                            freq_chans=freq_chans, times=times,
+                self.select(antenna_names=antenna_names, times=times,
                             blt_inds=blt_inds, run_check=run_check, check_extra=check_extra,
                             run_check_acceptability=run_check_acceptability)
 
@@ -2326,7 +2754,8 @@ class UVData(UVBase):
 
             self.read_fhd(filename, use_model=use_model, run_check=run_check,
                           check_extra=check_extra,
-                          run_check_acceptability=run_check_acceptability)
+                          run_check_acceptability=run_check_acceptability,
+                          axis=axis)
 
             if select:
                 self.select(antenna_nums=antenna_nums, antenna_names=antenna_names,
@@ -2351,7 +2780,8 @@ class UVData(UVBase):
 
             self.read_ms(filename, run_check=run_check, check_extra=check_extra,
                          run_check_acceptability=run_check_acceptability,
-                         data_column=data_column, pol_order=pol_order)
+                         data_column=data_column, pol_order=pol_order,
+                         axis=axis)
 
             if select:
                 self.select(antenna_nums=antenna_nums, antenna_names=antenna_names,
@@ -2374,7 +2804,8 @@ class UVData(UVBase):
                            frequencies=frequencies, freq_chans=freq_chans, times=times,
                            polarizations=polarizations, blt_inds=blt_inds,
                            read_data=read_data, run_check=run_check, check_extra=check_extra,
-                           run_check_acceptability=run_check_acceptability)
+                           run_check_acceptability=run_check_acceptability,
+                           axis=axis, lazy=lazy)
 
             if select:
                 unique_times = np.unique(self.time_array)
@@ -2489,6 +2920,10 @@ class UVData(UVBase):
         This will search for either the key as specified, or the key and its
         conjugate.
 
+        The indices come from a lookup table that is rebuilt when ant_1_array
+        or ant_2_array is reassigned but not when they are modified in place,
+        so set _blt_index to None after changing them in place.
+
         Args:
             ant1, ant2:
                 Either an antenna-pair key, or key expanded as arguments.
@@ -2519,14 +2954,65 @@ class UVData(UVBase):
             ordered = True
 
         # get indices
-        inds = np.where((self.ant_1_array == ant1) & (self.ant_2_array == ant2))[0]
+        inds = self._baseline_to_blt_inds(self.antnums_to_baseline(ant1, ant2))
         if ordered:
             return inds
         else:
-            ind2 = np.where((self.ant_1_array == ant2) & (self.ant_2_array == ant1))[0]
+            ind2 = self._baseline_to_blt_inds(self.antnums_to_baseline(ant2, ant1))
             inds = np.asarray(np.append(inds, ind2), dtype=np.int64)
             return inds
 
+    def _get_blt_index(self):
+        """
+        Get the lookup table from baseline number to baseline-time indices.
+
+        The table is built lazily with a single argsort of the baseline numbers
+        (calculated from ant_1_array and ant_2_array) and stored CSR-style: the
+        blt indices sorted by baseline plus the offsets of each baseline into
+        them. It keeps weak references to the ant_1_array and ant_2_array it
+        was built from and is rebuilt whenever either of them (or Nblts) is
+        reassigned, e.g. by select, __add__, fast_concat or a read. Modifying
+        ant_1_array or ant_2_array in place is not detected: set _blt_index to
+        None afterwards to reset the table.
+
+        Returns:
+            bl_lookup: dict mapping baseline numbers to positions in offsets
+            offsets: numpy array of length Nbls + 1, the blt indices for the
+                baseline at position i are blt_order[offsets[i]:offsets[i + 1]]
+            blt_order: numpy array of blt indices sorted by baseline number
+        """
+        if (self._blt_index is None
+                or self._blt_index[0]() is not self.ant_1_array
+                or self._blt_index[1]() is not self.ant_2_array
+                or self._blt_index[2] != self.Nblts):
+            bls = self.antnums_to_baseline(self.ant_1_array, self.ant_2_array)
+            # use a stable sort so blt indices are in order within each baseline
+            blt_order = np.argsort(bls, kind='mergesort')
+            unique_bls, bl_starts = np.unique(bls[blt_order], return_index=True)
+            offsets = np.append(bl_starts, bls.size)
+            bl_lookup = dict(zip(unique_bls.tolist(), range(unique_bls.size)))
+            self._blt_index = (weakref.ref(self.ant_1_array), weakref.ref(self.ant_2_array),
+                               self.Nblts, bl_lookup, offsets, blt_order)
+
+        return self._blt_index[3:]
+
+    def _baseline_to_blt_inds(self, baseline):
+        """
+        Get the baseline-time indices for a baseline number using the blt index.
+
+        Args:
+            baseline: integer baseline number
+
+        Returns:
+            int-64 ndarray containing the indices of the baseline along the
+                baseline-time axis (empty if the baseline is not in the data).
+        """
+        bl_lookup, offsets, blt_order = self._get_blt_index()
+        bl_ind = bl_lookup.get(int(baseline))
+        if bl_ind is None:
+            return np.array([], dtype=np.int64)
+        return np.array(blt_order[offsets[bl_ind]:offsets[bl_ind + 1]], dtype=np.int64)
+
     def _key2inds(self, key):
         """
         Interpret user specified key as a combination of antenna pair and/or polarization.
@@ -2581,10 +3067,9 @@ class UVData(UVBase):
                     raise KeyError('Polarization {pol} not found in data.'.format(pol=key))
             else:
                 # Larger number, assume it is a baseline number
-                inv_bl = self.antnums_to_baseline(self.baseline_to_antnums(key)[1],
-                                                  self.baseline_to_antnums(key)[0])
-                blt_ind1 = np.where(self.baseline_array == key)[0]
-                blt_ind2 = np.where(self.baseline_array == inv_bl)[0]
+                ant1, ant2 = self.baseline_to_antnums(key)
+                blt_ind1 = self._baseline_to_blt_inds(self.antnums_to_baseline(ant1, ant2))
+                blt_ind2 = self._baseline_to_blt_inds(self.antnums_to_baseline(ant2, ant1))
                 if len(blt_ind1) + len(blt_ind2) == 0:
                     raise KeyError('Baseline {bl} not found in data.'.format(bl=key))
                 pol_ind = (np.arange(self.Npols), np.arange(self.Npols))
@@ -2834,6 +3319,63 @@ class UVData(UVBase):
         for key in antpairpols:
             yield (key, self.get_data(key, squeeze=squeeze))
 
+    def antpairpol_block_iter(self, block_size=64, return_flags=False):
+        """
+        Generates blocks of data for groups of antpairs, one block per
+        polarization, gathering each block from data_array in one operation.
+
+        The data are put in baseline-major, time-sorted order once up front
+        (without changing the object), so each block of baselines is a single
+        gather (or a view if the object is already in that order). Requires
+        every baseline to have the same number of times and a single spectral
+        window.
+
+        Args:
+            block_size: Maximum number of antpairs per block. Default 64.
+            return_flags: Option to also yield the matching flag_array block.
+
+        Returns (for each iteration):
+            keys: list of tuples with antenna1, antenna2, and polarization
+                string for each baseline in the block
+            data: Numpy array of shape (len(keys), Ntimes, Nfreqs)
+            flags: Boolean numpy array of the same shape as data (only if
+                return_flags is True)
+        """
+        if block_size < 1:
+            raise ValueError('block_size must be a positive integer')
+        if self.Nspws > 1:
+            raise ValueError('antpairpol_block_iter does not support '
+                             'multiple spectral windows')
+
+        bls = self.antnums_to_baseline(self.ant_1_array, self.ant_2_array)
+        blt_order = np.lexsort((self.time_array, bls))
+        unique_bls, bl_counts = np.unique(bls, return_counts=True)
+        if np.any(bl_counts != bl_counts[0]):
+            raise ValueError('antpairpol_block_iter requires all baselines '
+                             'to have the same number of times')
+        ntimes = bl_counts[0]
+        antpairs = [self.baseline_to_antnums(bl) for bl in unique_bls]
+        pols = self.get_pols()
+        in_order = np.array_equal(blt_order, np.arange(self.Nblts))
+
+        for bl_start in range(0, len(unique_bls), block_size):
+            bl_stop = min(bl_start + block_size, len(unique_bls))
+            blt_start, blt_stop = bl_start * ntimes, bl_stop * ntimes
+            if in_order:
+                blt_inds = slice(blt_start, blt_stop)
+            else:
+                blt_inds = blt_order[blt_start:blt_stop]
+            block_shape = (bl_stop - bl_start, ntimes, self.Nfreqs, self.Npols)
+            data = self.data_array[blt_inds, 0].reshape(block_shape)
+            if return_flags:
+                flags = self.flag_array[blt_inds, 0].reshape(block_shape)
+            for pol_ind, pol in enumerate(pols):
+                keys = [antpair + (pol,) for antpair in antpairs[bl_start:bl_stop]]
+                if return_flags:
+                    yield (keys, data[..., pol_ind], flags[..., pol_ind])
+                else:
+                    yield (keys, data[..., pol_ind])
+
     def parse_ants(self, ant_str, print_toggle=False):
         """
         Generates two lists of antenna pair tuples and polarization indices based
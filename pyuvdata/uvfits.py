@@ -8,15 +8,90 @@
 from __future__ import absolute_import, division, print_function
 
 from astropy import constants as const
-import astropy
 from astropy.time import Time
 from astropy.io import fits
 import numpy as np
+import os
 import warnings
+import functools
 from .uvdata import UVData
 from . import parameter as uvp
 from . import utils as uvutils
 
+# The maximum size in bytes of the chunks of random groups made when writing
+_write_chunk_size = 2 ** 26
+
+
+def _read_data_part(filename, array_name, key):
+    """
+    Read part of the data_array, flag_array or nsample_array from a uvfits file.
+
+    Args:
+        filename: The uvfits file to read from.
+        array_name: One of 'data_array', 'flag_array' or 'nsample_array'.
+        key: tuple of (blt, spw, freq, pol) indices into the UVData shaped array.
+    """
+    with fits.open(filename, memmap=True) as hdu_list:
+        vis_hdu = hdu_list[0]
+        if vis_hdu.header['NAXIS'] == 7:
+            raw_data_array = vis_hdu.data.data[:, 0, 0, :, :, :, :]
+        else:
+            raw_data_array = vis_hdu.data.data[:, 0, 0, np.newaxis, :, :, :]
+        raw_data_array = raw_data_array[key]
+
+        # FITS uvw direction convention is opposite ours and Miriad's.
+        # So conjugate the visibilities:
+        if array_name == 'data_array':
+            return raw_data_array[..., 0] - 1j * raw_data_array[..., 1]
+        elif array_name == 'flag_array':
+            return raw_data_array[..., 2] <= 0
+        else:
+            return np.abs(raw_data_array[..., 2])
+
+
+class _ArrayInterface(object):
+    """Holds an array interface and the array owning its memory, for np.asarray."""
+
+    def __init__(self, interface, base):
+        self.__array_interface__ = interface
+        self.base = base
+
+
+def _view_raw_data(raw_data_array):
+    """
+    Make the data_array, flag_array and nsample_array from raw uvfits data, with
+    the data_array and nsample_array as views into the raw data.
+
+    raw_data_array is byte-swapped (to native order), conjugated and has the
+    absolute value of the weights taken in place, so it must be a private copy
+    or a copy-on-write memory map of the file (as given by astropy for files
+    opened read-only).
+
+    Args:
+        raw_data_array: writeable float array of the uvfits data, with the
+            real part, imaginary part and weight along the last axis.
+
+    Returns:
+        data_array, flag_array, nsample_array
+    """
+    if not raw_data_array.dtype.isnative:
+        raw_data_array.byteswap(inplace=True)
+        raw_data_array = raw_data_array.view(raw_data_array.dtype.newbyteorder())
+    flag_array = raw_data_array[..., 2] <= 0
+    nsample_array = raw_data_array[..., 2]
+    np.abs(nsample_array, out=nsample_array)
+
+    # view each (real, imaginary) pair as a complex number
+    complex_dtype = np.dtype('c{size}'.format(size=2 * raw_data_array.dtype.itemsize))
+    interface = {'shape': raw_data_array.shape[:-1], 'typestr': complex_dtype.str,
+                 'data': raw_data_array.__array_interface__['data'],
+                 'strides': raw_data_array.strides[:-1], 'version': 3}
+    data_array = np.asarray(_ArrayInterface(interface, raw_data_array))
+    # FITS uvw direction convention is opposite ours and Miriad's.
+    # So conjugate the visibilities:
+    np.conjugate(data_array, out=data_array)
+    return data_array, flag_array, nsample_array
+
 
 class UVFITS(UVData):
     """
@@ -118,7 +193,8 @@ class UVFITS(UVData):
     def _get_data(self, vis_hdu, antenna_nums, antenna_names, ant_str,
                   bls, frequencies, freq_chans, times, polarizations,
                   blt_inds, read_metadata, run_check, check_extra,
-                  run_check_acceptability):
+                  run_check_acceptability, lazy=False, memmap_data=False,
+                  time_range=None):
         """
         Internal function to read just the visibility and flag data of the uvfits file.
         Separated from full read so that header, metadata and data can be read independently.
@@ -128,6 +204,13 @@ class UVFITS(UVData):
             # first read in random group parameters
             self._get_parameter_data(vis_hdu)
 
+        if time_range is not None:
+            if times is not None:
+                raise ValueError('Only one of times and time_range can be provided.')
+            unique_times = np.unique(self.time_array)
+            times = unique_times[np.where((unique_times >= np.min(time_range))
+                                          & (unique_times <= np.max(time_range)))]
+
         # figure out what data to read in
         blt_inds, freq_inds, pol_inds, history_update_string = \
             self._select_preprocess(antenna_nums, antenna_names, ant_str, bls,
@@ -150,7 +233,21 @@ class UVFITS(UVData):
 
         min_frac = np.min([blt_frac, freq_frac, pol_frac])
 
-        if min_frac == 1:
+        if min_frac == 1 and lazy:
+            # no select, leave the data on disk until they are used
+            filename = os.path.abspath(vis_hdu.fileinfo()['file'].name)
+            raw_dtype = vis_hdu.data.data.dtype.newbyteorder('=')
+            shape = (self.Nblts, self.Nspws, self.Nfreqs, self.Npols)
+            dtypes = {'data_array': (np.zeros(1, dtype=raw_dtype) * 1j).dtype,
+                      'flag_array': np.bool_,
+                      'nsample_array': raw_dtype}
+            for attr, dtype in dtypes.items():
+                reader = functools.partial(_read_data_part, filename, attr)
+                setattr(self, attr, uvutils._LazyArray(shape, dtype, reader,
+                                                       param=getattr(self, '_' + attr)))
+            # checking the data would load them
+            return
+        elif min_frac == 1:
             # no select, read in all the data
             if vis_hdu.header['NAXIS'] == 7:
                 raw_data_array = vis_hdu.data.data[:, 0, 0, :, :, :, :]
@@ -165,8 +262,14 @@ class UVFITS(UVData):
             # do select operations on everything except data_array, flag_array and nsample_array
             self._select_metadata(blt_inds, freq_inds, pol_inds, history_update_string)
 
+            if blt_inds is not None and blt_inds[-1] - blt_inds[0] + 1 == len(blt_inds):
+                # a contiguous run of blts (e.g. a time range of a time ordered
+                # file) is a slice of the random groups, which is a view of the
+                # memmap, so only the pages for these blts are read.
+                blt_inds = slice(blt_inds[0], blt_inds[-1] + 1)
+
             # just read in the right portions of the data and flag arrays
-            if blt_frac == min_frac:
+            if isinstance(blt_inds, slice) or blt_frac == min_frac:
                 if vis_hdu.header['NAXIS'] == 7:
                     raw_data_array = vis_hdu.data.data[blt_inds, :, :, :, :, :, :]
                     raw_data_array = raw_data_array[:, 0, 0, :, :, :, :]
@@ -215,11 +318,16 @@ class UVFITS(UVData):
                     raw_data_array = raw_data_array[:, :, freq_inds, :, :]
 
         assert(len(raw_data_array.shape) == 5)
-        # FITS uvw direction convention is opposite ours and Miriad's.
-        # So conjugate the visibilities and flip the uvws:
-        self.data_array = (raw_data_array[:, :, :, :, 0] - 1j * raw_data_array[:, :, :, :, 1])
-        self.flag_array = (raw_data_array[:, :, :, :, 2] <= 0)
-        self.nsample_array = np.abs(raw_data_array[:, :, :, :, 2])
+        if (memmap_data and raw_data_array.dtype.kind == 'f'
+                and raw_data_array.flags.writeable):
+            self.data_array, self.flag_array, self.nsample_array = \
+                _view_raw_data(raw_data_array)
+        else:
+            # FITS uvw direction convention is opposite ours and Miriad's.
+            # So conjugate the visibilities and flip the uvws:
+            self.data_array = (raw_data_array[:, :, :, :, 0] - 1j * raw_data_array[:, :, :, :, 1])
+            self.flag_array = (raw_data_array[:, :, :, :, 2] <= 0)
+            self.nsample_array = np.abs(raw_data_array[:, :, :, :, 2])
 
         # check if object has all required UVParameters set
         if run_check:
@@ -230,7 +338,8 @@ class UVFITS(UVData):
                     ant_str=None, bls=None, frequencies=None,
                     freq_chans=None, times=None, polarizations=None, blt_inds=None,
                     read_data=True, read_metadata=True,
-                    run_check=True, check_extra=True, run_check_acceptability=True):
+                    run_check=True, check_extra=True, run_check_acceptability=True,
+                    lazy=False, memmap_data=False, time_range=None):
         """
         Read in header, metadata and data from a uvfits file. Supports reading
         only selected portions of the data.
@@ -273,6 +382,9 @@ class UVFITS(UVData):
                 the object. Ignored if read_data is False.
             blt_inds: The baseline-time indices to include when reading data into
                 the object. This is not commonly used. Ignored if read_data is False.
+            time_range: len-2 list containing min and max range of times (Julian Date)
+                to include when reading data into the object. Cannot be set with
+                times. Ignored if read_data is False.
             read_data: Read in the visibility and flag data. If set to false,
                 only the basic header info and metadata (if read_metadata is True)
                 will be read in. Results in an incompletely defined object
@@ -289,6 +401,20 @@ class UVFITS(UVData):
             run_check_acceptability: Option to check acceptable range of the values of
                 parameters after reading in the file. Default is True.
                 Ignored if read_data is False.
+            lazy: Option to leave the data_array, flag_array and nsample_array on
+                disk as array-like proxies that only read the parts that are indexed
+                (e.g. by get_data). The full arrays are loaded by whole-array
+                operations, check and writing. Only used if no select keywords are
+                set, in which case run_check is ignored. Default is False.
+            memmap_data: Option to make the data_array and nsample_array views
+                of the (real, imaginary) pairs and the weights in the memory map
+                of the file rather than new arrays. The byte swap, conjugation
+                and abs are done in place in copy-on-write pages, so the file is
+                not modified but all the pages end up in memory: the memory
+                used after the read is the same as without this option and only
+                the peak memory of the temporary arrays made while reading is
+                reduced, and only with no select keywords (a select copies the
+                data first). Only used for files with float data. Default is False.
         """
         if not read_data:
             run_check = False
@@ -462,7 +588,8 @@ class UVFITS(UVData):
             # Now read in the data
             self._get_data(vis_hdu, antenna_nums, antenna_names, ant_str,
                            bls, frequencies, freq_chans, times, polarizations,
-                           blt_inds, False, run_check, check_extra, run_check_acceptability)
+                           blt_inds, False, run_check, check_extra, run_check_acceptability,
+                           lazy=lazy, memmap_data=memmap_data, time_range=time_range)
 
     def read_uvfits_metadata(self, filename):
         """
@@ -488,7 +615,8 @@ class UVFITS(UVData):
                          ant_str=None, bls=None, frequencies=None,
                          freq_chans=None, times=None, polarizations=None,
                          blt_inds=None, read_metadata=True, run_check=True,
-                         check_extra=True, run_check_acceptability=True):
+                         check_extra=True, run_check_acceptability=True,
+                         memmap_data=False, time_range=None):
         """
         Read in data but not header info from a uvfits file
         (useful for an object that already has the associated header info).
@@ -529,6 +657,9 @@ class UVFITS(UVData):
                 the object.
             blt_inds: The baseline-time indices to include when reading data into
                 the object. This is not commonly used.
+            time_range: len-2 list containing min and max range of times (Julian Date)
+                to include when reading data into the object. Cannot be set with
+                times.
             read_metadata: Option to read metadata even if it already exists
                 (to ensure data and metadata match). Default is True.
             run_check: Option to check for the existence and proper shapes of
@@ -537,6 +668,9 @@ class UVFITS(UVData):
                 ones. Default is True.
             run_check_acceptability: Option to check acceptable range of the values of
                 parameters after reading in the file. Default is True.
+            memmap_data: Option to read the data_array and nsample_array as
+                views of the memory map of the file to reduce the peak memory of
+                the read, see read_uvfits. Default is False.
         """
 
         with fits.open(filename, memmap=True) as hdu_list:
@@ -545,7 +679,8 @@ class UVFITS(UVData):
             self._get_data(vis_hdu, antenna_nums, antenna_names, ant_str,
                            bls, frequencies, freq_chans, times, polarizations,
                            blt_inds, read_metadata, run_check, check_extra,
-                           run_check_acceptability)
+                           run_check_acceptability, memmap_data=memmap_data,
+                           time_range=time_range)
 
         del(vis_hdu)
 
@@ -644,19 +779,6 @@ class UVFITS(UVData):
                           'nsamples are combined in uvfits files such that '
                           'these data will appear to be flagged.')
 
-        weights_array = self.nsample_array * \
-            np.where(self.flag_array, -1, 1)
-        # FITS uvw direction convention is opposite ours and Miriad's.
-        # So conjugate the visibilities and flip the uvws:
-        data_array = np.conj(self.data_array[:, np.newaxis,
-                                             np.newaxis, :, :, :, np.newaxis])
-        weights_array = weights_array[:, np.newaxis, np.newaxis, :, :, :,
-                                      np.newaxis]
-        # uvfits_array_data shape will be  (Nblts,1,1,[Nspws],Nfreqs,Npols,3)
-        uvfits_array_data = np.concatenate([data_array.real,
-                                            data_array.imag,
-                                            weights_array], axis=6)
-
         # FITS uvw direction convention is opposite ours and Miriad's.
         # So conjugate the visibilities and flip the uvws:
         uvw_array_sec = -1 * self.uvw_array / const.c.to('m/s').value
@@ -705,11 +827,16 @@ class UVFITS(UVData):
             parnames_use = ['UU      ', 'VV      ', 'WW      ', 'DATE    ',
                             'ANTENNA1', 'ANTENNA2', 'SUBARRAY', 'INTTIM']
 
-        group_parameter_list = [group_parameter_dict[parname] for
-                                parname in parnames_use]
-        hdu = fits.GroupData(uvfits_array_data, parnames=parnames_use,
-                             pardata=group_parameter_list, bitpix=-32)
+        # each group has shape (1,1,[Nspws],Nfreqs,Npols,3). Make the header
+        # from a single group, all the groups are written to the file below.
+        group_shape = (1, 1, self.Nspws, self.Nfreqs, self.Npols, 3)
+        hdu = fits.GroupData(np.zeros((1,) + group_shape, dtype=np.float32),
+                             parnames=parnames_use,
+                             pardata=[np.zeros(1, dtype=np.float32)
+                                      for parname in parnames_use],
+                             bitpix=-32)
         hdu = fits.GroupsHDU(hdu)
+        hdu.header['GCOUNT'] = self.Nblts
 
         for i, key in enumerate(parnames_use):
             hdu.header['PSCAL' + str(i + 1) + '  '] = pscal_dict[key]
@@ -879,9 +1006,29 @@ class UVFITS(UVData):
         # ADD the FQ table
         # skipping for now and limiting to a single spw
 
-        # write the file
-        hdulist = fits.HDUList(hdus=[hdu, ant_hdu])
-        if float(astropy.__version__[0:3]) < 1.3:  # pragma: no cover
-            hdulist.writeto(filename, clobber=True)
-        else:
-            hdulist.writeto(filename, overwrite=True)
+        # write the file: the header, then the random groups in chunks of
+        # blts (so there is never more than a chunk of the data copied in
+        # memory) and then the antenna table.
+        group_dtype = np.dtype([('par', '>f4', (len(parnames_use),)),
+                                ('data', '>f4', group_shape)])
+        blts_per_chunk = max(1, _write_chunk_size // group_dtype.itemsize)
+        with open(filename, 'wb') as f:
+            f.write(hdu.header.tostring().encode('ascii'))
+            for blt_start in range(0, self.Nblts, blts_per_chunk):
+                blt_inds = slice(blt_start, min(blt_start + blts_per_chunk, self.Nblts))
+                groups = np.empty(blt_inds.stop - blt_inds.start, dtype=group_dtype)
+                for par_ind, parname in enumerate(parnames_use):
+                    groups['par'][:, par_ind] = group_parameter_dict[parname][blt_inds]
+                # the visibilities are conjugated (see the uvws above) and the
+                # weights are the nsamples, negative where flagged.
+                groups['data'][:, 0, 0, ..., 0] = self.data_array[blt_inds].real
+                np.negative(self.data_array[blt_inds].imag,
+                            out=groups['data'][:, 0, 0, ..., 1])
+                weights = groups['data'][:, 0, 0, ..., 2]
+                weights[:] = self.nsample_array[blt_inds]
+                np.negative(weights, out=weights, where=self.flag_array[blt_inds])
+                f.write(groups.data)
+            # pad the data to a whole number of FITS blocks
+            f.write(b'\0' * (-f.tell() % 2880))
+        with fits.open(filename, mode='append') as hdu_list:
+            hdu_list.append(ant_hdu)
@@ -10,10 +10,260 @@ from __future__ import absolute_import, division, print_function
 import numpy as np
 import os
 import warnings
+import functools
+import six
 from .uvdata import UVData
 from . import utils as uvutils
 
 
+def _read_dataset_part(filename, dataset, key):
+    """Read part of a dataset in the /Data group of a uvh5 file."""
+    import h5py
+    with h5py.File(filename, 'r') as f:
+        return f['/Data'][dataset][key]
+
+
+# approximate upper limits in bytes on the size of a single hyperslab read when
+# reading a selection from a dataset, and on the unselected data between runs
+# in adjacent chunks that are read together (about what can be copied in the
+# time it takes to make another read)
+_read_max_size = 2 ** 24
+_read_max_gap = 2 ** 18
+
+
+def _index_runs(inds, length, block=None, max_gap=None, max_span=None):
+    """
+    Group sorted indices along one axis of a dataset into runs to read together.
+
+    Contiguous indices always go in the same run. If block is given, runs that
+    fall in the same block along the axis (e.g. the same HDF5 chunk) are merged,
+    since reading part of a chunk costs as much as reading the whole chunk. If
+    max_gap and max_span are also given, runs in adjacent blocks that are at most
+    max_gap indices apart are merged as well, as long as the merged run spans at
+    most about max_span indices. This reads no extra blocks but makes fewer,
+    larger reads.
+
+    Args:
+        inds: sorted array of indices along the axis, or None to use the whole axis
+        length: length of the axis in the dataset
+        block: optional block length along the axis to coalesce runs within
+        max_gap: optional limit on the gap between runs merged across adjacent blocks
+        max_span: optional limit on the span of runs merged across adjacent blocks
+
+    Returns:
+        list of (source, dest, local) tuples, one per run. source is a slice
+            selecting the span of the run in the dataset, dest is a slice giving
+            where the run goes in the output array and local is an array of
+            indices of the run within the span (None if the run is contiguous).
+    """
+    if inds is None:
+        return [(slice(0, length), slice(0, length), None)]
+    inds = np.asarray(inds)
+    if inds.size == 0:
+        return []
+    new_run = np.diff(inds) != 1
+    if block is not None:
+        blocks = inds // block
+        new_run &= blocks[1:] != blocks[:-1]
+        if max_gap is not None and max_span is not None:
+            merge = ((blocks[1:] == blocks[:-1] + 1)
+                     & (np.diff(inds) <= max_gap + 1))
+            run_first = inds[0]
+            for ind in np.nonzero(new_run)[0]:
+                if merge[ind] and inds[ind + 1] - run_first < max_span:
+                    new_run[ind] = False
+                else:
+                    run_first = inds[ind + 1]
+    breaks = np.nonzero(new_run)[0] + 1
+    runs = []
+    for start, stop in zip(np.concatenate(([0], breaks)),
+                           np.concatenate((breaks, [inds.size]))):
+        first, last = inds[start], inds[stop - 1]
+        if last - first == stop - start - 1:
+            local = None
+        else:
+            local = inds[start:stop] - first
+        runs.append((slice(first, last + 1), slice(start, stop), local))
+    return runs
+
+
+def _read_hyperslabs(dset, blt_inds, freq_inds, pol_inds):
+    """
+    Read the intersection of selections on the blt, freq and pol axes of a dataset.
+
+    The selection on each axis is grouped into runs (coalesced within and
+    across adjacent HDF5 chunks) and one hyperslab is read for each combination
+    of runs along the three axes, so only the chunks overlapping the selection
+    are read. Each hyperslab is copied into a preallocated output array.
+
+    Args:
+        dset: h5py dataset with shape (Nblts, Nspws, Nfreqs, Npols)
+        blt_inds: sorted array of blt indices to read, or None to read all
+        freq_inds: sorted array of frequency indices to read, or None to read all
+        pol_inds: sorted array of polarization indices to read, or None to read all
+
+    Returns:
+        numpy array of the selected data
+    """
+    # limit the blt gaps and span of each read so the hyperslabs stay small in memory
+    row_size = np.prod(dset.shape[1:]) * dset.dtype.itemsize
+    max_gaps = [_read_max_gap // row_size, dset.shape[2], dset.shape[3]]
+    max_spans = [max(1, _read_max_size // row_size), dset.shape[2], dset.shape[3]]
+    runs = []
+    for axis, inds, max_gap, max_span in zip([0, 2, 3], [blt_inds, freq_inds, pol_inds],
+                                             max_gaps, max_spans):
+        block = dset.chunks[axis] if dset.chunks is not None else None
+        runs.append(_index_runs(inds, dset.shape[axis], block=block, max_gap=max_gap,
+                                max_span=max_span))
+    shape = [sum(dest.stop - dest.start for _, dest, _ in axis_runs)
+             for axis_runs in runs]
+    out = np.empty((shape[0], dset.shape[1], shape[1], shape[2]), dtype=dset.dtype)
+    if out.size == 0:
+        return out
+    for blt_src, blt_dest, blt_local in runs[0]:
+        for freq_src, freq_dest, freq_local in runs[1]:
+            for pol_src, pol_dest, pol_local in runs[2]:
+                slab = dset[blt_src, :, freq_src, pol_src]
+                if blt_local is not None:
+                    slab = slab[blt_local]
+                if freq_local is not None:
+                    slab = slab[:, :, freq_local]
+                if pol_local is not None:
+                    slab = slab[:, :, :, pol_local]
+                out[blt_dest, :, freq_dest, pol_dest] = slab
+    return out
+
+
+def _write_runs(inds, length):
+    """
+    Group sorted indices along one axis of a dataset into hyperslabs to write.
+
+    Regularly spaced indices are written as a single strided hyperslab, other
+    indices are split into contiguous runs.
+
+    Args:
+        inds: sorted array of indices along the axis, or None to use the whole axis
+        length: length of the axis in the dataset
+
+    Returns:
+        list of (source, dest, local) tuples as returned by _index_runs, where
+            source selects the hyperslab in the dataset and dest selects the
+            corresponding part of the array to write.
+    """
+    if inds is not None and len(inds) > 1 and len(np.unique(np.diff(inds))) == 1:
+        return [(slice(inds[0], inds[-1] + 1, inds[1] - inds[0]), slice(0, len(inds)), None)]
+    return _index_runs(inds, length)
+
+
+def _write_hyperslabs(dset, data, blt_runs, freq_runs, pol_runs):
+    """
+    Write data to the intersection of selections on the blt, freq and pol axes of a dataset.
+
+    One hyperslab is written for each combination of runs along the three axes.
+    Each part of the data is staged through a reusable contiguous buffer (also
+    converting it to the dataset's type) so h5py does not make a copy per write.
+
+    Args:
+        dset: h5py dataset with shape (Nblts, Nspws, Nfreqs, Npols)
+        data: array to write, with shape (Nblts, Nspws, Nfreqs, Npols) of the selection
+        blt_runs: list of (source, dest, local) tuples along the blt axis from _write_runs
+        freq_runs: list of (source, dest, local) tuples along the freq axis from _write_runs
+        pol_runs: list of (source, dest, local) tuples along the pol axis from _write_runs
+
+    Returns:
+        None
+    """
+    if len(blt_runs) * len(freq_runs) * len(pol_runs) == 1:
+        dset[blt_runs[0][0], :, freq_runs[0][0], pol_runs[0][0]] = data
+        return
+    max_len = [max(dest.stop - dest.start for _, dest, _ in axis_runs)
+               for axis_runs in [blt_runs, freq_runs, pol_runs]]
+    buffer = np.empty(max_len[0] * data.shape[1] * max_len[1] * max_len[2],
+                      dtype=dset.dtype)
+    for blt_src, blt_dest, _ in blt_runs:
+        for freq_src, freq_dest, _ in freq_runs:
+            for pol_src, pol_dest, _ in pol_runs:
+                slab = data[blt_dest, :, freq_dest, pol_dest]
+                staged = buffer[:slab.size].reshape(slab.shape)
+                staged[...] = slab
+                dset.write_direct(staged, dest_sel=np.s_[blt_src, :, freq_src, pol_src])
+
+
+# chunk shape presets for the data arrays, named by the access pattern they
+# make fast: reading the waterfall of one baseline or the snapshot of one time
+_chunk_presets = ['baseline-major', 'time-major']
+
+# approximate lower and upper limits in bytes on the size of a visdata chunk for
+# the presets (lots of tiny chunks make whole-array reads and writes slow)
+_chunk_min_size = 2 ** 14
+_chunk_max_size = 2 ** 20
+
+
+def _blt_group_length(values):
+    """
+    Find the largest length that divides every run of equal values along the blt axis.
+
+    Chunks of this length along the blt axis never straddle two runs.
+
+    Args:
+        values: array of values along the blt axis (e.g. baseline_array)
+
+    Returns:
+        the length as an int
+    """
+    starts = np.concatenate(([0], np.nonzero(np.diff(values))[0] + 1, [len(values)]))
+    length = 0
+    for run_length in np.unique(np.diff(starts)):
+        while run_length:
+            length, run_length = run_length, length % run_length
+    return int(length)
+
+
+def _get_chunk_shape(uv, chunks):
+    """
+    Get the chunk shape to use for the data, flags and nsamples datasets.
+
+    Args:
+        uv: UVData object to be written
+        chunks: True to let h5py guess a chunk shape, a tuple of 4 ints giving
+            the chunk shape or the name of a chunk shape preset (one of
+            'baseline-major', 'time-major').
+
+    Returns:
+        chunks: chunk shape to pass to h5py
+        layout: name of the chunk layout to record in the header ('auto',
+            'custom' or the preset name)
+    """
+    data_shape = (uv.Nblts, uv.Nspws, uv.Nfreqs, uv.Npols)
+    if chunks is True:
+        return True, 'auto'
+    if isinstance(chunks, six.string_types):
+        if chunks not in _chunk_presets:
+            raise ValueError('chunks must be True, a tuple of 4 ints or one of '
+                             + ', '.join(_chunk_presets))
+        # chunks along the blt axis line up with the runs of rows of a baseline
+        # (or a time) so reading one reads whole chunks
+        if chunks == 'baseline-major':
+            blt_chunk = _blt_group_length(uv.baseline_array)
+        else:
+            blt_chunk = _blt_group_length(uv.time_array)
+        shape = [blt_chunk, uv.Nspws, uv.Nfreqs, uv.Npols]
+        # grow the blt extent by whole runs up to the minimum size, then shrink the
+        # frequency, polarization and blt extents down to the maximum size
+        row_size = np.prod(shape[1:]) * 8
+        n_runs = int(np.ceil(_chunk_min_size / float(row_size * blt_chunk)))
+        shape[0] = min(blt_chunk * n_runs, uv.Nblts)
+        for axis in [2, 3, 0]:
+            while shape[axis] > 1 and np.prod(shape) * 8 > _chunk_max_size:
+                shape[axis] = (shape[axis] + 1) // 2
+        return tuple(int(n) for n in shape), chunks
+    chunks = tuple(chunks)
+    if len(chunks) != 4 or not all(int(n) == n and n > 0 for n in chunks):
+        raise ValueError('chunks must be True, a tuple of 4 ints or one of '
+                         + ', '.join(_chunk_presets))
+    return tuple(min(int(n), size) for n, size in zip(chunks, data_shape)), 'custom'
+
+
 class UVH5(UVData):
     """
     Defines an HDF5-specific subclass of UVData for reading and writing uvh5 files.
@@ -157,7 +407,8 @@ class UVH5(UVData):
 
     def _get_data(self, dgrp, antenna_nums, antenna_names, ant_str,
                   bls, frequencies, freq_chans, times, polarizations,
-                  blt_inds, run_check, check_extra, run_check_acceptability):
+                  blt_inds, run_check, check_extra, run_check_acceptability,
+                  lazy=False):
         """
         Internal function to read just the visibility, flag, and nsample data of the uvh5 file.
         Separated from full read so that header/metadata and data can be read independently.
@@ -184,7 +435,17 @@ class UVH5(UVData):
 
         min_frac = np.min([blt_frac, freq_frac, pol_frac])
 
-        if min_frac == 1:
+        if min_frac == 1 and lazy:
+            # no select, leave the data on disk until they are used
+            filename = os.path.abspath(dgrp.file.filename)
+            for attr, dset in zip(['data_array', 'flag_array', 'nsample_array'],
+                                  ['visdata', 'flags', 'nsamples']):
+                reader = functools.partial(_read_dataset_part, filename, dset)
+                setattr(self, attr, uvutils._LazyArray(dgrp[dset].shape, dgrp[dset].dtype,
+                                                       reader, param=getattr(self, '_' + attr)))
+            # checking the data would load them
+            run_check = False
+        elif min_frac == 1:
             # no select, read in all the data
             self.data_array = dgrp['visdata'].value
             self.flag_array = dgrp['flags'].value
@@ -193,53 +454,13 @@ class UVH5(UVData):
             # do select operations on everything except data_array, flag_array and nsample_array
             self._select_metadata(blt_inds, freq_inds, pol_inds, history_update_string)
 
-            # open references to datasets
-            visdata_dset = dgrp['visdata']
-            flags_dset = dgrp['flags']
-            nsamples_dset = dgrp['nsamples']
-
-            # just read in the right portions of the data and flag arrays
-            if blt_frac == min_frac:
-                visdata = visdata_dset[blt_inds, :, :, :]
-                flags = flags_dset[blt_inds, :, :, :]
-                nsamples = nsamples_dset[blt_inds, :, :, :]
+            # read each hyperslab in the intersection of the selections straight
+            # into the output arrays, so only the selected data are read from disk
+            visdata = _read_hyperslabs(dgrp['visdata'], blt_inds, freq_inds, pol_inds)
+            flags = _read_hyperslabs(dgrp['flags'], blt_inds, freq_inds, pol_inds)
+            nsamples = _read_hyperslabs(dgrp['nsamples'], blt_inds, freq_inds, pol_inds)
 
-                assert(self.Nspws == visdata.shape[1])
-
-                if freq_frac < 1:
-                    visdata = visdata[:, :, freq_inds, :]
-                    flags = flags[:, :, freq_inds, :]
-                    nsamples = nsamples[:, :, freq_inds, :]
-                if pol_frac < 1:
-                    visdata = visdata[:, :, :, pol_inds]
-                    flags = flags[:, :, :, pol_inds]
-                    nsamples = nsamples[:, :, :, pol_inds]
-            elif freq_frac == min_frac:
-                visdata = visdata_dset[:, :, freq_inds, :]
-                flags = flags_dset[:, :, freq_inds, :]
-                nsamples = nsamples_dset[:, :, freq_inds, :]
-
-                if blt_frac < 1:
-                    visdata = visdata[blt_inds, :, :, :]
-                    flags = flags[blt_inds, :, :, :]
-                    nsamples = nsamples[blt_inds, :, :, :]
-                if pol_frac < 1:
-                    visdata = visdata[:, :, :, pol_inds]
-                    flags = flags[:, :, :, pol_inds]
-                    nsamples = nsamples[:, :, :, pol_inds]
-            else:
-                visdata = visdata_dset[:, :, :, pol_inds]
-                flags = flags_dset[:, :, :, pol_inds]
-                nsamples = nsamples_dset[:, :, :, pol_inds]
-
-                if blt_frac < 1:
-                    visdata = visdata[blt_inds, :, :, :]
-                    flags = flags[blt_inds, :, :, :]
-                    nsamples = nsamples[blt_inds, :, :, :]
-                if freq_frac < 1:
-                    visdata = visdata[:, :, freq_inds, :]
-                    flags = flags[:, :, freq_inds, :]
-                    nsamples = nsamples[:, :, freq_inds, :]
+            assert(self.Nspws == visdata.shape[1])
 
             # save arrays in object
             self.data_array = visdata
@@ -256,7 +477,8 @@ class UVH5(UVData):
     def read_uvh5(self, filename, antenna_nums=None, antenna_names=None,
                   ant_str=None, bls=None, frequencies=None, freq_chans=None,
                   times=None, polarizations=None, blt_inds=None, read_data=True,
-                  run_check=True, check_extra=True, run_check_acceptability=True):
+                  run_check=True, check_extra=True, run_check_acceptability=True,
+                  lazy=False):
         """
         Read in data from a UVH5 file.
 
@@ -307,6 +529,11 @@ class UVH5(UVData):
                 ones. Default is True.
             run_check_acceptability: Option to check acceptable range of the values of
                 parameters after reading in the file. Default is True.
+            lazy: Option to leave the data_array, flag_array and nsample_array on
+                disk as array-like proxies that only read the parts that are indexed
+                (e.g. by get_data). The full arrays are loaded by whole-array
+                operations, check and writing. Only used if no select keywords are
+                set, in which case run_check is ignored. Default is False.
 
         Returns:
             None
@@ -333,12 +560,18 @@ class UVH5(UVData):
             dgrp = f['/Data']
             self._get_data(dgrp, antenna_nums, antenna_names, ant_str,
                            bls, frequencies, freq_chans, times, polarizations,
-                           blt_inds, run_check, check_extra, run_check_acceptability)
+                           blt_inds, run_check, check_extra, run_check_acceptability,
+                           lazy=lazy)
 
         return
 
-    def _write_header(self, header):
+    def _write_header(self, header, resizable=False):
         """Internal function to write uvh5 header information.
+
+        Args:
+            header: reference to an h5py data group to write the header information to.
+            resizable: Option to make the arrays along the baseline-time axis resizable
+                along that axis, so baseline-times can be appended. Default is False.
         """
         # write out telescope and source information
         header['latitude'] = self.telescope_location_lat_lon_alt[0]
@@ -359,17 +592,18 @@ class UVH5(UVData):
         header['Ntimes'] = self.Ntimes
         header['antenna_names'] = [uvutils._str_to_bytes(n) for n in self.antenna_names]
         header['antenna_numbers'] = self.antenna_numbers
-        header['uvw_array'] = self.uvw_array
         header['vis_units'] = self.vis_units
         header['channel_width'] = self.channel_width
-        header['time_array'] = self.time_array
         header['freq_array'] = self.freq_array
-        header['integration_time'] = self.integration_time
-        header['lst_array'] = self.lst_array
         header['polarization_array'] = self.polarization_array
         header['spw_array'] = self.spw_array
-        header['ant_1_array'] = self.ant_1_array
-        header['ant_2_array'] = self.ant_2_array
+        for name in _blt_header_arrays:
+            value = getattr(self, name)
+            if resizable:
+                header.create_dataset(name, data=value, chunks=True,
+                                      maxshape=(None,) + value.shape[1:])
+            else:
+                header[name] = value
 
         # write out phasing information
         header['phase_type'] = self.phase_type
@@ -415,7 +649,8 @@ class UVH5(UVData):
 
     def write_uvh5(self, filename, run_check=True, check_extra=True,
                    run_check_acceptability=True, clobber=False,
-                   data_compression=None, flags_compression="lzf", nsample_compression="lzf"):
+                   data_compression=None, flags_compression="lzf", nsample_compression="lzf",
+                   chunks=True):
         """
         Write an in-memory UVData object to a UVH5 file.
 
@@ -434,6 +669,12 @@ class UVH5(UVData):
                  the LZF filter.
             nsample_compression: HDF5 filter to apply when writing the nsample_array. Default is
                  the LZF filter.
+            chunks: Chunk shape of the data, flags and nsamples datasets. Either True
+                to let h5py guess a chunk shape, a tuple of 4 ints or the name of a preset
+                for an access pattern: 'baseline-major' to make reading the waterfall of
+                a baseline fast or 'time-major' to make reading all baselines at a time
+                fast. The preset chunks line up with the runs of rows of each baseline
+                (or time) along the blt axis. Default is True.
 
         Returns:
             None
@@ -455,6 +696,7 @@ class UVH5(UVData):
         if run_check:
             self.check(check_extra=check_extra,
                        run_check_acceptability=run_check_acceptability)
+        chunks, layout = _get_chunk_shape(self, chunks)
 
         if os.path.exists(filename):
             if clobber:
@@ -467,35 +709,37 @@ class UVH5(UVData):
             # write header
             header = f.create_group("Header")
             self._write_header(header)
+            header['data_layout'] = layout
 
             # write out data, flags, and nsample arrays
             dgrp = f.create_group("Data")
             if data_compression is not None:
-                visdata = dgrp.create_dataset("visdata", chunks=True,
+                visdata = dgrp.create_dataset("visdata", chunks=chunks,
                                               data=self.data_array.astype(np.complex64),
                                               compression=data_compression)
             else:
-                visdata = dgrp.create_dataset("visdata", chunks=True,
+                visdata = dgrp.create_dataset("visdata", chunks=chunks,
                                               data=self.data_array.astype(np.complex64))
             if flags_compression is not None:
-                flags = dgrp.create_dataset("flags", chunks=True,
+                flags = dgrp.create_dataset("flags", chunks=chunks,
                                             data=self.flag_array,
                                             compression=flags_compression)
             else:
-                flags = dgrp.create_dataset("flags", chunks=True,
+                flags = dgrp.create_dataset("flags", chunks=chunks,
                                             data=self.flag_array)
             if nsample_compression is not None:
-                nsample_array = dgrp.create_dataset("nsamples", chunks=True,
+                nsample_array = dgrp.create_dataset("nsamples", chunks=chunks,
                                                     data=self.nsample_array.astype(np.float32),
                                                     compression=nsample_compression)
             else:
-                nsample_array = dgrp.create_dataset("nsamples", chunks=True,
+                nsample_array = dgrp.create_dataset("nsamples", chunks=chunks,
                                                     data=self.nsample_array.astype(np.float32))
 
         return
 
     def initialize_uvh5_file(self, filename, clobber=False, data_compression=None,
-                             flags_compression="lzf", nsample_compression="lzf"):
+                             flags_compression="lzf", nsample_compression="lzf",
+                             chunks=True, resizable=False):
         """Initialize a UVH5 file on disk to be written to in parts.
 
         Args:
@@ -507,6 +751,15 @@ class UVH5(UVData):
                  the LZF filter.
             nsample_compression: HDF5 filter to apply when writing the nsample_array. Default is
                  the LZF filter.
+            chunks: Chunk shape of the data, flags and nsamples datasets. Either True
+                to let h5py guess a chunk shape, a tuple of 4 ints or the name of a preset
+                for an access pattern: 'baseline-major' to make reading the waterfall of
+                a baseline fast or 'time-major' to make reading all baselines at a time
+                fast. The preset chunks line up with the runs of rows of each baseline
+                (or time) along the blt axis. Default is True.
+            resizable: Option to make the data arrays and the header arrays along the
+                baseline-time axis resizable along that axis, so more baseline-times can
+                be appended to the file with UVH5Writer.append_blts. Default is False.
 
         Returns:
             None
@@ -530,6 +783,7 @@ class UVH5(UVData):
             data_array encoded with bitshuffle (or an error will be raised).
         """
         import h5py
+        chunks, layout = _get_chunk_shape(self, chunks)
 
         if os.path.exists(filename):
             if clobber:
@@ -541,38 +795,49 @@ class UVH5(UVData):
         with h5py.File(filename, 'w') as f:
             # write header
             header = f.create_group("Header")
-            self._write_header(header)
+            self._write_header(header, resizable=resizable)
+            header['data_layout'] = layout
 
             # initialize the data groups on disk
             data_size = (self.Nblts, self.Nspws, self.Nfreqs, self.Npols)
+            if resizable:
+                maxshape = (None,) + data_size[1:]
+            else:
+                maxshape = None
             dgrp = f.create_group("Data")
             if data_compression is not None:
-                visdata = dgrp.create_dataset("visdata", data_size, chunks=True,
-                                              dtype='c8', compression=data_compression)
+                visdata = dgrp.create_dataset("visdata", data_size, chunks=chunks,
+                                              maxshape=maxshape, dtype='c8',
+                                              compression=data_compression)
             else:
-                visdata = dgrp.create_dataset("visdata", data_size, chunks=True,
-                                              dtype='c8')
+                visdata = dgrp.create_dataset("visdata", data_size, chunks=chunks,
+                                              maxshape=maxshape, dtype='c8')
             if flags_compression is not None:
-                flags = dgrp.create_dataset("flags", data_size, chunks=True,
-                                            dtype='b1', compression=flags_compression)
+                flags = dgrp.create_dataset("flags", data_size, chunks=chunks,
+                                            maxshape=maxshape, dtype='b1',
+                                            compression=flags_compression)
             else:
-                flags = dgrp.create_dataset("flags", data_size, chunks=True,
-                                            dtype='b1')
+                flags = dgrp.create_dataset("flags", data_size, chunks=chunks,
+                                            maxshape=maxshape, dtype='b1')
             if nsample_compression is not None:
-                nsample_array = dgrp.create_dataset("nsamples", data_size, chunks=True,
-                                                    dtype='f4', compression=nsample_compression)
+                nsample_array = dgrp.create_dataset("nsamples", data_size, chunks=chunks,
+                                                    maxshape=maxshape, dtype='f4',
+                                                    compression=nsample_compression)
             else:
-                nsample_array = dgrp.create_dataset("nsamples", data_size, chunks=True,
-                                                    dtype='f4')
+                nsample_array = dgrp.create_dataset("nsamples", data_size, chunks=chunks,
+                                                    maxshape=maxshape, dtype='f4')
 
         return
 
-    def _check_header(self, filename):
+    def _check_header(self, filename, header=None):
         """
         Check that the metadata present in a file header matches the object's metadata.
 
         Args:
-            header: reference to an h5py data group that contains the header information.
+            filename: the UVH5 file to check the header of.
+            header: optional reference to an h5py data group that contains the header
+                information, for a file that is already open. If not given, the file
+                is opened to read the header.
 
         Returns:
             None
@@ -585,8 +850,10 @@ class UVH5(UVData):
         import h5py
 
         uvd_file = UVH5()
-        with h5py.File(filename, 'r') as f:
-            header = f['/Header']
+        if header is None:
+            with h5py.File(filename, 'r') as f:
+                uvd_file._read_header(f['/Header'], filename)
+        else:
             uvd_file._read_header(header, filename)
 
         # temporarily remove data, flag, and nsample arrays, so we only check metadata
@@ -683,19 +950,252 @@ class UVH5(UVData):
             initialize_uvh5_file. The same filename is passed in, with an optional check to ensure
             that the object's metadata in-memory matches the header on-disk. See the tutorial for a
             worked example.
+
+            Each call opens the file and (by default) checks the header. When writing many
+            parts, use a UVH5Writer (see UVData.open_uvh5_writer) instead, which does that once.
+        """
+        with UVH5Writer(self, filename, check_header=check_header) as writer:
+            writer.write_part(data_array, flags_array, nsample_array,
+                              antenna_nums=antenna_nums, antenna_names=antenna_names,
+                              ant_str=ant_str, bls=bls, frequencies=frequencies,
+                              freq_chans=freq_chans, times=times, polarizations=polarizations,
+                              blt_inds=blt_inds)
+
+        return
+
+    def stream_select_uvh5(self, infile, outfile, antenna_nums=None, antenna_names=None,
+                           ant_str=None, bls=None, frequencies=None, freq_chans=None,
+                           times=None, polarizations=None, blt_inds=None,
+                           max_memory=2**30, clobber=False, data_compression=None,
+                           flags_compression="lzf", nsample_compression="lzf",
+                           chunks=True):
+        """
+        Select data from a UVH5 file and write it to a new UVH5 file, moving the
+        data in chunks of baseline-times so the full data never need to fit in memory.
+
+        Args:
+            infile: The UVH5 file to read from.
+            outfile: The UVH5 file to write to.
+            antenna_nums: The antennas numbers to keep in the output file
+                (antenna positions and names for the excluded antennas
+                will be retained). This cannot be provided if antenna_names is
+                also provided.
+            antenna_names: The antennas names to keep in the output file
+                (antenna positions and names for the excluded antennas
+                will be retained). This cannot be provided if antenna_nums is
+                also provided.
+            bls: A list of antenna number tuples (e.g. [(0,1), (3,2)]) or a list of
+                baseline 3-tuples (e.g. [(0,1,'xx'), (2,3,'yy')]) specifying baselines
+                to keep in the output file. For length-2 tuples, the ordering of the numbers
+                within the tuple does not matter. For length-3 tuples, the polarization
+                string is in the order of the two antennas. If length-3 tuples are provided,
+                the polarizations argument below must be None.
+            ant_str: A string containing information about what antenna numbers
+                and polarizations to keep in the output file.
+                Can be 'auto', 'cross', 'all', or combinations of antenna numbers
+                and polarizations (e.g. '1', '1_2', '1x_2y').
+                See tutorial for more examples of valid strings and
+                the behavior of different forms for ant_str.
+                An ant_str cannot be passed in addition to any of the above antenna
+                args or the polarizations arg.
+            frequencies: The frequencies to keep in the output file.
+            freq_chans: The frequency channel numbers to keep in the output file.
+            times: The times to keep in the output file.
+            polarizations: The polarizations to keep in the output file.
+            blt_inds: The baseline-time indices to keep in the output file.
+                This is not commonly used.
+            max_memory: Approximate upper limit in bytes on the memory used to
+                hold data while copying. Default is 1 GiB.
+            clobber: Option to overwrite the output file if it already exists.
+                Default is False.
+            data_compression: HDF5 filter to apply when writing the data_array. Default is
+                 None (no filter/compression).
+            flags_compression: HDF5 filter to apply when writing the flags_array. Default is
+                 the LZF filter.
+            nsample_compression: HDF5 filter to apply when writing the nsample_array. Default is
+                 the LZF filter.
+            chunks: Chunk shape of the data, flags and nsamples datasets in the output
+                file, see initialize_uvh5_file. Default is True.
+
+        Returns:
+            None
+
+        Notes:
+            Only the metadata of the input file are read into the object, which holds
+            the metadata of the output file when this method returns (the data_array,
+            flag_array and nsample_array are not set).
         """
         import h5py
 
+        if max_memory <= 0:
+            raise ValueError('max_memory must be a positive number of bytes')
+
+        # get the metadata and figure out what data to keep
+        self.read_uvh5(infile, read_data=False)
+        blt_inds, freq_inds, pol_inds, history_update_string = \
+            self._select_preprocess(antenna_nums, antenna_names, ant_str, bls,
+                                    frequencies, freq_chans, times, polarizations, blt_inds)
+        Nfreqs_in = self.Nfreqs
+        Npols_in = self.Npols
+        if blt_inds is not None or freq_inds is not None or pol_inds is not None:
+            self._select_metadata(blt_inds, freq_inds, pol_inds, history_update_string)
+        if blt_inds is None:
+            blt_inds = np.arange(self.Nblts)
+        else:
+            blt_inds = np.asarray(blt_inds)
+
+        self.initialize_uvh5_file(outfile, clobber=clobber,
+                                  data_compression=data_compression,
+                                  flags_compression=flags_compression,
+                                  nsample_compression=nsample_compression,
+                                  chunks=chunks)
+
+        # each blt read holds a complex64, bool and float32 value for every input
+        # frequency and polarization, plus the selected copy of them
+        blt_bytes = 2 * self.Nspws * Nfreqs_in * Npols_in * (8 + 1 + 4)
+        chunk_nblts = max(1, int(max_memory // blt_bytes))
+
+        with h5py.File(infile, 'r') as f, UVH5Writer(self, outfile, check_header=False) as writer:
+            dgrp = f['/Data']
+            visdata_dset = dgrp['visdata']
+            flags_dset = dgrp['flags']
+            nsamples_dset = dgrp['nsamples']
+
+            for out_start in range(0, self.Nblts, chunk_nblts):
+                out_stop = min(out_start + chunk_nblts, self.Nblts)
+                in_inds = blt_inds[out_start:out_stop]
+                if np.all(np.diff(in_inds) == 1):
+                    in_inds = np.s_[in_inds[0]:in_inds[-1] + 1]
+
+                visdata = visdata_dset[in_inds, :, :, :]
+                flags = flags_dset[in_inds, :, :, :]
+                nsamples = nsamples_dset[in_inds, :, :, :]
+                if freq_inds is not None:
+                    visdata = visdata[:, :, freq_inds, :]
+                    flags = flags[:, :, freq_inds, :]
+                    nsamples = nsamples[:, :, freq_inds, :]
+                if pol_inds is not None:
+                    visdata = visdata[:, :, :, pol_inds]
+                    flags = flags[:, :, :, pol_inds]
+                    nsamples = nsamples[:, :, :, pol_inds]
+
+                writer.write_part(visdata, flags, nsamples,
+                                  blt_inds=np.arange(out_start, out_stop))
+
+        return
+
+
+# header arrays along the baseline-time axis, which are extended when appending to a file
+_blt_header_arrays = ['time_array', 'integration_time', 'lst_array', 'ant_1_array',
+                      'ant_2_array', 'uvw_array']
+
+# number of slots in the chunk cache of a UVH5Writer (a prime, as recommended by HDF5)
+_cache_slots = 100003
+
+
+class UVH5Writer(object):
+    """
+    Writer for the data of a UVH5 file that has been initialized with initialize_uvh5_file,
+    for writing it in many parts.
+
+    The file is opened and its header checked against the object's metadata once,
+    when the writer is created, and the datasets are kept open for all of the
+    writes. The file is opened with a large chunk cache, so chunks that are
+    written in several parts (e.g. compressed chunks holding several baselines)
+    are only read and compressed once. Use it as a context manager (or call
+    close when done), e.g.:
+
+        with uv.open_uvh5_writer(filename) as writer:
+            for key, data, flags, nsamples in parts:
+                writer.write_part(data, flags, nsamples, bls=key)
+
+    If the file was initialized with resizable=True, new baseline-times can be
+    added to the end of the file with append_blts, e.g. for each integration of
+    a correlator. Selections in write_part refer to the baseline-times of the
+    object, i.e. those in the file when the writer was opened.
+
+    Args:
+        uv: UVH5 object with the metadata of the file.
+        filename: the file on disk to write data to. It must already exist,
+            and is assumed to have been initialized with initialize_uvh5_file.
+        check_header: option to check that the metadata present in the header
+            on disk matches that in the object. Default is True.
+        cache_size: size in bytes of the chunk cache of each dataset. Default is 128 MiB.
+    """
+
+    def __init__(self, uv, filename, check_header=True, cache_size=2 ** 27):
+        import h5py
+
         # check that the file already exists
         if not os.path.exists(filename):
             raise AssertionError("{0} does not exists; please first initialize it with initialize_uvh5_file".format(
                 filename))
 
-        if check_header:
-            self._check_header(filename)
+        self.uv = uv
+        self.filename = filename
+        try:
+            self._file = h5py.File(filename, 'r+', rdcc_nbytes=cache_size,
+                                   rdcc_nslots=_cache_slots)
+        except TypeError:
+            # older h5py versions cannot set the chunk cache
+            self._file = h5py.File(filename, 'r+')
+        try:
+            if check_header:
+                uv._check_header(filename, header=self._file['/Header'])
+            dgrp = self._file['/Data']
+            self._visdata_dset = dgrp['visdata']
+            self._flags_dset = dgrp['flags']
+            self._nsamples_dset = dgrp['nsamples']
+            # the header arrays along the blt axis and the times, baselines and
+            # antennas in the file, found on the first append
+            self._blt_dsets = None
+            self._times = None
+            self._baselines = None
+            self._antennas = None
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def write_part(self, data_array, flags_array, nsample_array, antenna_nums=None,
+                   antenna_names=None, ant_str=None, bls=None, frequencies=None,
+                   freq_chans=None, times=None, polarizations=None, blt_inds=None):
+        """
+        Write out a part of the file.
+
+        Args:
+            data_array: the data to write to disk. A check is done to ensure that
+                the dimensions of the data passed in conform to the ones specified by
+                the "selection" arguments.
+            flags_array: the flags array to write to disk. A check is done to ensure
+                that the dimensions of the data passed in conform to the ones specified
+                by the "selection" arguments.
+            nsample_array: the nsample array to write to disk. A check is done to ensure
+                that the dimensions fo the data passed in conform to the ones specified
+                by the "selection" arguments.
+            antenna_nums, antenna_names, ant_str, bls, frequencies, freq_chans, times,
+            polarizations, blt_inds: the part of the file to write, as for
+                UVH5.write_uvh5_part.
+
+        Returns:
+            None
+        """
+        if self._file is None:
+            raise ValueError('The writer for {0} has been closed'.format(self.filename))
 
         # figure out which "full file" indices to write data to
-        blt_inds, freq_inds, pol_inds, _ = self._select_preprocess(
+        blt_inds, freq_inds, pol_inds, _ = self.uv._select_preprocess(
             antenna_nums, antenna_names, ant_str, bls, frequencies, freq_chans, times,
             polarizations, blt_inds)
 
@@ -705,65 +1205,12 @@ class UVH5(UVData):
         if data_array.shape != nsample_array.shape:
             raise AssertionError("data_array and nsample_array must have the same shape")
 
-        # check what part of each dimension to grab
-        # we can use numpy slice objects to index the h5py indices
-        if blt_inds is not None:
-            Nblts = len(blt_inds)
-
-            # test if blts are regularly spaced
-            if len(set(np.ediff1d(blt_inds))) <= 1:
-                blt_reg_spaced = True
-                blt_start = blt_inds[0]
-                blt_end = blt_inds[-1] + 1
-                if len(blt_inds) == 1:
-                    d_blt = 1
-                else:
-                    d_blt = blt_inds[1] - blt_inds[0]
-                blt_inds = np.s_[blt_start:blt_end:d_blt]
-            else:
-                blt_reg_spaced = False
-        else:
-            Nblts = self.Nblts
-            blt_reg_spaced = True
-            blt_inds = np.s_[:]
-        if freq_inds is not None:
-            Nfreqs = len(freq_inds)
-
-            # test if frequencies are regularly spaced
-            if len(set(np.ediff1d(freq_inds))) <= 1:
-                freq_reg_spaced = True
-                freq_start = freq_inds[0]
-                freq_end = freq_inds[-1] + 1
-                if len(freq_inds) == 1:
-                    d_freq = 1
-                else:
-                    d_freq = freq_inds[1] - freq_inds[0]
-                freq_inds = np.s_[freq_start:freq_end:d_freq]
-            else:
-                freq_reg_spaced = False
-        else:
-            Nfreqs = self.Nfreqs
-            freq_reg_spaced = True
-            freq_inds = np.s_[:]
-        if pol_inds is not None:
-            Npols = len(pol_inds)
-
-            # test if pols are regularly spaced
-            if len(set(np.ediff1d(pol_inds))) <= 1:
-                pol_reg_spaced = True
-                pol_start = pol_inds[0]
-                pol_end = pol_inds[-1] + 1
-                if len(pol_inds) == 1:
-                    d_pol = 1
-                else:
-                    d_pol = pol_inds[1] - pol_inds[0]
-                pol_inds = np.s_[pol_start:pol_end:d_pol]
-            else:
-                pol_reg_spaced = False
-        else:
-            Npols = self.Npols
-            pol_reg_spaced = True
-            pol_inds = np.s_[:]
+        # group the indices on each axis into as few hyperslabs as possible
+        runs = [_write_runs(inds, length) for inds, length in
+                [(blt_inds, self.uv.Nblts), (freq_inds, self.uv.Nfreqs),
+                 (pol_inds, self.uv.Npols)]]
+        Nblts, Nfreqs, Npols = [sum(dest.stop - dest.start for _, dest, _ in axis_runs)
+                                for axis_runs in runs]
 
         # check for proper size of input arrays
         proper_shape = (Nblts, 1, Nfreqs, Npols)
@@ -772,47 +1219,106 @@ class UVH5(UVData):
                                                                                       proper_shape))
 
         # actually write the data
-        with h5py.File(filename, 'r+') as f:
-            dgrp = f['/Data']
-            visdata_dset = dgrp['visdata']
-            flags_dset = dgrp['flags']
-            nsamples_dset = dgrp['nsamples']
+        _write_hyperslabs(self._visdata_dset, data_array, *runs)
+        _write_hyperslabs(self._flags_dset, flags_array, *runs)
+        _write_hyperslabs(self._nsamples_dset, nsample_array, *runs)
 
-            # check if we can do fancy indexing
-            # as long as at least 2 out of 3 axes can be written as slices, we can be fancy
-            n_reg_spaced = np.count_nonzero([blt_reg_spaced, freq_reg_spaced, pol_reg_spaced])
-            if n_reg_spaced >= 2:
-                visdata_dset[blt_inds, :, freq_inds, pol_inds] = data_array
-                flags_dset[blt_inds, :, freq_inds, pol_inds] = flags_array
-                nsamples_dset[blt_inds, :, freq_inds, pol_inds] = nsample_array
-            elif n_reg_spaced == 1:
-                # figure out which axis is regularly spaced
-                if blt_reg_spaced:
-                    for ifreq, freq_idx in enumerate(freq_inds):
-                        for ipol, pol_idx in enumerate(pol_inds):
-                            visdata_dset[blt_inds, :, freq_idx, pol_idx] = data_array[:, :, ifreq, ipol]
-                            flags_dset[blt_inds, :, freq_idx, pol_idx] = flags_array[:, :, ifreq, ipol]
-                            nsamples_dset[blt_inds, :, freq_idx, pol_idx] = nsample_array[:, :, ifreq, ipol]
-                elif freq_reg_spaced:
-                    for iblt, blt_idx in enumerate(blt_inds):
-                        for ipol, pol_idx in enumerate(pol_inds):
-                            visdata_dset[blt_idx, :, freq_inds, pol_idx] = data_array[iblt, :, :, ipol]
-                            flags_dset[blt_idx, :, freq_inds, pol_idx] = flags_array[iblt, :, :, ipol]
-                            nsamples_dset[blt_idx, :, freq_inds, pol_idx] = nsample_array[iblt, :, :, ipol]
-                else:  # pol_reg_spaced
-                    for iblt, blt_idx in enumerate(blt_inds):
-                        for ifreq, freq_idx in enumerate(freq_inds):
-                            visdata_dset[blt_idx, :, freq_idx, pol_inds] = data_array[iblt, :, ifreq, :]
-                            flags_dset[blt_idx, :, freq_idx, pol_inds] = flags_array[iblt, :, ifreq, :]
-                            nsamples_dset[blt_idx, :, freq_idx, pol_inds] = nsample_array[iblt, :, ifreq, :]
-            else:
-                # all axes irregularly spaced
-                # perform a triple loop -- probably very slow!
-                for iblt, blt_idx in enumerate(blt_inds):
-                    for ifreq, freq_idx in enumerate(freq_inds):
-                        for ipol, pol_idx in enumerate(pol_inds):
-                            visdata_dset[blt_idx, :, freq_idx, pol_idx] = data_array[iblt, :, ifreq, ipol]
-                            flags_dset[blt_idx, :, freq_idx, pol_idx] = flags_array[iblt, :, ifreq, ipol]
-                            nsamples_dset[blt_idx, :, freq_idx, pol_idx] = nsample_array[iblt, :, ifreq, ipol]
+        return
+
+    def append_blts(self, data_array, flags_array, nsample_array, time_array, ant_1_array,
+                    ant_2_array, uvw_array, integration_time, lst_array=None):
+        """
+        Append baseline-times to the end of a file initialized with resizable=True.
+
+        The data arrays and the header arrays along the baseline-time axis are
+        extended, and Nblts, Ntimes, Nbls and Nants_data in the header are updated.
+        Only the appended data are written, so the cost does not grow with the size
+        of the file.
+
+        Args:
+            data_array: the data of the new baseline-times, with shape
+                (Nblts_new, Nspws, Nfreqs, Npols).
+            flags_array: the flags of the new baseline-times, with the same shape
+                as data_array.
+            nsample_array: the nsamples of the new baseline-times, with the same shape
+                as data_array.
+            time_array: the times of the new baseline-times in JD, shape (Nblts_new,).
+            ant_1_array: the first antenna numbers of the new baseline-times,
+                shape (Nblts_new,).
+            ant_2_array: the second antenna numbers of the new baseline-times,
+                shape (Nblts_new,).
+            uvw_array: the uvw coordinates of the new baseline-times in meters,
+                shape (Nblts_new, 3).
+            integration_time: the integration times of the new baseline-times in
+                seconds, shape (Nblts_new,).
+            lst_array: the LSTs of the new baseline-times in radians, shape (Nblts_new,).
+                Default is to calculate them from time_array and the telescope location.
+
+        Returns:
+            None
+        """
+        if self._file is None:
+            raise ValueError('The writer for {0} has been closed'.format(self.filename))
+        if self._visdata_dset.maxshape[0] is not None:
+            raise ValueError('{0} was not initialized with resizable=True, so baseline-times '
+                             'cannot be appended'.format(self.filename))
+
+        nblts_new = len(time_array)
+        if lst_array is None:
+            latitude, longitude, altitude = self.uv.telescope_location_lat_lon_alt_degrees
+            lst_array = uvutils.get_lst_for_time(np.asarray(time_array), latitude, longitude,
+                                                 altitude)
+        blt_arrays = {'time_array': time_array, 'integration_time': integration_time,
+                      'lst_array': lst_array, 'ant_1_array': ant_1_array,
+                      'ant_2_array': ant_2_array, 'uvw_array': uvw_array}
+
+        # the first time through, get the header arrays and the times, baselines
+        # and antennas in the file
+        if self._blt_dsets is None:
+            header = self._file['/Header']
+            self._blt_dsets = dict((name, header[name]) for name in _blt_header_arrays
+                                   + ['Nblts', 'Ntimes', 'Nbls', 'Nants_data'])
+            ant_1 = self._blt_dsets['ant_1_array'][()]
+            ant_2 = self._blt_dsets['ant_2_array'][()]
+            self._times = set(np.unique(self._blt_dsets['time_array'][()]))
+            self._baselines = set(np.unique(self.uv.antnums_to_baseline(ant_1, ant_2)))
+            self._antennas = set(np.unique(np.concatenate((ant_1, ant_2))))
+        dsets = self._blt_dsets
+
+        # make sure that the dimensions of the data to write are correct
+        data_shape = (nblts_new,) + self._visdata_dset.shape[1:]
+        for name, array in [('data_array', data_array), ('flags_array', flags_array),
+                            ('nsample_array', nsample_array)]:
+            if array.shape != data_shape:
+                raise AssertionError("{0} has shape {1}; was expecting {2}".format(
+                    name, array.shape, data_shape))
+        for name, array in blt_arrays.items():
+            array = np.asarray(array)
+            expected_shape = (nblts_new,) + dsets[name].shape[1:]
+            if array.shape != expected_shape:
+                raise AssertionError("{0} has shape {1}; was expecting {2}".format(
+                    name, array.shape, expected_shape))
+            blt_arrays[name] = array
+
+        # extend the datasets and write the new baseline-times at the end
+        nblts = self._visdata_dset.shape[0]
+        for dset, array in [(self._visdata_dset, data_array), (self._flags_dset, flags_array),
+                            (self._nsamples_dset, nsample_array)]:
+            dset.resize(nblts + nblts_new, axis=0)
+            dset[nblts:] = array
+        for name, array in blt_arrays.items():
+            dsets[name].resize(nblts + nblts_new, axis=0)
+            dsets[name][nblts:] = array
+
+        # update the sizes in the header
+        self._times.update(np.unique(blt_arrays['time_array']))
+        self._baselines.update(np.unique(self.uv.antnums_to_baseline(
+            blt_arrays['ant_1_array'], blt_arrays['ant_2_array'])))
+        self._antennas.update(np.unique(np.concatenate((blt_arrays['ant_1_array'],
+                                                        blt_arrays['ant_2_array']))))
+        dsets['Nblts'][()] = nblts + nblts_new
+        dsets['Ntimes'][()] = len(self._times)
+        dsets['Nbls'][()] = len(self._baselines)
+        dsets['Nants_data'][()] = len(self._antennas)
 
         return
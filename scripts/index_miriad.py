@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8 -*
+# Copyright (c) 2018 Radio Astronomy Software Group
+# Licensed under the 2-clause BSD License
+
+"""
+A command-line script for writing index files
+for Miriad files, to speed up reads of time ranges
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import pyuvdata
+
+# setup argparse
+a = argparse.ArgumentParser(description="A command-line script for writing index files for Miriad "
+                            "files, to speed up reads of time ranges.")
+a.add_argument("files", type=str, nargs='*', help="Miriad files to index.")
+a.add_argument("--verbose", default=False, action='store_true', help="report feedback to stdout.")
+
+# get args
+args = a.parse_args()
+
+# iterate over files
+for filename in args.files:
+    if args.verbose:
+        print("indexing {}".format(filename))
+    UV = pyuvdata.UVData()
+    UV.write_miriad_index(filename)